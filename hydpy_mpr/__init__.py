@@ -5,7 +5,13 @@ import os
 from hydpy_mpr import testing
 
 
-from hydpy_mpr.source.calibrating import Calibrator, GridCalibrator, NLOptCalibrator
+from hydpy_mpr.source.calibrating import (
+    Calibrator,
+    GridCalibrator,
+    NLOptCalibrator,
+    nse_upper_bound,
+)
+from hydpy_mpr.source.executing import Execution
 from hydpy_mpr.source.logging_ import DefaultLogger, Logger
 from hydpy_mpr.source.managing import (
     AttributeElementTask,
@@ -24,13 +30,18 @@ from hydpy_mpr.source.reading import (
     RasterGroup,
     RasterGroups,
     RasterInt,
+    read_cell_area,
     read_geotiff,
     read_mapping_table,
 )
 from hydpy_mpr.source.regionalising import (
     Coefficient,
+    AttributeExpressionRegionaliser,
+    AttributeExpressionSubregionaliser,
     AttributeRegionaliser,
     AttributeSubregionaliser,
+    RasterExpressionRegionaliser,
+    RasterExpressionSubregionaliser,
     RasterRegionaliser,
     RasterSubregionaliser,
 )
@@ -86,6 +97,8 @@ __all__ = [
     "AttributeElementTask",
     "AttributeElementUpscaler",
     "AttributeFloat",
+    "AttributeExpressionRegionaliser",
+    "AttributeExpressionSubregionaliser",
     "AttributeInt",
     "AttributeRegionaliser",
     "AttributeSubregionaliser",
@@ -101,6 +114,7 @@ __all__ = [
     "ElementIdentityTransformer",
     "ElementTransformer",
     "ElementUpscaler",
+    "Execution",
     "FeatureClass",
     "FeatureClasses",
     "GeotiffResultWriter",
@@ -108,9 +122,12 @@ __all__ = [
     "Logger",
     "MPR",
     "NLOptCalibrator",
+    "nse_upper_bound",
     "ParameterTableWriter",
     "RasterElementDefaultUpscaler",
     "RasterElementUpscaler",
+    "RasterExpressionRegionaliser",
+    "RasterExpressionSubregionaliser",
     "RasterElementTask",
     "RasterFloat",
     "RasterGroup",
@@ -126,6 +143,7 @@ __all__ = [
     "SubunitIdentityTransformer",
     "SubunitTransformer",
     "SubunitUpscaler",
+    "read_cell_area",
     "read_geotiff",
     "read_mapping_table",
     "TypeVarParameter",
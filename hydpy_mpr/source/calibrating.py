@@ -1,30 +1,159 @@
 from __future__ import annotations
 import abc
+import collections
 import concurrent.futures
+import copy
 import dataclasses
 import itertools
+import time
 
 import hydpy
+from hydpy.core import parametertools
+from hydpy.core import sequencetools
 from hydpy.core import typingtools
 import nlopt
 import numpy
 
+from hydpy_mpr.source import executing
 from hydpy_mpr.source import logging_
 from hydpy_mpr.source import regionalising
+from hydpy_mpr.source import upscaling
 from hydpy_mpr.source.typing_ import *
 
 
+def nse_upper_bound(*, node: hydpy.Node) -> float:
+    """Calculate an upper bound of the Nash-Sutcliffe efficiency for the given node
+    that holds for whatever values the simulation will produce after the end of the
+    current simulation period."""
+    idx0, idx1 = hydpy.pub.timegrids.evalindices
+    idx = min(max(hydpy.pub.timegrids.simindices[1], idx0), idx1)
+    obs = node.sequences.obs.series[idx0:idx1]
+    sim = node.sequences.sim.series[idx0:idx]
+    sse = numpy.sum((sim - obs[: idx - idx0]) ** 2)
+    sst = numpy.sum((obs - numpy.mean(obs)) ** 2)
+    return float(1.0 - sse / sst)
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class Snapshot:
+    """Copy of the values of some parameters, condition sequences, and simulated node
+    series stored in a single, preallocated array.
+
+    Restoring writes the stored values back into the existing arrays of the
+    respective HydPy objects in place, without any trimming or other checks.
+    """
+
+    parameters: Sequence[parametertools.Parameter] = ()
+    conditions: Sequence[sequencetools.ConditionSequence] = ()
+    nodes: Sequence[hydpy.Node] = ()
+    values: VectorFloat = dataclasses.field(init=False)
+    bounds: VectorInt = dataclasses.field(init=False)
+
+    def __post_init__(self) -> None:
+        sizes = [numpy.size(variable.values) for variable in self.variables]
+        sizes.extend(numpy.size(series) for series in self.series)
+        self.bounds = numpy.cumsum([0] + sizes, dtype=int64)
+        self.values = numpy.full(self.bounds[-1], numpy.nan, dtype=float64)
+
+    @property
+    def variables(
+        self,
+    ) -> Iterator[parametertools.Parameter | sequencetools.ConditionSequence]:
+        yield from self.parameters
+        yield from self.conditions
+
+    @property
+    def nmb_variables(self) -> int:
+        return len(self.parameters) + len(self.conditions)
+
+    @property
+    def series(self) -> Iterator[typingtools.NDArrayFloat]:
+        for node in self.nodes:
+            yield node.sequences.sim.series
+
+    def copy(self) -> Snapshot:
+        snapshot = copy.copy(self)
+        snapshot.values = self.values.copy()
+        return snapshot
+
+    def capture(self) -> None:
+        values, bounds = self.values, self.bounds
+        for idx, variable in enumerate(self.variables):
+            values[bounds[idx] : bounds[idx + 1]] = numpy.ravel(variable.values)
+        for idx, series in enumerate(self.series, start=self.nmb_variables):
+            values[bounds[idx] : bounds[idx + 1]] = numpy.ravel(series)
+
+    def restore(self) -> None:
+        values, bounds = self.values, self.bounds
+        for idx, variable in enumerate(self.variables):
+            if variable.NDIM:
+                block = values[bounds[idx] : bounds[idx + 1]]
+                variable.values[...] = block.reshape(variable.shape)
+            else:
+                variable.value = values[bounds[idx]]
+            if isinstance(variable, sequencetools.StateSequence):
+                variable.new2old()
+        for idx, series in enumerate(self.series, start=self.nmb_variables):
+            series[...] = values[bounds[idx] : bounds[idx + 1]].reshape(series.shape)
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class MemoEntry:
+
+    likelihood: float
+    snapshot: Snapshot | None
+
+
 @dataclasses.dataclass(kw_only=True, repr=False)
 class Calibrator(abc.ABC):
-    conditions: typingtools.Conditions = dataclasses.field(init=False)
+
+    screening_lastdate: str | None = None
+    screening_tolerance: float = 0.0
+    screening_penalty: float | None = None
+    chunksize: str | None = None
+    memo_size: int = 0
+    memo_digits: int = 12
+    memo_snapshots: bool = False
+    ensemble_size: int = 0
+
+    initial_conditions: Snapshot = dataclasses.field(init=False)
+    snapshot: Snapshot = dataclasses.field(init=False)
     hp: hydpy.HydPy = dataclasses.field(init=False)
     tasks: Tasks = dataclasses.field(init=False)
     subregionalisers: Sequence[
         regionalising.AttributeSubregionaliser | regionalising.RasterSubregionaliser
     ] = dataclasses.field(init=False)
     loggers: Sequence[logging_.Logger] = dataclasses.field(init=False)
+    execution: executing.Execution = dataclasses.field(init=False)
+    dependencies: executing.Dependencies = dataclasses.field(init=False)
+    executor: concurrent.futures.ThreadPoolExecutor | None = dataclasses.field(
+        init=False, default=None
+    )
+    nmb_threads: int = dataclasses.field(init=False, default=0)
+    # coefficients collected by `activate` (`None` means not collected yet):
+    _coefficients: tuple[regionalising.Coefficient, ...] | None = dataclasses.field(
+        init=False, default=None
+    )
+    task_seconds: VectorFloat = dataclasses.field(init=False)
     likelihood: float = dataclasses.field(init=False)
     nmb_steps: int = dataclasses.field(init=False, default=0)
+    nmb_rejected: int = dataclasses.field(init=False, default=0)
+    nmb_memo_hits: int = dataclasses.field(init=False, default=0)
+    memo: collections.OrderedDict[tuple[float, ...], MemoEntry] = dataclasses.field(
+        init=False, default_factory=collections.OrderedDict
+    )
+    ensemble_members: dict[tuple[float, ...], int] = dataclasses.field(
+        init=False, default_factory=dict
+    )
+    ensemble_values: dict[int, MatrixFloat] = dataclasses.field(
+        init=False, default_factory=dict
+    )
+    ensemble_member: int | None = dataclasses.field(init=False, default=None)
+    # names of the elements with control parameter values changed by the last
+    # simulation step (`None` means all elements):
+    changed_elements: set[str] | None = dataclasses.field(init=False, default=None)
+    best_likelihood: float = dataclasses.field(init=False, default=-numpy.inf)
+    best_screening_likelihood: float = dataclasses.field(init=False, default=-numpy.inf)
 
     def activate(
         self,
@@ -35,16 +164,76 @@ class Calibrator(abc.ABC):
             regionalising.AttributeSubregionaliser | regionalising.RasterSubregionaliser
         ],
         loggers: Sequence[logging_.Logger],
+        execution: executing.Execution | None = None,
+        dependencies: executing.Dependencies | None = None,
     ) -> None:
         self.hp = hp
         self.tasks = tasks
         self.subregionalisers = subregionalisers
         self.loggers = loggers
-        self.conditions = hp.conditions
+        self.execution = executing.Execution() if execution is None else execution
+        if dependencies is None:
+            dependencies = executing.Dependencies(
+                subregionalisers=subregionalisers, tasks=tasks
+            )
+        self.dependencies = dependencies
+        self._coefficients = self._collect_coefficients()
+        self.task_seconds = numpy.zeros(len(tasks), dtype=float64)
+        self.initial_conditions = Snapshot(conditions=self.conditionsequences)
+        self.initial_conditions.capture()
+        self.snapshot = Snapshot(
+            parameters=self.parameters,
+            nodes=tuple(n for n in hp.nodes if n.sequences.sim.ramflag),
+        )
         self.likelihood = numpy.nan
+        self.best_likelihood = -numpy.inf
+        self.best_screening_likelihood = -numpy.inf
+        self.memo.clear()
+        self.check_screening_lastdate()
+        self.check_chunksize()
+
+    def check_screening_lastdate(self) -> None:
+        if self.screening_lastdate is None:
+            return
+        timegrids = hydpy.pub.timegrids
+        lastdate = hydpy.Date(self.screening_lastdate)
+        if not timegrids.eval_.firstdate < lastdate < timegrids.sim.lastdate:
+            raise ValueError(
+                f"The last date of the screening period (`{lastdate}`) must lie "
+                f"after the first date of the evaluation period "
+                f"(`{timegrids.eval_.firstdate}`) and before the last date of the "
+                f"simulation period (`{timegrids.sim.lastdate}`)."
+            )
+        if (lastdate - timegrids.sim.firstdate) % timegrids.stepsize:
+            raise ValueError(
+                f"The last date of the screening period (`{lastdate}`) is not "
+                f"aligned with the simulation step size (`{timegrids.stepsize}`)."
+            )
+
+    def check_chunksize(self) -> None:
+        if self.chunksize is None:
+            return
+        stepsize = hydpy.pub.timegrids.stepsize
+        chunksize = hydpy.Period(self.chunksize)
+        if (chunksize < stepsize) or (chunksize % stepsize):
+            raise ValueError(
+                f"The chunk size (`{chunksize}`) must be a multiple of the "
+                f"simulation step size (`{stepsize}`)."
+            )
 
     @property
     def coefficients(self) -> Sequence[regionalising.Coefficient]:
+        """The coefficients of all subregionalisers and task regionalisers, sorted by
+        name.
+
+        Method `activate` collects them once.  Before, each access collects them
+        anew from the current `subregionalisers` and `tasks`.
+        """
+        if (coefficients := self._coefficients) is None:
+            return self._collect_coefficients()
+        return coefficients
+
+    def _collect_coefficients(self) -> tuple[regionalising.Coefficient, ...]:
         coefficients: set[regionalising.Coefficient] = set()
         for subregionaliser in self.subregionalisers:
             coefficients.update(subregionaliser.coefficients)
@@ -71,33 +260,309 @@ class Calibrator(abc.ABC):
     @abc.abstractmethod
     def calculate_likelihood(self) -> float: ...
 
+    @property
+    def parameters(self) -> Sequence[parametertools.Parameter]:
+        parameters: dict[int, parametertools.Parameter] = {}
+        for task in self.tasks:
+            for transformer in task.transformers:
+                for parameter in transformer.element2parameter.values():
+                    parameters[id(parameter)] = parameter
+        return tuple(parameters.values())
+
+    @property
+    def conditionsequences(self) -> Sequence[sequencetools.ConditionSequence]:
+        return tuple(
+            sequence
+            for element in self.hp.elements
+            for model in element.model.find_submodels(include_mainmodel=True).values()
+            for sequence in model.sequences.conditionsequences
+        )
+
+    @property
+    def conditions(self) -> typingtools.Conditions:
+        """Copy of the initial conditions captured at activation in the nested format
+        of HydPy's `conditions` property (read-only, see `initial_conditions`)."""
+        values, bounds = self.initial_conditions.values, self.initial_conditions.bounds
+        conditions: typingtools.Conditions = {}
+        idx = 0
+        for element in self.hp.elements:
+            conditions_element = conditions[element.name] = {}
+            submodels = element.model.find_submodels(include_mainmodel=True)
+            for name, model in submodels.items():
+                conditions_model: typingtools.ConditionsSubmodel = {}
+                for sequence in model.sequences.conditionsequences:
+                    block = values[bounds[idx] : bounds[idx + 1]]
+                    subconditions = conditions_model.setdefault(
+                        sequence.subseqs.name, {}
+                    )
+                    subconditions[sequence.name] = (
+                        block.reshape(sequence.shape).copy()
+                        if sequence.NDIM
+                        else float(block[0])
+                    )
+                    idx += 1
+                conditions_element[name] = conditions_model
+        return conditions
+
+    def take_snapshot(self) -> Snapshot:
+        self.snapshot.capture()
+        return self.snapshot.copy()
+
+    def restore_snapshot(self, snapshot: Snapshot) -> None:
+        snapshot.restore()
+        for task in self.tasks:
+            task.upscaler.invalidate()
+            for transformer in task.transformers:
+                transformer.invalidate()
+        self.hp.update_parameters()
+        self.changed_elements = None
+
     def perform_calibrationstep(
         self,  # pylint: disable=unused-argument
         values: Sequence[float],
         *args: Any,
         apply_loggers: bool = True,
+        require_state: bool = False,
         **kwargs: Any,
     ) -> float:
         self.update_coefficients(values)
-        for subregionaliser in self.subregionalisers:
-            subregionaliser.apply_coefficients()
-        if (threads := hydpy.pub.options.threads) == 0:
-            for task in self.tasks:
-                task.run()
+        self.ensemble_member = self.ensemble_members.get(tuple(map(float, values)))
+        if self.memo_size > 0:
+            key = tuple(round(float(v), self.memo_digits) for v in values)
+            likelihood = self.query_memo(key=key, require_state=require_state)
+            if likelihood is None:
+                likelihood = self.extend_memo(key=key)
         else:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
-                futures = (executor.submit(task.run) for task in self.tasks)
-                for future in concurrent.futures.as_completed(futures):
-                    future.result()
-        self.hp.update_parameters()
-        self.hp.conditions = self.conditions
-        self.hp.simulate()
-        likelihood = self.calculate_likelihood()
+            likelihood = self.apply_coefficients_and_simulate()
         self.nmb_steps += 1
         for logger in self.loggers:
             logger.log(likelihood=likelihood)
         return likelihood
 
+    def query_memo(
+        self, *, key: tuple[float, ...], require_state: bool
+    ) -> float | None:
+        if (entry := self.memo.get(key)) is None:
+            return None
+        if require_state:
+            if entry.snapshot is None:
+                return None
+            # the snapshot covers only the HydPy side, so the tasks must run again
+            # to bring their (regionalised and upscaled) outputs in line with it:
+            self.run_tasks()
+            self.restore_snapshot(entry.snapshot)
+        self.memo.move_to_end(key)
+        self.nmb_memo_hits += 1
+        return entry.likelihood
+
+    def extend_memo(self, *, key: tuple[float, ...]) -> float:
+        nmb_rejected = self.nmb_rejected
+        likelihood = self.apply_coefficients_and_simulate()
+        # The penalties and bounds of rejected candidates depend on the best
+        # likelihood at the time of rejection, so revisits must simulate again:
+        if self.nmb_rejected > nmb_rejected:
+            return likelihood
+        snapshot = self.take_snapshot() if self.memo_snapshots else None
+        self.memo[key] = MemoEntry(likelihood=likelihood, snapshot=snapshot)
+        self.memo.move_to_end(key)
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+        return likelihood
+
+    def apply_coefficients_and_simulate(self) -> float:
+        self.run_tasks()
+        self.update_parameters()
+        return self.simulate()
+
+    def run_tasks(self) -> None:
+        """Run all subregionalisers and tasks based on the current coefficient
+        values."""
+        if (threads := self.execution.task_threads) == 0:
+            for node in self.dependencies.order:
+                self.subregionalisers[node].apply_coefficients()
+            for idx in range(len(self.tasks)):
+                self.run_task(idx)
+        else:
+            self.run_nodes(self.get_executor(threads))
+
+    def update_parameters(self) -> None:
+        """Update the derived parameters of those elements for which at least one
+        transformer changed a control parameter value."""
+        changed_elements: set[str] = set()
+        for task in self.tasks:
+            for transformer in task.transformers:
+                changed_elements.update(transformer.changed_elements)
+        self.changed_elements = changed_elements
+        for element in self.hp.elements:
+            if element.name in changed_elements:
+                element.model.update_parameters()
+
+    def run_nodes(self, executor: concurrent.futures.ThreadPoolExecutor, /) -> None:
+        """Run all subregionalisers and tasks, each as soon as all subregionalisers it
+        depends on are finished."""
+        dependencies = self.dependencies
+        nmb_subregionalisers = len(self.subregionalisers)
+        node2rank = {
+            node: rank
+            for rank, node in enumerate(
+                itertools.chain(
+                    dependencies.order,
+                    (nmb_subregionalisers + i for i in self.schedule_tasks()),
+                )
+            )
+        }
+        remaining = [len(p) for p in dependencies.node2predecessors]
+        ready = [n for n, r in enumerate(remaining) if r == 0]
+        future2node: dict[concurrent.futures.Future[None], int] = {}
+        while ready or future2node:
+            for node in sorted(ready, key=node2rank.__getitem__):
+                future2node[executor.submit(self.run_node, node)] = node
+            ready = []
+            done, _ = concurrent.futures.wait(
+                future2node, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                future.result()
+                for successor in dependencies.node2successors[future2node.pop(future)]:
+                    remaining[successor] -= 1
+                    if remaining[successor] == 0:
+                        ready.append(successor)
+
+    def run_node(self, node: int, /) -> None:
+        if node < (nmb_subregionalisers := len(self.subregionalisers)):
+            self.subregionalisers[node].apply_coefficients()
+        else:
+            self.run_task(node - nmb_subregionalisers)
+
+    def run_task(self, idx: int, /) -> None:
+        start = time.perf_counter()
+        if ((member := self.ensemble_member) is not None) and (
+            (values := self.ensemble_values.get(idx)) is not None
+        ):
+            self.tasks[idx].run_precomputed(values[member])
+        else:
+            self.tasks[idx].run()
+        self.task_seconds[idx] += time.perf_counter() - start
+
+    def prepare_ensemble(self, members: Sequence[Sequence[float]]) -> None:
+        """Precalculate the upscaled values of all fused and linear tasks with static
+        inputs for the given coefficient vectors, which later calibration steps with
+        exactly these vectors reuse."""
+        self.ensemble_members = {
+            tuple(map(float, member)): idx for idx, member in enumerate(members)
+        }
+        self.ensemble_values = {}
+        if not members:
+            return
+        values = numpy.asarray(members, dtype=float64)
+        for idx, task in enumerate(self.tasks):
+            upscaler = task.upscaler
+            if (
+                isinstance(upscaler, upscaling.RasterDefaultUpscaler)
+                and upscaler.ensemble_capable
+            ):
+                self.ensemble_values[idx] = upscaler.calculate_ensemble(
+                    self.coefficients, values
+                )
+
+    def schedule_tasks(self) -> list[int]:
+        """Return the task indices in "longest processing time first" order while
+        keeping tasks sharing the same data provider (e.g. a `RasterGroup`) together.
+        """
+        seconds = self.task_seconds
+        provider2idxs: dict[int, list[int]] = {}
+        for idx, task in enumerate(self.tasks):
+            provider2idxs.setdefault(id(task.regionaliser.provider_), []).append(idx)
+        groups = sorted(
+            (
+                sorted(idxs, key=lambda i: -seconds[i])
+                for idxs in provider2idxs.values()
+            ),
+            key=lambda idxs: -sum(seconds[i] for i in idxs),
+        )
+        return list(itertools.chain.from_iterable(groups))
+
+    def get_executor(self, threads: int) -> concurrent.futures.ThreadPoolExecutor:
+        if (self.executor is None) or (threads != self.nmb_threads):
+            self.shutdown()
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+            self.nmb_threads = threads
+        return self.executor
+
+    def shutdown(self) -> None:
+        if (executor := self.executor) is not None:
+            executor.shutdown()
+            self.executor = None
+            self.nmb_threads = 0
+
+    def simulate(self) -> float:
+        self.initial_conditions.restore()
+        # Like HydPy's `conditions` setter, trim the states to the current parameters:
+        for sequence in reversed(self.initial_conditions.conditions):
+            sequence.trim()
+        sim, eval_ = hydpy.pub.timegrids.sim, hydpy.pub.timegrids.eval_
+        dates_sim, dates_eval = sim.dates, eval_.dates
+        firstdate = dates_sim[0]
+        screening_likelihood = numpy.nan
+
+        if (screening_lastdate := self.screening_lastdate) is not None:
+
+            # Simulate the screening period and evaluate the partial likelihood:
+            try:
+                sim.lastdate = screening_lastdate
+                eval_.lastdate = screening_lastdate
+                self.hp.simulate()
+                screening_likelihood = self.calculate_likelihood()
+            finally:
+                sim.dates = dates_sim
+                eval_.dates = dates_eval
+
+            # Reject candidates that are clearly worse than the current best one:
+            deficit = self.best_screening_likelihood - screening_likelihood
+            if not deficit <= self.screening_tolerance:
+                self.nmb_rejected += 1
+                if (penalty := self.screening_penalty) is None:
+                    return self.best_likelihood - deficit
+                return penalty
+
+            # Continue the simulation for the remaining period:
+            firstdate = hydpy.Date(screening_lastdate)
+
+        # Simulate the (remaining) period chunk-wise and stop as soon as the
+        # likelihood bound reveals that the current candidate cannot beat the best:
+        try:
+            for lastdate in self._iterate_chunk_lastdates(firstdate, dates_sim[1]):
+                sim.dates = firstdate, lastdate
+                self.hp.simulate()
+                if lastdate < dates_sim[1]:
+                    bound = self.calculate_likelihood_bound()
+                    if bound < self.best_likelihood:
+                        self.nmb_rejected += 1
+                        return bound
+                firstdate = lastdate
+        finally:
+            sim.dates = dates_sim
+
+        likelihood = self.calculate_likelihood()
+        if likelihood > self.best_likelihood:
+            self.best_likelihood = likelihood
+            if screening_lastdate is not None:
+                self.best_screening_likelihood = screening_likelihood
+        return likelihood
+
+    def _iterate_chunk_lastdates(
+        self, firstdate: hydpy.Date, lastdate: hydpy.Date
+    ) -> Iterator[hydpy.Date]:
+        if (chunksize := self.chunksize) is not None:
+            date = firstdate + chunksize
+            while date < lastdate:
+                yield date
+                date = date + chunksize
+        yield lastdate
+
+    def calculate_likelihood_bound(self) -> float:
+        return numpy.inf
+
     @abc.abstractmethod
     def calibrate(self) -> None:
         pass
@@ -141,12 +606,20 @@ class GridCalibrator(Calibrator, abc.ABC):
     def calibrate(self) -> None:
         best_likelihood = -numpy.inf
         best_values: Sequence[float] = len(self.coefficients) * (numpy.nan,)
-        for values in self.gridpoints:
-            likelihood = self.perform_calibrationstep(values, apply_loggers=True)
-            if likelihood > best_likelihood:
-                best_likelihood = likelihood
-                best_values = values
-        self.likelihood = self.perform_calibrationstep(best_values, apply_loggers=False)
+        gridpoints = self.gridpoints
+        size = self.ensemble_size if self.ensemble_size > 0 else None
+        while batch := tuple(itertools.islice(gridpoints, size)):
+            if size is not None:
+                self.prepare_ensemble(batch)
+            for values in batch:
+                likelihood = self.perform_calibrationstep(values, apply_loggers=True)
+                if likelihood > best_likelihood:
+                    best_likelihood = likelihood
+                    best_values = values
+        self.prepare_ensemble(())
+        self.likelihood = self.perform_calibrationstep(
+            best_values, apply_loggers=False, require_state=True
+        )
 
 
 @dataclasses.dataclass(kw_only=True, repr=False)
@@ -165,4 +638,6 @@ class NLOptCalibrator(Calibrator, abc.ABC):
         optimiser.set_max_objective(self.perform_calibrationstep)
         values = optimiser.optimize(self.values)
         self.update_coefficients(values)
-        self.likelihood = self.perform_calibrationstep(self.values, apply_loggers=False)
+        self.likelihood = self.perform_calibrationstep(
+            self.values, apply_loggers=False, require_state=True
+        )
@@ -25,6 +25,14 @@ ELEMENT_NAME = "element_name"
 # Name of the subunit ID raster file and the feature classes' subunit ID columns:
 SUBUNIT_ID = "subunit_id"
 
+# Name of the raster of cell areas, which is derived from the georeferencing of the
+# element ID raster file if the raster group directory does not contain such a file:
+CELL_AREA = "cell_area"
+
+# Authalic radius of the GRS 1980 ellipsoid for approximating the areas of cells in
+# geographic coordinates [m]:
+EARTH_RADIUS = 6371007.2
+
 
 class Size(enum.StrEnum):
     """Names of the feature classes' size-related columns."""
@@ -42,3 +50,11 @@ class Size(enum.StrEnum):
 UP_A: Literal["arithmetic_mean"] = "arithmetic_mean"
 UP_G: Literal["geometric_mean"] = "geometric_mean"
 UP_H: Literal["harmonic_mean"] = "harmonic_mean"
+UP_P: Literal["power_mean"] = "power_mean"
+
+# Names of the default order-statistic upscaling methods (note: synchronise with
+# `typing_`):
+UP_MIN: Literal["minimum"] = "minimum"
+UP_MAX: Literal["maximum"] = "maximum"
+UP_MED: Literal["median"] = "median"
+UP_Q: Literal["quantile"] = "quantile"
@@ -22,6 +22,7 @@ class Equation(
 
     provider_: TypeVarProvider = dataclasses.field(init=False)
     mask: TypeVarArrayBool = dataclasses.field(init=False)
+    antimask: TypeVarArrayBool = dataclasses.field(init=False)
     output: TypeVarArrayFloat = dataclasses.field(init=False)
 
     @property
@@ -44,6 +45,7 @@ class Equation(
             dataset = provider.name2dataset[datasetname]  # ToDo: error message
             setattr(self, fieldname_data, dataset)  # ToDo: check type?
             self.mask *= dataset.mask
+        self.antimask = ~self.mask
         self.output = numpy.full(self.shape, numpy.nan)
 
     @property
@@ -51,7 +53,7 @@ class Equation(
         return {
             name: value
             for field in dataclasses.fields(self)
-            if ((name := field.name) != "output")
+            if (name := field.name).startswith("dataset_")
             and isinstance(value := getattr(self, name), self.TYPE_DATA_FLOAT)
         }
 
@@ -64,7 +66,7 @@ class Equation(
         }
 
     def apply_mask(self) -> None:
-        self.output[~self.mask] = numpy.nan
+        numpy.copyto(self.output, numpy.nan, where=self.antimask)
 
 
 @dataclasses.dataclass(kw_only=True, repr=False)
@@ -0,0 +1,184 @@
+"""Configuration of the parallel execution of the individual calibration steps."""
+
+from __future__ import annotations
+import dataclasses
+import itertools
+import os
+import warnings
+
+import hydpy
+
+from hydpy_mpr.source import equations
+from hydpy_mpr.source import regionalising
+from hydpy_mpr.source.typing_ import *
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class Execution:
+    """Thread budget for running the MPR tasks, independent of HydPy's own
+    `threads` option that controls the simulation.
+
+    With the default of zero `task_threads`, the calibrator runs all
+    subregionalisers and tasks sequentially in the main thread, so a default `MPR`
+    does not run tasks in parallel, whatever HydPy's `threads` option says.  Set
+    `task_threads` to a positive number to run independent tasks concurrently.
+
+    The task executor keeps its threads alive while HydPy simulates, so the task
+    threads and the simulation threads must fit into the number of cores available
+    to the job together.
+    """
+
+    task_threads: int = 0
+    nmb_cores: int | None = None
+
+    @property
+    def available_cores(self) -> int:
+        if (nmb_cores := self.nmb_cores) is not None:
+            return nmb_cores
+        if hasattr(os, "sched_getaffinity"):  # not available on Windows and macOS
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    @property
+    def simulation_threads(self) -> int:
+        return hydpy.pub.options.threads + 1  # HydPy counts additional threads
+
+    def check(self, *, strict: bool = True) -> None:
+        """Check the thread budget.
+
+        A negative number of task threads is always an error.  Exceeding the
+        available cores is one only if `strict` is true and results in a warning
+        otherwise.
+        """
+        if self.task_threads < 0:
+            raise ValueError(
+                f"The number of task threads must not be negative, but "
+                f"`{self.task_threads}` is given."
+            )
+        cores = self.available_cores
+        simulation_threads = self.simulation_threads
+        if (self.task_threads + simulation_threads) > cores:
+            message = (
+                f"The number of task threads (`{self.task_threads}`) plus the number "
+                f"of HydPy's simulation threads (`{simulation_threads}`) exceeds the "
+                f"number of available cores (`{cores}`)."
+            )
+            if strict:
+                raise ValueError(message)
+            warnings.warn(message)
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class Dependencies:
+    """Dependency graph of the subregionalisers and tasks of an MPR run.
+
+    An equation depends on a subregionaliser if one of its `source_` fields refers
+    to the dataset the subregionaliser registers under its name in their common
+    provider.  Node `i` represents the `i`-th subregionaliser, node `n + j` the `j`-th
+    task, where `n` is the number of subregionalisers.  Preprocessors do not appear
+    as nodes, as they run only once during activation.
+
+    Tasks computing their complete output and having structurally identical
+    regionalisers (same type, provider, sources, and coefficient objects) share the
+    output of the first of them, so each of them depends on this primary task.
+    """
+
+    subregionalisers: Sequence[
+        regionalising.AttributeSubregionaliser | regionalising.RasterSubregionaliser
+    ]
+    tasks: Tasks
+    node2predecessors: tuple[tuple[int, ...], ...] = dataclasses.field(init=False)
+    node2successors: tuple[tuple[int, ...], ...] = dataclasses.field(init=False)
+    order: tuple[int, ...] = dataclasses.field(init=False)
+    task2primary: tuple[int | None, ...] = dataclasses.field(init=False)
+
+    def __post_init__(self) -> None:
+        key2node = {
+            self._get_key(s, NameDataset(s.name)): n
+            for n, s in enumerate(self.subregionalisers)
+        }
+        node2predecessors = []
+        for equation in itertools.chain(
+            self.subregionalisers, (task.regionaliser for task in self.tasks)
+        ):
+            keys = (
+                self._get_key(equation, name)
+                for name in equation.fieldname2datasetname.values()
+            )
+            node2predecessors.append(
+                tuple(sorted({n for k in keys if (n := key2node.get(k)) is not None}))
+            )
+        signature2task: dict[Hashable, int] = {}
+        task2primary: list[int | None] = []
+        nmb_subregionalisers = len(self.subregionalisers)
+        for idx, task in enumerate(self.tasks):
+            if task.skips_output:  # there is no output to share
+                signature: Hashable = idx
+            else:
+                signature = self._get_signature(task.regionaliser)
+            if (primary := signature2task.setdefault(signature, idx)) == idx:
+                task2primary.append(None)
+            else:
+                task2primary.append(primary)
+                node = nmb_subregionalisers + idx
+                node2predecessors[node] += (nmb_subregionalisers + primary,)
+        self.task2primary = tuple(task2primary)
+        self.node2predecessors = tuple(node2predecessors)
+        node2successors: list[list[int]] = [[] for _ in node2predecessors]
+        for node, predecessors in enumerate(node2predecessors):
+            for predecessor in predecessors:
+                node2successors[predecessor].append(node)
+        self.node2successors = tuple(tuple(s) for s in node2successors)
+        self.order = self._sort_topologically()
+
+    @staticmethod
+    def _get_key(
+        equation: equations.Equation[Any, Any, Any, Any], name: NameDataset, /
+    ) -> tuple[bool, NameProvider, NameDataset]:
+        raster = isinstance(equation, equations.RasterEquation)
+        return raster, equation.provider, name
+
+    @staticmethod
+    def _get_signature(
+        regionaliser: regionalising.Regionaliser[Any, Any, Any, Any], /
+    ) -> Hashable:
+        values: list[Hashable] = [type(regionaliser), regionaliser.provider]
+        for field in dataclasses.fields(regionaliser):
+            if field.init and (field.name not in ("name", "provider")):
+                value = getattr(regionaliser, field.name)
+                try:
+                    hash(value)
+                except TypeError:
+                    value = id(value)
+                if isinstance(value, regionalising.Coefficient):
+                    value = id(value)
+                values.append((field.name, value))
+        return tuple(values)
+
+    def _sort_topologically(self) -> tuple[int, ...]:
+        nmb_subregionalisers = len(self.subregionalisers)
+        remaining = [len(p) for p in self.node2predecessors[:nmb_subregionalisers]]
+        ready = [n for n, r in enumerate(remaining) if r == 0]
+        order: list[int] = []
+        while ready:
+            node = ready.pop(0)
+            order.append(node)
+            for successor in self.node2successors[node]:
+                if successor < nmb_subregionalisers:
+                    remaining[successor] -= 1
+                    if remaining[successor] == 0:
+                        ready.append(successor)
+        if len(order) < nmb_subregionalisers:
+            names = ", ".join(
+                f"`{s.name}`"
+                for n, s in enumerate(self.subregionalisers)
+                if n not in order
+            )
+            raise ValueError(
+                f"The subregionalisers {names} depend on each other cyclically."
+            )
+        return tuple(order)
+
+    @property
+    def nmb_nodes(self) -> int:
+        return len(self.node2predecessors)
@@ -0,0 +1,255 @@
+"""Compilation of declarative transfer-function expressions into chunked ufunc
+programs."""
+
+from __future__ import annotations
+import ast
+import dataclasses
+
+import numpy
+
+from hydpy_mpr.source.typing_ import *
+
+CHUNKSIZE = 2**14
+
+Ufunc: TypeAlias = numpy.ufunc
+Operand: TypeAlias = tuple[int, Any]
+
+_CONSTANT, _COEFFICIENT, _DATASET, _SCALAR, _ARRAY, _DERIVED = range(6)
+
+_OPERATORS: dict[type[ast.AST], Ufunc] = {
+    ast.Add: numpy.add,
+    ast.Sub: numpy.subtract,
+    ast.Mult: numpy.multiply,
+    ast.Div: numpy.true_divide,
+    ast.Pow: numpy.power,
+}
+
+# NumPy's fast paths for `array ** scalar`, mirrored to keep results identical:
+_POWERS: dict[float, Ufunc] = {
+    -1.0: numpy.reciprocal,
+    0.5: numpy.sqrt,
+    2.0: numpy.square,
+}
+
+_FUNCTIONS: dict[str, Ufunc] = {
+    "abs": numpy.absolute,
+    "exp": numpy.exp,
+    "log": numpy.log,
+    "log10": numpy.log10,
+    "maximum": numpy.maximum,
+    "minimum": numpy.minimum,
+    "sqrt": numpy.sqrt,
+}
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class Expression:
+    """Arithmetic expression over dataset and coefficient names, compiled into a
+    sequence of ufunc calls.
+
+    Subexpressions depending on coefficients and constants only are evaluated once
+    per call.  All others are evaluated chunk-wise into small preallocated buffers and
+    the final operation writes directly into the given output array, so no
+    full-size temporaries arise.  Identical subexpressions are evaluated only once.
+
+    Subexpressions depending only on constants and the datasets listed as `static`
+    do not change between calls.  Method `Expression.derive` evaluates them once,
+    and method `Expression.evaluate` reuses the resulting derived datasets.
+    """
+
+    source: str
+    datasets: Sequence[str]
+    coefficients: Sequence[str]
+    static: Sequence[str] = ()
+    chunksize: int = CHUNKSIZE
+
+    static_instructions: list[tuple[Ufunc, tuple[Operand, ...], int]] = (
+        dataclasses.field(init=False)
+    )
+    scalar_instructions: list[tuple[Ufunc, tuple[Operand, ...], int]] = (
+        dataclasses.field(init=False)
+    )
+    array_instructions: list[tuple[Ufunc, tuple[Operand, ...], int]] = (
+        dataclasses.field(init=False)
+    )
+    result: Operand = dataclasses.field(init=False)
+    buffers: list[VectorFloat] = dataclasses.field(init=False)
+    _nmb_scalars: int = dataclasses.field(init=False)
+    _cache: dict[str, Operand] = dataclasses.field(init=False)
+
+    def __post_init__(self) -> None:
+        try:
+            tree = ast.parse(self.source.strip(), mode="eval")
+        except SyntaxError:
+            raise ValueError(f"Expression `{self.source}` is not valid.") from None
+        self.static_instructions = []
+        self.scalar_instructions = []
+        self.array_instructions = []
+        self._nmb_scalars = 0
+        self._cache = {}
+        self.result = self._compile(tree.body)
+        self.buffers = [
+            numpy.empty(self.chunksize) for _ in range(len(self.array_instructions))
+        ]
+
+    def _compile(self, node: ast.AST) -> Operand:
+        key = ast.dump(node)
+        if (operand := self._cache.get(key)) is None:
+            operand = self._compile_new(node)
+            self._cache[key] = operand
+        return operand
+
+    def _compile_new(self, node: ast.AST) -> Operand:
+        if isinstance(node, ast.Constant) and isinstance(node.value, int | float):
+            return _CONSTANT, float(node.value)
+        if isinstance(node, ast.Name):
+            if node.id in self.datasets:
+                return _DATASET, node.id
+            if node.id in self.coefficients:
+                return _COEFFICIENT, node.id
+            raise ValueError(
+                f"Expression `{self.source}` contains the unknown name `{node.id}`."
+            )
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.UAdd):
+            return self._compile(node.operand)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return self._emit(numpy.negative, (self._compile(node.operand),))
+        if isinstance(node, ast.BinOp) and (type(node.op) in _OPERATORS):
+            left, right = self._compile(node.left), self._compile(node.right)
+            if (
+                isinstance(node.op, ast.Pow)
+                and (left[0] in (_DATASET, _ARRAY, _DERIVED))
+                and (right[0] == _CONSTANT)
+                and ((ufunc := _POWERS.get(right[1])) is not None)
+            ):
+                return self._emit(ufunc, (left,))
+            return self._emit(_OPERATORS[type(node.op)], (left, right))
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and ((ufunc := _FUNCTIONS.get(node.func.id)) is not None)
+            and not node.keywords
+            and (len(node.args) == ufunc.nin)
+        ):
+            return self._emit(ufunc, tuple(self._compile(arg) for arg in node.args))
+        raise ValueError(
+            f"Expression `{self.source}` contains the unsupported element "
+            f"`{ast.unparse(node)}`."
+        )
+
+    def _is_static(self, operand: Operand, /) -> bool:
+        kind, value = operand
+        return (kind in (_CONSTANT, _DERIVED)) or (
+            (kind == _DATASET) and (value in self.static)
+        )
+
+    def _emit(self, ufunc: Ufunc, operands: tuple[Operand, ...]) -> Operand:
+        if any(kind in (_DATASET, _DERIVED) for kind, _ in operands) and all(
+            self._is_static(operand) for operand in operands
+        ):
+            self.static_instructions.append(
+                (ufunc, operands, idx := len(self.static_instructions))
+            )
+            return _DERIVED, idx
+        if any(kind in (_DATASET, _ARRAY, _DERIVED) for kind, _ in operands):
+            self.array_instructions.append(
+                (ufunc, operands, idx := len(self.array_instructions))
+            )
+            return _ARRAY, idx
+        self.scalar_instructions.append((ufunc, operands, idx := self._nmb_scalars))
+        self._nmb_scalars += 1
+        return _SCALAR, idx
+
+    def derive(self, *, inputs: Mapping[str, VectorFloat]) -> list[VectorFloat | None]:
+        """Evaluate all coefficient-independent subexpressions for the given flat
+        input arrays and return those still required by `Expression.evaluate`."""
+
+        derived: list[VectorFloat] = []
+        for ufunc, operands, _ in self.static_instructions:
+            args = []
+            for kind, value in operands:
+                if kind == _DATASET:
+                    args.append(inputs[value])
+                elif kind == _DERIVED:
+                    args.append(derived[value])
+                else:
+                    args.append(value)
+            derived.append(ufunc(*args))
+
+        required = {
+            value
+            for _, operands, _ in self.array_instructions
+            for kind, value in operands
+            if kind == _DERIVED
+        }
+        if self.result[0] == _DERIVED:
+            required.add(self.result[1])
+        return [d if i in required else None for i, d in enumerate(derived)]
+
+    def evaluate(
+        self,
+        *,
+        inputs: Mapping[str, VectorFloat],
+        coefficients: Mapping[str, float],
+        output: VectorFloat,
+        derived: Sequence[VectorFloat | None] | None = None,
+    ) -> None:
+        """Evaluate the expression for the given flat input arrays and coefficient
+        values and write the results into the given flat output array.
+
+        Pass the derived datasets previously calculated by `Expression.derive` for
+        the same inputs to avoid their recalculation.
+        """
+
+        available = self.derive(inputs=inputs) if derived is None else derived
+
+        def get_derived(idx: int) -> VectorFloat:
+            values = available[idx]
+            assert values is not None
+            return values
+
+        scalars: list[Any] = [None] * self._nmb_scalars
+
+        def get_scalar(operand: Operand) -> Any:
+            kind, value = operand
+            if kind == _CONSTANT:
+                return value
+            if kind == _COEFFICIENT:
+                return coefficients[value]
+            return scalars[value]
+
+        for ufunc, operands, idx in self.scalar_instructions:
+            scalars[idx] = ufunc(*(get_scalar(o) for o in operands))
+
+        kind, value = self.result
+        if kind == _DATASET:
+            numpy.copyto(output, inputs[value])
+            return
+        if kind == _DERIVED:
+            numpy.copyto(output, get_derived(value))
+            return
+        if kind != _ARRAY:
+            output[:] = get_scalar(self.result)
+            return
+
+        buffers, instructions = self.buffers, self.array_instructions
+        size = len(output)
+        for start in range(0, size, self.chunksize):
+            stop = min(start + self.chunksize, size)
+            length = stop - start
+            for ufunc, operands, idx in instructions:
+                args = []
+                for operand in operands:
+                    kind, value = operand
+                    if kind == _ARRAY:
+                        args.append(buffers[value][:length])
+                    elif kind == _DATASET:
+                        args.append(inputs[value][start:stop])
+                    elif kind == _DERIVED:
+                        args.append(get_derived(value)[start:stop])
+                    else:
+                        args.append(get_scalar(operand))
+                if idx == self.result[1]:
+                    ufunc(*args, out=output[start:stop])
+                else:
+                    ufunc(*args, out=buffers[idx][:length])
@@ -109,7 +109,7 @@ class DefaultLogger(Logger):
 
         values = [float(v) for v in best_line.split()[1:]]
         best_value_again = self.calibrator.perform_calibrationstep(
-            values, apply_loggers=False
+            values, apply_loggers=False, require_state=True
         )
 
         if not math.isclose(best_value, best_value_again):
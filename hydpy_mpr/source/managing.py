@@ -6,6 +6,7 @@ import hydpy
 
 from hydpy_mpr.source import calibrating
 from hydpy_mpr.source import equations
+from hydpy_mpr.source import executing
 from hydpy_mpr.source import logging_
 from hydpy_mpr.source import preprocessing
 from hydpy_mpr.source import regionalising
@@ -25,14 +26,40 @@ class Task(
     regionaliser: TypeVarRegionaliser
     upscaler: TypeVarUpscaler
     transformers: Sequence[TypeVarTransformer]
+    fused: bool = False
+    linear: bool = False
     hp: hydpy.HydPy = dataclasses.field(init=False)
+    shared: bool = dataclasses.field(init=False, default=False)
 
-    def activate(self, *, hp: hydpy.HydPy, provider: TypeVarProvider) -> None:
+    def activate(
+        self,
+        *,
+        hp: hydpy.HydPy,
+        provider: TypeVarProvider,
+        index: transforming.ParameterIndex | None = None,
+    ) -> None:
         self.hp = hp
         self.regionaliser.activate(provider=provider)
         self.upscaler.activate(regionaliser=self.regionaliser)
+        if self.fused or self.linear:
+            if self.fused and self.linear:
+                raise ValueError(
+                    f"The task of regionaliser `{self.regionaliser.name}` cannot run "
+                    f"in fused and linear mode simultaneously."
+                )
+            if not isinstance(self.upscaler, upscaling.RasterDefaultUpscaler):
+                raise ValueError(
+                    f"{'Fused' if self.fused else 'Linear'} execution requires a "
+                    f"default raster upscaler, but the task of regionaliser "
+                    f"`{self.regionaliser.name}` uses an upscaler of type "
+                    f"`{type(self.upscaler).__name__}`."
+                )
+            if self.fused:
+                self.upscaler.activate_fused()
+            else:
+                self.upscaler.activate_linear()
         for transformer in self.transformers:
-            transformer.activate(hp=hp, upscaler=self.upscaler)
+            transformer.activate(hp=hp, upscaler=self.upscaler, index=index)
 
     @property
     def provider(self) -> NameProvider:
@@ -40,9 +67,37 @@ class Task(
         # ToDo: check source is consistently defined
         return provider
 
+    def share_regionaliser(self, primary: Task[Any, Any, Any, Any], /) -> None:
+        """Reuse the regionalisation output of the given task instead of calculating
+        an identical one."""
+        self.regionaliser.output = primary.regionaliser.output
+        self.shared = True
+
+    @property
+    def skips_output(self) -> bool:
+        """Flag indicating whether the task usually does not calculate the complete
+        output raster (fused and linear mode)."""
+        return self.fused or self.linear
+
+    def materialise_output(self) -> None:
+        """Calculate the complete output raster if the task usually skips it."""
+        if self.skips_output:
+            self.regionaliser.apply_coefficients()
+            self.regionaliser.apply_mask()
+
+    def run_precomputed(self, values: VectorFloat, /) -> None:
+        """Run the task based on group values precomputed by method
+        `calculate_ensemble` of its upscaler."""
+        assert isinstance(self.upscaler, upscaling.RasterDefaultUpscaler)
+        self.upscaler.invalidate()
+        self.upscaler.assign_groups(values)
+        for transformer in self.transformers:
+            transformer.modify_parameters()
+
     def run(self) -> None:
-        self.regionaliser.apply_coefficients()
-        self.regionaliser.apply_mask()  # ToDo: remove?
+        if not (self.shared or self.skips_output):
+            self.regionaliser.apply_coefficients()
+            self.regionaliser.apply_mask()  # ToDo: remove?
         self.upscaler.scale_up()
         for transformer in self.transformers:
             transformer.modify_parameters()
@@ -109,9 +164,17 @@ class MPR:
     calibrator: calibrating.Calibrator
     loggers: Sequence[logging_.Logger] = dataclasses.field(default_factory=lambda: [])
     writers: Sequence[writing.Writer] = dataclasses.field(default_factory=lambda: [])
+    execution: executing.Execution = dataclasses.field(
+        default_factory=executing.Execution
+    )
 
     def __post_init__(self) -> None:
 
+        self.execution.check(strict=False)
+        dependencies = executing.Dependencies(
+            subregionalisers=self.subregionalisers, tasks=self.tasks
+        )
+
         raster_groups = reading.RasterGroups(
             mprpath=self.mprpath,
             equations=tuple(
@@ -138,7 +201,8 @@ class MPR:
                 preprocessor.activate(provider=raster_groups[preprocessor.provider])
             else:
                 preprocessor.activate(provider=feature_class[preprocessor.provider])
-        for subregionaliser in self.subregionalisers:
+        for node in dependencies.order:
+            subregionaliser = self.subregionalisers[node]
             if isinstance(subregionaliser, regionalising.RasterSubregionaliser):
                 subregionaliser.activate(
                     provider=raster_groups[subregionaliser.provider]
@@ -147,16 +211,26 @@ class MPR:
                 subregionaliser.activate(
                     provider=feature_class[subregionaliser.provider]
                 )
+        index = transforming.ParameterIndex(hp=self.hp)
         for task in self.tasks:
             if isinstance(task, RasterElementTask | RasterSubunitTask):
-                task.activate(hp=self.hp, provider=raster_groups[task.provider])
+                task.activate(
+                    hp=self.hp, provider=raster_groups[task.provider], index=index
+                )
             else:
-                task.activate(hp=self.hp, provider=feature_class[task.provider])
+                task.activate(
+                    hp=self.hp, provider=feature_class[task.provider], index=index
+                )
+        for task, primary in zip(self.tasks, dependencies.task2primary):
+            if primary is not None:
+                task.share_regionaliser(self.tasks[primary])
         self.calibrator.activate(
             hp=self.hp,
             tasks=self.tasks,
             subregionalisers=self.subregionalisers,
             loggers=self.loggers,
+            execution=self.execution,
+            dependencies=dependencies,
         )
         for logger in self.loggers:
             logger.activate(hp=self.hp, calibrator=self.calibrator)
@@ -196,6 +270,9 @@ class MPR:
         return tuple(p for p in self.tasks if isinstance(p, type_))
 
     def run(self) -> None:
-        self.calibrator.calibrate()
+        try:
+            self.calibrator.calibrate()
+        finally:
+            self.calibrator.shutdown()
         for writer in self.writers:
             writer.write()
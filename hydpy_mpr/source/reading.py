@@ -154,9 +154,63 @@ def read_geotiff(  # pylint: disable=inconsistent-return-statements
         return RasterFloat(values=values)
 
 
+def read_cell_area(*, filepath: str) -> RasterFloat:
+    """Derive the area of each cell from the georeferencing tags of the given
+    GeoTiff.
+
+    For projected coordinate systems, all cells have the same area (in squared map
+    units).  For geographic coordinate systems, the area of a cell (in m²) depends on
+    the latitudes of its upper and lower boundary and is approximated on a sphere
+    with the radius `EARTH_RADIUS`.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"GeoTiff `{filepath}` does not exist.")
+
+    with tifffile.TiffFile(filepath) as tiff:
+        page = tiff.pages[0]
+        assert isinstance(page, tifffile.TiffPage)
+        shape = (page.imagelength, page.imagewidth)
+        try:
+            scale = page.tags[33550].value  # ModelPixelScaleTag
+            tiepoint = page.tags[33922].value  # ModelTiepointTag
+        except KeyError:
+            raise ValueError(
+                f"GeoTiff `{filepath}` does not define the pixel scale and tiepoint "
+                f"required for calculating cell areas."
+            ) from None
+        keys = page.tags[34735].value if 34735 in page.tags else ()  # GeoKeyDirectory
+
+    # Only keys with values stored directly in the directory are relevant here:
+    key2value = {
+        keys[i]: keys[i + 3] for i in range(4, len(keys), 4) if keys[i + 1] == 0
+    }
+    width, height = float(scale[0]), float(scale[1])
+    if key2value.get(1024) != 2:  # GTModelTypeGeoKey: not geographic
+        return RasterFloat(values=numpy.full(shape, width * height))
+    if (unit := key2value.get(2054, 9102)) != 9102:  # GeogAngularUnitsGeoKey
+        raise ValueError(
+            f"GeoTiff `{filepath}` defines the angular unit `{unit}`, but calculating "
+            f"cell areas is only supported for degrees (`9102`)."
+        )
+    top = float(tiepoint[4]) + float(tiepoint[1]) * height
+    if key2value.get(1025) == 2:  # GTRasterTypeGeoKey: PixelIsPoint
+        top += height / 2.0
+    latitudes = numpy.radians(
+        numpy.clip(top - height * numpy.arange(shape[0] + 1), -90.0, 90.0)
+    )
+    areas = (
+        constants.EARTH_RADIUS**2
+        * numpy.radians(width)
+        * numpy.abs(numpy.diff(numpy.sin(latitudes)))
+    )
+    return RasterFloat(values=numpy.repeat(areas[:, numpy.newaxis], shape[1], axis=1))
+
+
 @dataclasses.dataclass(kw_only=True, repr=False)
 class Dataset(Generic[TypeVarNumber]):
 
+    static: bool = True  # `False` for datasets changing during calibration
+
     @override
     def __eq__(self, other: object) -> bool:
         if isinstance(other, type(self)):
@@ -179,7 +233,7 @@ class Dataset(Generic[TypeVarNumber]):
 
 @dataclasses.dataclass(kw_only=True, repr=False, eq=False)
 class Raster(Dataset[TypeVarNumber]):
-    values: Matrix[TypeVarNumber]
+    values: Matrix[numpy.dtype[TypeVarNumber]]
     shape: tuple[int, int] = dataclasses.field(init=False)
     mask: MatrixBool = dataclasses.field(init=False)
 
@@ -209,7 +263,7 @@ class RasterFloat(Raster[float64]):
 
 @dataclasses.dataclass(kw_only=True, repr=False, eq=False)
 class Attribute(Dataset[TypeVarNumber]):
-    values: Vector[TypeVarNumber]
+    values: Vector[numpy.dtype[TypeVarNumber]]
     shape: int = dataclasses.field(init=False)
     mask: VectorBool = dataclasses.field(init=False)
 
@@ -271,6 +325,8 @@ class Provider(Generic[TypeVarDatasetInt, TypeVarDataset]):
 class RasterGroup(Provider[RasterInt, RasterInt | RasterFloat]):
 
     shape: tuple[int, int] = dataclasses.field(init=False)
+    # paths of all raster files available in the raster group directory:
+    name2filepath: dict[NameDataset, str] = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
 
@@ -281,6 +337,10 @@ class RasterGroup(Provider[RasterInt, RasterInt | RasterFloat]):
             )
         filenames = _extract_tiffiles(os.listdir(dirpath))
         rastername2filename = {self.extract_name_dataset(fn): fn for fn in filenames}
+        self.name2filepath = {
+            name: os.path.join(dirpath, filename)
+            for name, filename in rastername2filename.items()
+        }
 
         # Read the element ID raster:
         if (element_id := NameDataset(constants.ELEMENT_ID)) in rastername2filename:
@@ -320,6 +380,31 @@ class RasterGroup(Provider[RasterInt, RasterInt | RasterFloat]):
         # Read the mapping table:
         self.id2element = read_mapping_table(mprpath=self.mprpath)
 
+    def read_dataset(self, name: NameDataset, /) -> RasterInt | RasterFloat:
+        """Return the raster with the given name, reading it if not already done,
+        e.g. for weighting cells during upscaling.
+
+        If the raster group directory does not provide a `cell_area` raster file,
+        the cell areas are derived from the georeferencing of the element ID raster
+        file (see function `read_cell_area`).
+        """
+        if (raster := self.name2dataset.get(name)) is None:
+            if (name == constants.CELL_AREA) and (name not in self.name2filepath):
+                raster = read_cell_area(
+                    filepath=self.name2filepath[NameDataset(ELEMENT_ID)]
+                )
+                self.name2dataset[name] = raster
+                return raster
+            if (filepath := self.name2filepath.get(name)) is None:
+                raise FileNotFoundError(
+                    f"The raster group directory of raster group `{self.name}` does "
+                    f"not contain a file defining geodata for raster `{name}`."
+                )
+            raster = read_geotiff(filepath=filepath)
+            self._check_shape(raster.shape, name)
+            self.name2dataset[name] = raster
+        return raster
+
     def _check_shape(self, shape: tuple[int, int], name: NameDataset, /) -> None:
         if self.shape != shape:
             raise TypeError(
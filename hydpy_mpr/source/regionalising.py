@@ -5,6 +5,7 @@ import dataclasses
 import numpy
 
 from hydpy_mpr.source import equations
+from hydpy_mpr.source import expressions
 from hydpy_mpr.source import reading
 from hydpy_mpr.source.typing_ import *
 
@@ -39,6 +40,14 @@ class Regionaliser(
     ],
     abc.ABC,
 ):
+    # coefficient-independent terms calculated by `get_static_terms` for all cells:
+    static_terms: dict[str, VectorFloat] = dataclasses.field(init=False)
+
+    @override
+    def activate(self, *, provider: TypeVarProvider) -> None:
+        super().activate(provider=provider)
+        self.static_terms = self.get_static_terms(**self.static_inputs)
+
     @property
     def coefficients(self) -> Sequence[Coefficient]:
         return tuple(
@@ -47,10 +56,69 @@ class Regionaliser(
             if isinstance(value := getattr(self, field.name), Coefficient)
         )
 
+    @property
+    def static_inputs(self) -> dict[str, VectorFloat]:
+        """The flat values of all input datasets that do not change during
+        calibration (named like the `dataset_` fields without prefix)."""
+        return {
+            name.removeprefix("dataset_"): dataset.values.reshape(-1)
+            for name, dataset in self.inputs.items()
+            if dataset.static
+        }
+
     @abc.abstractmethod
     def apply_coefficients(self) -> None:
         pass
 
+    def get_static_terms(self, **inputs: VectorFloat) -> dict[str, VectorFloat]:
+        """Calculate coefficient-independent terms from the given flat values of the
+        static input datasets (named like the `dataset_` fields without prefix).
+
+        Overriding this method allows calculating such terms only once instead of
+        in each calibration step.  Method `activate` stores the terms of all cells
+        in `static_terms`.  In fused mode, the upscaler calculates the terms of its
+        relevant cells once and passes them to `calculate` together with the
+        inputs, so their names must differ from the input names.
+        """
+        return {}
+
+    def calculate(self, **inputs: VectorFloat) -> VectorFloat:
+        """Calculate the output values of individual cells from the given input values
+        (named like the `dataset_` fields without prefix) and, if available, the
+        corresponding static terms (see `get_static_terms`).
+
+        Overriding this method allows tasks to run in fused mode.
+        """
+        raise NotImplementedError(
+            f"Regionaliser `{self.name}` does not support cell-wise calculations."
+        )
+
+    @property
+    def fusable(self) -> bool:
+        return type(self).calculate is not Regionaliser.calculate
+
+    def get_basis(self) -> Mapping[str, VectorFloat | MatrixFloat | float]:
+        """Return the coefficient-independent basis fields of regionalisers whose
+        output is a linear combination of them.
+
+        Overriding this method and `get_weights` allows tasks to run in linear mode.
+        """
+        raise NotImplementedError(
+            f"Regionaliser `{self.name}` does not define any basis fields."
+        )
+
+    def get_weights(self) -> Mapping[str, float]:
+        """Return the current weights of the basis fields returned by `get_basis`."""
+        raise NotImplementedError(
+            f"Regionaliser `{self.name}` does not define any basis weights."
+        )
+
+    @property
+    def affine(self) -> bool:
+        return (type(self).get_basis is not Regionaliser.get_basis) and (
+            type(self).get_weights is not Regionaliser.get_weights
+        )
+
 
 @dataclasses.dataclass(kw_only=True, repr=False)
 class RasterRegionaliser(
@@ -83,7 +151,8 @@ class Subregionaliser(
         self.mask[:, :] = True
         for input_ in self.inputs.values():
             self.mask *= input_.mask
-        raster = reading.RasterFloat(values=self.output)
+        self.antimask = ~self.mask
+        raster = reading.RasterFloat(values=self.output, static=False)
         raster.mask = self.mask.copy()
         self.provider_.name2dataset[NameDataset(self.name)] = raster
 
@@ -106,3 +175,152 @@ class RasterSubregionaliser(
     abc.ABC,
 ):
     pass
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class ExpressionRegionaliser(
+    Regionaliser[
+        TypeVarProvider, TypeVarDatasetFloat, TypeVarArrayBool, TypeVarArrayFloat
+    ],
+    abc.ABC,
+):
+    """Regionaliser defined by the class attribute `EXPRESSION`, which refers to the
+    `source_` and `coef_` fields by their names without prefix (e.g.
+    `"20.0 * (const + factor_clay * clay)"`)."""
+
+    EXPRESSION: ClassVar[str]
+
+    expression: expressions.Expression = dataclasses.field(init=False)
+    derived: list[VectorFloat | None] = dataclasses.field(init=False)
+    _inputs: dict[str, VectorFloat] = dataclasses.field(init=False)
+    _name2coefficient: tuple[tuple[str, Coefficient], ...] = dataclasses.field(
+        init=False
+    )
+    _name2value: dict[str, float] = dataclasses.field(init=False)
+
+    @override
+    def activate(self, *, provider: TypeVarProvider) -> None:
+        # the expression must be compiled before `get_static_terms` is called:
+        name2dataset = {
+            name.removeprefix("source_"): provider.name2dataset[datasetname]
+            for name, datasetname in self.fieldname2datasetname.items()
+        }
+        self._name2coefficient = tuple(self.name2coefficient.items())
+        self._name2value = {name: numpy.nan for name, _ in self._name2coefficient}
+        self.expression = expressions.Expression(
+            source=self.EXPRESSION,
+            datasets=tuple(name2dataset),
+            coefficients=tuple(self._name2value),
+            static=tuple(n for n, d in name2dataset.items() if d.static),
+        )
+        super().activate(provider=provider)
+        self._inputs = {
+            name.removeprefix("dataset_"): dataset.values.reshape(-1)
+            for name, dataset in self.inputs.items()
+        }
+        derived = self._select_derived(self.static_terms)
+        assert derived is not None
+        self.derived = derived
+
+    @property
+    def name2coefficient(self) -> Mapping[str, Coefficient]:
+        return {
+            field.name.removeprefix("coef_"): value
+            for field in dataclasses.fields(self)
+            if field.init
+            and isinstance(value := getattr(self, field.name), Coefficient)
+        }
+
+    @override
+    def apply_coefficients(self) -> None:
+        self.expression.evaluate(
+            inputs=self._inputs,
+            coefficients=self._get_values(),
+            output=self.output.reshape(-1),
+            derived=self.derived,
+        )
+
+    @override
+    def get_static_terms(self, **inputs: VectorFloat) -> dict[str, VectorFloat]:
+        """Return the derived datasets still required by `Expression.evaluate`,
+        named `derived_0`, `derived_1`, and so on."""
+        return {
+            f"derived_{idx}": values
+            for idx, values in enumerate(self.expression.derive(inputs=inputs))
+            if values is not None
+        }
+
+    @override
+    def calculate(self, **inputs: VectorFloat) -> VectorFloat:
+        size = len(next(iter(inputs.values()))) if inputs else self.output.size
+        output = numpy.empty(size)
+        self.expression.evaluate(
+            inputs=inputs,
+            coefficients=self._get_values(),
+            output=output,
+            derived=self._select_derived(inputs),
+        )
+        return output
+
+    def _select_derived(
+        self, terms: Mapping[str, VectorFloat], /
+    ) -> list[VectorFloat | None] | None:
+        """Select the derived datasets from the given static terms in the order
+        expected by `Expression.evaluate` (`None` if any is missing)."""
+        derived = [
+            terms.get(f"derived_{idx}")
+            for idx in range(len(self.expression.static_instructions))
+        ]
+        if sum(d is not None for d in derived) < len(self.static_terms):
+            return None
+        return derived
+
+    def _get_values(self) -> Mapping[str, float]:
+        name2value = self._name2value
+        for name, coefficient in self._name2coefficient:
+            name2value[name] = coefficient.value
+        return name2value
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class RasterExpressionRegionaliser(
+    ExpressionRegionaliser[
+        reading.RasterGroup, reading.RasterFloat, MatrixBool, MatrixFloat
+    ],
+    RasterRegionaliser,
+    abc.ABC,
+):
+    pass
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class AttributeExpressionRegionaliser(
+    ExpressionRegionaliser[
+        reading.FeatureClass, reading.AttributeFloat, VectorBool, VectorFloat
+    ],
+    AttributeRegionaliser,
+    abc.ABC,
+):
+    pass
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class RasterExpressionSubregionaliser(
+    ExpressionRegionaliser[
+        reading.RasterGroup, reading.RasterFloat, MatrixBool, MatrixFloat
+    ],
+    RasterSubregionaliser,
+    abc.ABC,
+):
+    pass
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class AttributeExpressionSubregionaliser(
+    ExpressionRegionaliser[
+        reading.FeatureClass, reading.AttributeFloat, VectorBool, VectorFloat
+    ],
+    AttributeSubregionaliser,
+    abc.ABC,
+):
+    pass
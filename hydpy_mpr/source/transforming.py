@@ -4,12 +4,105 @@ import dataclasses
 import warnings
 
 import hydpy
+from hydpy.core import devicetools
+from hydpy.core import modeltools
+from hydpy.core import parametertools
 import numpy
 
 from hydpy_mpr.source import upscaling
 from hydpy_mpr.source.typing_ import *
 
 
+@dataclasses.dataclass(kw_only=True, repr=False)
+class ParameterIndex:
+    """Cache for looking up the control parameters of all elements, shared by all
+    transformers of an MPR run.
+
+    If an element handles multiple (sub)models with the requested name, the one
+    closest to the main model wins, and ties are resolved by the alphabetical order
+    of their paths (like `model.aetmodel`).  Instead of a model name, one can also
+    pass such a path to select a specific (sub)model.
+
+    The index also keeps track of which transformers write to which parameters.  When
+    one transformer modifies a parameter, all other transformers writing to it forget
+    their last values for it, so that overlapping transformers (like an element-wide
+    default followed by a subunit-specific override) keep their relative priority.
+    """
+
+    hp: hydpy.HydPy
+    element2models: dict[str, tuple[tuple[str, modeltools.Model], ...]] = (
+        dataclasses.field(init=False, default_factory=dict)
+    )
+    key2element2parameter: dict[
+        tuple[str | None, type[parametertools.Parameter]],
+        dict[str, parametertools.Parameter],
+    ] = dataclasses.field(init=False, default_factory=dict)
+    # all transformers writing to a parameter object (identified by its `id`):
+    parameter2transformers: dict[int, list[Transformer[Any, Any]]] = dataclasses.field(
+        init=False, default_factory=dict
+    )
+
+    def get_models(
+        self, element: devicetools.Element, /
+    ) -> tuple[tuple[str, modeltools.Model], ...]:
+        """Return all (sub)models of the given element and their paths, sorted by
+        priority."""
+        if (models := self.element2models.get(element.name)) is None:
+            path2model = element.model.find_submodels(include_mainmodel=True)
+            models = tuple(
+                sorted(path2model.items(), key=lambda i: (i[0].count("."), i[0]))
+            )
+            self.element2models[element.name] = models
+        return models
+
+    def get_parameters(
+        self, *, model: str | None, parameter: type[TypeVarParameter]
+    ) -> Mapping[str, TypeVarParameter]:
+        """Return the selected control parameters of all elements handling a
+        (sub)model with the given name or path (or of all main models, if no name is
+        given).
+
+        Without a name, main models lacking the parameter are skipped.  A named
+        (sub)model lacking the parameter or an empty result raises a `ValueError`.
+        """
+        key = (model, parameter)
+        if (element2parameter := self.key2element2parameter.get(key)) is None:
+            element2parameter = {}
+            for element in self.hp.elements:
+                name = element.model.name if model is None else model
+                for path, submodel in self.get_models(element):
+                    if name in (submodel.name, path):
+                        control = submodel.parameters.control
+                        if parameter.name in control.names:
+                            instance = control[parameter.name]
+                            assert isinstance(instance, parameter)
+                            element2parameter[element.name] = instance
+                        elif model is not None:
+                            raise ValueError(
+                                f"The (sub)model `{model}` of element "
+                                f"`{element.name}` does not define a control "
+                                f"parameter named `{parameter.name}`."
+                            )
+                        # Without a model name, silently skip elements whose main
+                        # model lacks the parameter (e.g. stream elements):
+                        break
+            if not element2parameter:
+                raise ValueError(
+                    f"No element handles a "
+                    f"{'main model' if model is None else f'(sub)model `{model}`'} "
+                    f"that defines a control parameter named `{parameter.name}`."
+                )
+            self.key2element2parameter[key] = element2parameter
+        return cast(Mapping[str, TypeVarParameter], element2parameter)
+
+    def register(self, transformer: Transformer[Any, Any], /) -> None:
+        """Register the given transformer as a writer of all its parameters."""
+        for key in transformer.parameter2entries:
+            transformers = self.parameter2transformers.setdefault(key, [])
+            if transformer not in transformers:
+                transformers.append(transformer)
+
+
 @dataclasses.dataclass(kw_only=True, repr=False)
 class Transformer(Generic[TypeVarUpscaler, TypeVarParameter], abc.ABC):
 
@@ -19,46 +112,159 @@ class Transformer(Generic[TypeVarUpscaler, TypeVarParameter], abc.ABC):
     hp: hydpy.HydPy = dataclasses.field(init=False)
     upscaler: TypeVarUpscaler = dataclasses.field(init=False)
     element2parameter: Mapping[str, TypeVarParameter] = dataclasses.field(init=False)
+    id2parameter: Sequence[tuple[int64, TypeVarParameter]] = dataclasses.field(
+        init=False
+    )
+    index: ParameterIndex = dataclasses.field(init=False)
+    # the entries of `id2parameter` per parameter object (identified by its `id`):
+    parameter2entries: dict[int, list[int]] = dataclasses.field(init=False)
+    # IDs of the elements whose last values were forgotten due to other transformers
+    # modifying the same parameters (see `forget`):
+    forgotten_ids: set[int64] = dataclasses.field(init=False, default_factory=set)
+    # names of the elements with parameter values changed by the last call of
+    # `modify_parameters`:
+    changed_elements: set[str] = dataclasses.field(init=False, default_factory=set)
 
-    def activate(self, *, hp: hydpy.HydPy, upscaler: TypeVarUpscaler) -> None:
+    def activate(
+        self,
+        *,
+        hp: hydpy.HydPy,
+        upscaler: TypeVarUpscaler,
+        index: ParameterIndex | None = None,
+    ) -> None:
         self.hp = hp
         self.upscaler = upscaler
-        if self.selection is None:
-            elements = hp.elements
-        else:
-            elements = self.selection.elements
-        element2parameter = {}
-        for element in elements:
-            if (name := self.model) is None:
-                name = element.model.name
-            for model in element.model.find_submodels(include_mainmodel=True).values():
-                if name == model.name:
-                    parameter = model.parameters.control[self.parameter.name]
-                    assert isinstance(parameter, self.parameter)
-                    element2parameter[element.name] = parameter
-                    break  # ToDo: What if multiple submodels are of the same type?
+        if index is None:
+            index = ParameterIndex(hp=hp)
+        self.index = index
+        element2parameter = index.get_parameters(
+            model=self.model, parameter=self.parameter
+        )
+        if self.selection is not None:
+            element2parameter = {
+                element.name: parameter
+                for element in self.selection.elements
+                if (parameter := element2parameter.get(element.name)) is not None
+            }
         self.element2parameter = element2parameter
+        self.id2parameter = tuple(
+            (id_, element2parameter[name])
+            for id_, name in upscaler.regionaliser.provider_.id2element.items()
+            if name in element2parameter
+        )
+
+    def _register(self) -> None:
+        """Register the final `id2parameter` entries at the parameter index (to be
+        called at the end of `activate`)."""
+        self.parameter2entries = {}
+        for entry, (_, parameter) in enumerate(self.id2parameter):
+            self.parameter2entries.setdefault(id(parameter), []).append(entry)
+        self.forgotten_ids.clear()
+        self.index.register(self)
 
     @abc.abstractmethod
     def modify_parameters(self) -> None:
         pass
 
+    @abc.abstractmethod
+    def invalidate(self) -> None:
+        """Forget the previously applied upscaled values so that the next call of
+        `modify_parameters` modifies all parameters, e.g. after resetting them."""
+
+    def forget(self, parameter: parametertools.Parameter, /) -> None:
+        """Forget the previously applied upscaled values of the given parameter so
+        that the next call of `modify_parameters` modifies it again, e.g. after
+        another transformer overwrote it."""
+        for entry in self.parameter2entries.get(id(parameter), ()):
+            self.forgotten_ids.add(self.id2parameter[entry][0])
+            self._forget_entry(entry)
+
+    @abc.abstractmethod
+    def _forget_entry(self, entry: int, /) -> None:
+        """Forget the previously applied upscaled values of the given entry of
+        `id2parameter`."""
+
+    def _notify(self, parameter: parametertools.Parameter, /) -> None:
+        """Make all other transformers writing to the given parameter forget their
+        previously applied values for it."""
+        transformers = self.index.parameter2transformers.get(id(parameter), ())
+        if len(transformers) > 1:
+            for transformer in transformers:
+                if transformer is not self:
+                    transformer.forget(parameter)
+
 
 @dataclasses.dataclass(kw_only=True, repr=False)
 class ElementTransformer(
     Transformer[upscaling.ElementUpscaler[Any, Any], TypeVarParameter], abc.ABC
 ):
 
+    # positions of the elements of `id2parameter` within the upscaler's results:
+    positions: VectorInt = dataclasses.field(init=False)
+    # the (transformed) values last passed to `modify_parameter`:
+    previous: VectorFloat = dataclasses.field(init=False)
+
+    @override
+    def activate(
+        self,
+        *,
+        hp: hydpy.HydPy,
+        upscaler: upscaling.ElementUpscaler[Any, Any],
+        index: ParameterIndex | None = None,
+    ) -> None:
+        super().activate(hp=hp, upscaler=upscaler, index=index)
+        ids = numpy.fromiter((id_ for id_, _ in self.id2parameter), dtype=int64)
+        self.positions = upscaler.get_positions(ids)
+        self.previous = numpy.full(len(self.positions), numpy.nan)
+        self._register()
+
     @override
     def modify_parameters(self) -> None:
-        element2parameter = self.element2parameter
-        for name, value in self.upscaler.name2value.items():
-            if (parameter := element2parameter.get(name)) is not None:
-                self.modify_parameter(parameter=parameter, value=value)
+        values = self.transform(self.upscaler.values[self.positions])
+        previous = self.previous
+        changed_ids = self.upscaler.changed_ids
+        id2element = self.upscaler.regionaliser.provider_.id2element
+        changed_elements = self.changed_elements
+        changed_elements.clear()
+        forgotten_ids = self.forgotten_ids
+        id2parameter = self.id2parameter
+        modified = numpy.flatnonzero(~numpy.isnan(values) & (values != previous))
+        for i in modified.tolist():
+            id_, parameter = id2parameter[i]
+            if (
+                (changed_ids is not None)
+                and (id_ not in changed_ids)
+                and (id_ not in forgotten_ids)
+            ):
+                continue
+            self.modify_parameter(parameter=parameter, value=values[i])
+            self._notify(parameter)
+            previous[i] = values[i]
+            changed_elements.add(id2element[id_])
+        forgotten_ids.clear()
+
+    @override
+    def invalidate(self) -> None:
+        self.previous[:] = numpy.nan
+
+    @override
+    def _forget_entry(self, entry: int, /) -> None:
+        self.previous[entry] = numpy.nan
+
+    def transform(self, values: VectorFloat) -> VectorFloat:
+        """Convert the upscaled values of all elements (ordered like `id2parameter`)
+        in one go before `modify_parameter` receives them element by element.
+
+        The default implementation returns the given values unchanged.  Override it
+        to apply array-based formulas instead of calculating each value separately.
+        """
+        return values
 
     @abc.abstractmethod
     def modify_parameter(self, parameter: TypeVarParameter, value: float64) -> None:
-        pass
+        """Modify the parameter based on the given value, which is never `nan` and
+        differs from the value passed for the same parameter the last time (unless
+        another transformer modified the parameter in the meantime)."""
 
 
 @dataclasses.dataclass(kw_only=True, repr=False)
@@ -66,44 +272,130 @@ class SubunitTransformer(
     Transformer[upscaling.SubunitUpscaler[Any, Any], TypeVarParameter], abc.ABC
 ):
 
+    # per entry of `id2parameter`, the positions of the relevant upscaled values
+    # within the upscaler's results and the parameter indices they belong to:
+    positions: tuple[VectorInt, ...] = dataclasses.field(init=False)
+    targets: tuple[VectorInt, ...] = dataclasses.field(init=False)
+    # the upscaled values last passed to `modify_parameter` (aligned with the
+    # upscaler's results):
+    previous: VectorFloat = dataclasses.field(init=False)
+
+    @override
+    def activate(
+        self,
+        *,
+        hp: hydpy.HydPy,
+        upscaler: upscaling.SubunitUpscaler[Any, Any],
+        index: ParameterIndex | None = None,
+    ) -> None:
+        super().activate(hp=hp, upscaler=upscaler, index=index)
+        id2row: dict[int64, int] = {id_: row for row, id_ in enumerate(upscaler.ids)}
+        self.id2parameter = tuple(
+            (id_, parameter) for id_, parameter in self.id2parameter if id_ in id2row
+        )
+        positions, targets = [], []
+        for id_, parameter in self.id2parameter:
+            row = id2row[id_]
+            segment = numpy.arange(upscaler.offsets[row], upscaler.offsets[row + 1])
+            idxs = upscaler.idxs[segment]
+            valid = (idxs >= 0) * (idxs < parameter.shape[0])
+            for idx in idxs[~valid]:
+                self._warn_index_error(parameter, idx)
+            positions.append(segment[valid])
+            targets.append(idxs[valid])
+        self.positions = tuple(positions)
+        self.targets = tuple(targets)
+        self.previous = numpy.full(len(upscaler.values), numpy.nan)
+        self._register()
+
     @override
     def modify_parameters(self) -> None:
-        element2parameter = self.element2parameter
-        for name, value in self.upscaler.name2idx2value.items():
-            if (parameter := element2parameter.get(name)) is not None:
-                self.modify_parameter(parameter=parameter, values=value)
+        values, previous = self.upscaler.values, self.previous
+        modified = ~numpy.isnan(values) & (values != previous)
+        changed_ids = self.upscaler.changed_ids
+        id2element = self.upscaler.regionaliser.provider_.id2element
+        changed_elements = self.changed_elements
+        changed_elements.clear()
+        forgotten_ids = self.forgotten_ids
+        for (id_, parameter), positions, targets in zip(
+            self.id2parameter, self.positions, self.targets
+        ):
+            if (
+                (changed_ids is not None)
+                and (id_ not in changed_ids)
+                and (id_ not in forgotten_ids)
+            ):
+                continue
+            selection = modified[positions]
+            if numpy.any(selection):
+                positions = positions[selection]
+                self.modify_parameter(
+                    parameter=parameter,
+                    idxs=targets[selection],
+                    values=values[positions],
+                )
+                self._notify(parameter)
+                previous[positions] = values[positions]
+                changed_elements.add(id2element[id_])
+        forgotten_ids.clear()
+
+    @override
+    def invalidate(self) -> None:
+        self.previous[:] = numpy.nan
+
+    @override
+    def _forget_entry(self, entry: int, /) -> None:
+        self.previous[self.positions[entry]] = numpy.nan
 
     @abc.abstractmethod
     def modify_parameter(
-        self, parameter: TypeVarParameter, values: Mapping[int64, float64]
+        self, parameter: TypeVarParameter, idxs: VectorInt, values: VectorFloat
     ) -> None:
-        pass
+        """Modify the parameter's values at the given subunit indices (which are all
+        within the parameter's bounds) based on the given values, which are never
+        `nan` and differ from the values passed for the same subunits the last
+        time (unless another transformer modified the parameter in the meantime)."""
+
+    @staticmethod
+    def _warn_index_error(parameter: TypeVarParameter, idx: int64) -> None:
+        warnings.warn(
+            f"There seems to be a configuration error for parameter "
+            f"`{type(parameter).__name__}` of element "
+            f"`{parameter.subpars.pars.model.element.name}`: index `{idx}` is out of "
+            f"bounds `(0, {parameter.shape[0]})`."
+        )
 
 
 class ElementIdentityTransformer(ElementTransformer[TypeVarParameter]):
+    """Transformer that assigns the upscaled values to the parameters unchanged.
+
+    For efficiency, `ElementIdentityTransformer` does not pass the values through
+    the parameters' `__call__` method.  Instead, `transform` applies the
+    parameter's time factor to the values of all elements at once, and
+    `modify_parameter` writes each value in place and trims the parameter.  The
+    result agrees with calling the parameter with the upscaled value (which also
+    holds for time-dependent parameters), but the other features of `__call__`
+    (like keyword arguments or auxiliary files) do not apply.
+    """
+
+    @override
+    def transform(self, values: VectorFloat) -> VectorFloat:
+        return self.parameter.apply_timefactor(values)
 
     @override
     def modify_parameter(self, parameter: TypeVarParameter, value: float64) -> None:
-        # ToDo: parameterstep
-        if not numpy.isnan(value):
-            parameter(value)
+        if parameter.NDIM:
+            parameter.values[...] = value
+        else:
+            parameter.value = value
+        parameter.trim()
 
 
 class SubunitIdentityTransformer(SubunitTransformer[TypeVarParameter]):
 
     @override
     def modify_parameter(
-        self, parameter: TypeVarParameter, values: Mapping[int64, float64]
+        self, parameter: TypeVarParameter, idxs: VectorInt, values: VectorFloat
     ) -> None:
         # ToDo: parameterstep
-        for idx, value in values.items():
-            if not numpy.isnan(value):
-                try:
-                    parameter.values[idx] = value
-                except IndexError:
-                    warnings.warn(
-                        f"There seems to be a configuration error for parameter "
-                        f"`{type(parameter).__name__}` of element "
-                        f"`{parameter.subpars.pars.model.element.name}`: index "
-                        f"`{idx}` is out of bounds `(0, {parameter.shape[0]})`."
-                    )
+        parameter.values[idxs] = values
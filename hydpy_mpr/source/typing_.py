@@ -8,10 +8,12 @@ from typing import (
     cast,
     ClassVar,
     Generic,
+    Hashable,
     Iterable,
     Iterator,
     Literal,
     Mapping,
+    MutableMapping,
     NewType,
     NoReturn,
     overload,
@@ -34,7 +36,7 @@ from hydpy.core.typingtools import (
     VectorInt,
 )
 from numpy import int64, float64
-from typing_extensions import assert_never, override, Self
+from typing_extensions import assert_never, override, Self, TypeIs
 
 # type variables
 
@@ -96,7 +98,7 @@ class RasterElementUpscalingFunction(Protocol):
         element_id: MatrixInt,
         mask: MatrixBool,
         output: MatrixFloat,
-        id2value: dict[int64, float64],
+        id2value: MutableMapping[int64, float64],
     ) -> None: ...
 
 
@@ -108,24 +110,63 @@ class RasterSubunitUpscalingFunction(Protocol):
         subunit_id: MatrixInt,
         mask: MatrixBool,
         output: MatrixFloat,
-        id2idx2value: dict[int64, dict[int64, float64]],
+        id2idx2value: Mapping[int64, MutableMapping[int64, float64]],
+    ) -> None: ...
+
+
+class RasterElementUpscalingKernel(Protocol):
+    def __call__(
+        self,
+        *,
+        element_id: MatrixInt,
+        mask: MatrixBool,
+        output: MatrixFloat,
+        ids: VectorInt,
+        values: VectorFloat,
+    ) -> None: ...
+
+
+class RasterSubunitUpscalingKernel(Protocol):
+    def __call__(
+        self,
+        *,
+        element_id: MatrixInt,
+        subunit_id: MatrixInt,
+        mask: MatrixBool,
+        output: MatrixFloat,
+        ids: VectorInt,
+        offsets: VectorInt,
+        idxs: VectorInt,
+        values: VectorFloat,
     ) -> None: ...
 
 
 # type aliases
 
-AttributeUpscalingOption: TypeAlias = (  # note: synchronise with `constants.py`
+# note: synchronise with `constants.py`
+MeanUpscalingOption: TypeAlias = Literal[
+    "arithmetic_mean", "geometric_mean", "harmonic_mean"
+]
+PowerMeanUpscalingOption: TypeAlias = MeanUpscalingOption | Literal["power_mean"]
+OrderStatisticUpscalingOption: TypeAlias = Literal[
+    "minimum", "maximum", "median", "quantile"
+]
+
+AttributeUpscalingOption: TypeAlias = (
     AttributeUpscalingFunction
-    | Literal["arithmetic_mean", "geometric_mean", "harmonic_mean"]
+    | PowerMeanUpscalingOption
+    | OrderStatisticUpscalingOption
 )
-RasterElementUpscalingOption: TypeAlias = (  # note: synchronise with `constants.py`
+RasterElementUpscalingOption: TypeAlias = (
     RasterElementUpscalingFunction
-    | Literal["arithmetic_mean", "geometric_mean", "harmonic_mean"]
+    | PowerMeanUpscalingOption
+    | OrderStatisticUpscalingOption
 )
 
-RasterSubunitUpscalingOption: TypeAlias = (  # note: synchronise with `constants.py`
+RasterSubunitUpscalingOption: TypeAlias = (
     RasterSubunitUpscalingFunction
-    | Literal["arithmetic_mean", "geometric_mean", "harmonic_mean"]
+    | PowerMeanUpscalingOption
+    | OrderStatisticUpscalingOption
 )
 
 MappingTable: TypeAlias = Mapping[int64, str]
@@ -164,6 +205,7 @@ __all__ = [
     "FilepathGeopackage",
     "float64",
     "Generic",
+    "Hashable",
     "int64",
     "Iterable",
     "Iterator",
@@ -174,24 +216,31 @@ __all__ = [
     "MatrixBool",
     "MatrixFloat",
     "MatrixInt",
+    "MeanUpscalingOption",
+    "MutableMapping",
     "NameDataset",
     "NameEquation",
     "NameProvider",
     "NoReturn",
+    "OrderStatisticUpscalingOption",
     "overload",
     "override",
+    "PowerMeanUpscalingOption",
     "Vector",
     "VectorBool",
     "VectorFloat",
     "VectorInt",
     "RasterElementUpscalingFunction",
+    "RasterElementUpscalingKernel",
     "RasterElementUpscalingOption",
     "RasterSubunitUpscalingFunction",
+    "RasterSubunitUpscalingKernel",
     "RasterSubunitUpscalingOption",
     "Self",
     "Sequence",
     "Tasks",
     "TypeAlias",
+    "TypeIs",
     "TYPE_CHECKING",
     "TypeVar",
     "TypeVarArrayBool",
@@ -10,12 +10,96 @@ from hydpy_mpr.source import regionalising
 from hydpy_mpr.source import upscaling_helpers
 from hydpy_mpr.source.typing_ import *
 
+# predefined upscaling functions that average values and that select values:
+MEANS: tuple[MeanUpscalingOption, ...] = (
+    constants.UP_A,
+    constants.UP_G,
+    constants.UP_H,
+)
+POWER_MEANS: tuple[PowerMeanUpscalingOption, ...] = (*MEANS, constants.UP_P)
+ORDER_STATISTICS: tuple[OrderStatisticUpscalingOption, ...] = (
+    constants.UP_MIN,
+    constants.UP_MAX,
+    constants.UP_MED,
+    constants.UP_Q,
+)
+
+
+def is_mean(function: object, /) -> TypeIs[MeanUpscalingOption]:
+    """Tell whether the given upscaling function is one of the predefined means."""
+    return function in MEANS
+
+
+def is_power_mean(function: object, /) -> TypeIs[PowerMeanUpscalingOption]:
+    """Tell whether the given upscaling function is one of the predefined means
+    or the generalised power mean."""
+    return function in POWER_MEANS
+
+
+def is_order_statistic(function: object, /) -> TypeIs[OrderStatisticUpscalingOption]:
+    """Tell whether the given upscaling function is one of the predefined order
+    statistics."""
+    return function in ORDER_STATISTICS
+
+
+def sort_by_group(
+    groups: VectorInt, nmbs: VectorFloat, /
+) -> tuple[VectorInt, VectorInt]:
+    """Return the stable order that sorts the given cell groups and the boundaries
+    of the resulting group segments."""
+    order = numpy.argsort(groups, kind="stable")
+    segments = numpy.zeros(len(nmbs) + 1, dtype=int64)
+    segments[1:] = numpy.cumsum(nmbs)
+    return order, segments
+
+
+def calculate_order_statistic(
+    *,
+    function: OrderStatisticUpscalingOption,
+    quantile: float,
+    output: VectorFloat,
+    cells: VectorInt,
+    segments: VectorInt,
+) -> VectorFloat:
+    """Select the minimum, maximum, median, or quantile of each segment of the
+    given group-sorted cells."""
+    values = numpy.empty(len(segments) - 1)
+    match function:
+        case constants.UP_MIN:
+            upscaling_helpers.minimum_for_segments(
+                output=output, cells=cells, segments=segments, values=values
+            )
+        case constants.UP_MAX:
+            upscaling_helpers.maximum_for_segments(
+                output=output, cells=cells, segments=segments, values=values
+            )
+        case constants.UP_MED | constants.UP_Q:
+            upscaling_helpers.quantile_for_segments(
+                output=output,
+                cells=cells,
+                segments=segments,
+                quantile=0.5 if function == constants.UP_MED else quantile,
+                values=values,
+            )
+        case _:
+            assert_never(function)
+    return values
+
+
+def _check_quantile(quantile: float, /) -> None:
+    if not 0.0 <= quantile <= 1.0:
+        raise ValueError(
+            f"The quantile must lie between zero and one, but `{quantile}` is given."
+        )
+
 
 @dataclasses.dataclass(kw_only=True, repr=False)
 class Upscaler(Generic[TypeVarRegionaliser, TypeVarArrayBool], abc.ABC):
 
     regionaliser: TypeVarRegionaliser = dataclasses.field(init=False)
     mask: TypeVarArrayBool = dataclasses.field(init=False)
+    # IDs of the elements affected by the last upscaling (`None` means all):
+    changed_ids: set[int64] | None = dataclasses.field(init=False, default=None)
 
     def activate(self, *, regionaliser: TypeVarRegionaliser) -> None:
         self.regionaliser = regionaliser
@@ -27,18 +111,68 @@ class Upscaler(Generic[TypeVarRegionaliser, TypeVarArrayBool], abc.ABC):
     def scale_up(self) -> None:
         pass
 
+    def invalidate(self) -> None:
+        """Mark all elements as affected, e.g. after resetting parameter values."""
+        self.changed_ids = None
+
+
+class ValueView(MutableMapping[int64, float64]):
+    """Dictionary-like view on (a segment of) an upscaler's result array that maps
+    element IDs or subunit indices to the upscaled values.
+
+    The view neither copies the values nor allows adding or removing keys.  Hence,
+    custom upscaling functions can only update the values of the elements (and
+    subunits) with unmasked cells, which are known after activation.  Assigning a
+    value to any other key raises a `KeyError`.
+    """
+
+    __slots__ = ("_keys", "_key2position", "_array")
+
+    def __init__(self, keys: VectorInt, array: VectorFloat) -> None:
+        self._keys = keys
+        self._key2position: dict[int64, int] = {key: p for p, key in enumerate(keys)}
+        self._array = array
+
+    @override
+    def __getitem__(self, key: int64) -> float64:
+        return cast(float64, self._array[self._key2position[key]])
+
+    @override
+    def __setitem__(self, key: int64, value: float64) -> None:
+        self._array[self._key2position[key]] = value
+
+    @override
+    def __delitem__(self, key: int64) -> NoReturn:
+        raise TypeError("Upscaling results cannot be deleted.")
+
+    @override
+    def __iter__(self) -> Iterator[int64]:
+        return iter(self._keys)
+
+    @override
+    def __len__(self) -> int:
+        return len(self._keys)
+
 
 @dataclasses.dataclass(kw_only=True, repr=False)
 class ElementUpscaler(Upscaler[TypeVarRegionaliser, TypeVarArrayBool], abc.ABC):
 
-    id2value: dict[int64, float64] = dataclasses.field(init=False)
+    # element IDs in the order of the mapping table and their upscaled values:
+    ids: VectorInt = dataclasses.field(init=False)
+    values: VectorFloat = dataclasses.field(init=False)
+    id2value: ValueView = dataclasses.field(init=False)
 
     @override
     def activate(self, *, regionaliser: TypeVarRegionaliser) -> None:
         super().activate(regionaliser=regionaliser)
-        self.id2value = {
-            id_: float64(numpy.nan) for id_ in self.regionaliser.provider_.id2element
-        }
+        self.ids = numpy.fromiter(regionaliser.provider_.id2element, dtype=int64)
+        self.values = numpy.full(len(self.ids), numpy.nan)
+        self.id2value = ValueView(self.ids, self.values)
+
+    def get_positions(self, ids: VectorInt, /) -> VectorInt:
+        """Return the positions of the given element IDs within the result array."""
+        order = numpy.argsort(self.ids)
+        return order[numpy.searchsorted(self.ids, ids, sorter=order)]
 
     @property
     def name2value(self) -> Mapping[str, float64]:
@@ -49,7 +183,19 @@ class ElementUpscaler(Upscaler[TypeVarRegionaliser, TypeVarArrayBool], abc.ABC):
 @dataclasses.dataclass(kw_only=True, repr=False)
 class SubunitUpscaler(Upscaler[TypeVarRegionaliser, TypeVarArrayBool], abc.ABC):
 
-    id2idx2value: dict[int64, dict[int64, float64]] = dataclasses.field(init=False)
+    # CSR-like layout: the values of the `i`-th element (with ID `ids[i]`) are
+    # `values[offsets[i]:offsets[i + 1]]` and belong to the subunit indices
+    # `idxs[offsets[i]:offsets[i + 1]]` (sorted in ascending order):
+    ids: VectorInt = dataclasses.field(init=False)
+    offsets: VectorInt = dataclasses.field(init=False)
+    idxs: VectorInt = dataclasses.field(init=False)
+    values: VectorFloat = dataclasses.field(init=False)
+    id2idx2value: dict[int64, ValueView] = dataclasses.field(init=False)
+    # flat indices of the relevant cells, the result position (group) of each cell,
+    # and the number of cells per group:
+    cells: VectorInt = dataclasses.field(init=False)
+    groups: VectorInt = dataclasses.field(init=False)
+    nmbs: VectorFloat = dataclasses.field(init=False)
 
     @override
     def activate(self, *, regionaliser: TypeVarRegionaliser) -> None:
@@ -59,12 +205,54 @@ class SubunitUpscaler(Upscaler[TypeVarRegionaliser, TypeVarArrayBool], abc.ABC):
             regionaliser.provider_.subunit_id.mask
         )  # ToDo: better error message
 
-        self.id2idx2value = upscaling_helpers.prepare_id2idx2value_for_raster_subunit(
-            ids=numpy.asarray(tuple(regionaliser.provider_.id2element), dtype=int64),
-            element_id=regionaliser.provider_.element_id.values,
-            subunit_id=regionaliser.provider_.subunit_id.values,
-            mask=self.mask,
+        self._prepare_index()
+        self.values = numpy.full(len(self.idxs), numpy.nan)
+        self.id2idx2value = {
+            id_: ValueView(self.idxs[i:j], self.values[i:j])
+            for id_, i, j in zip(self.ids, self.offsets[:-1], self.offsets[1:])
+        }
+
+    def _prepare_index(self) -> None:
+        # Each relevant cell's element position (in the order of the mapping table)
+        # and subunit index are packed into a single 64-bit key, so that one sort
+        # yields the CSR layout, the group of each cell, and the group sizes:
+        provider = self.regionaliser.provider_
+        known = numpy.fromiter(provider.id2element, dtype=int64)
+        cells = numpy.flatnonzero(self.mask)
+        element_id = provider.element_id.values.take(cells)
+        sorter = numpy.argsort(known)
+        positions = numpy.searchsorted(known, element_id, sorter=sorter)
+        rows = sorter[numpy.minimum(positions, len(known) - 1)]
+        valid = known[rows] == element_id
+        cells, rows = cells[valid], rows[valid]
+        subunit_id = provider.subunit_id.values.take(cells)
+        lowest = numpy.min(subunit_id, initial=0)
+        width = numpy.max(subunit_id, initial=0) - lowest + 1
+        keys, groups, nmbs = numpy.unique(
+            rows * width + (subunit_id - lowest),
+            return_inverse=True,
+            return_counts=True,
         )
+        used, starts = numpy.unique(keys // width, return_index=True)
+        self.ids = known[used]
+        self.offsets = numpy.append(starts, len(keys)).astype(int64)
+        self.idxs = keys % width + lowest
+        self.cells = cells
+        self.groups = groups.ravel().astype(int64)
+        self.nmbs = nmbs.astype(float64)
+
+    def get_positions(self, ids: VectorInt, idxs: VectorInt, /) -> VectorInt:
+        """Return the positions of the given pairs of element IDs and subunit
+        indices within the result array."""
+        order = numpy.argsort(self.ids)
+        rows = order[numpy.searchsorted(self.ids, ids, sorter=order)]
+        lowest = min(numpy.min(self.idxs, initial=0), numpy.min(idxs, initial=0))
+        highest = max(numpy.max(self.idxs, initial=0), numpy.max(idxs, initial=0))
+        width = highest - lowest + 1
+        sizes = numpy.diff(self.offsets)
+        keys = numpy.repeat(numpy.arange(len(self.ids)), sizes) * width
+        keys += self.idxs - lowest
+        return numpy.searchsorted(keys, rows * width + (idxs - lowest))
 
     @property
     def name2idx2value(self) -> Mapping[str, Mapping[int64, float64]]:
@@ -122,16 +310,31 @@ class AttributeSubunitUpscaler(
 
 @dataclasses.dataclass(kw_only=True, repr=False)
 class AttributeDefaultUpscaler(AttributeUpscaler):
+    """Upscaler for feature classes.
+
+    The means are weighted by the features' sizes.  The order statistics
+    (`UP_MIN`, `UP_MAX`, `UP_MED`, and `UP_Q`) ignore them and are selected from the
+    features sorted by group during activation.
+    """
+
     function: AttributeUpscalingOption = constants.UP_A
-    _function: AttributeUpscalingFunction = dataclasses.field(init=False)
+    # exponent of the power mean selected by `UP_P`:
+    power: float = 1.0
+    # probability of the quantile selected by `UP_Q`:
+    quantile: float = 0.5
+    _function: AttributeUpscalingFunction | None = dataclasses.field(init=False)
+    # indices of the relevant features sorted by group, the boundaries of the
+    # groups' segments, and the result position of each group:
+    cells: VectorInt = dataclasses.field(init=False)
+    segments: VectorInt = dataclasses.field(init=False)
+    group2position: VectorInt = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
         self._function = self._query_function(self.function)
 
-    @staticmethod
     def _query_function(
-        function: AttributeUpscalingOption,
-    ) -> AttributeUpscalingFunction:
+        self, function: AttributeUpscalingOption
+    ) -> AttributeUpscalingFunction | None:
         match function:
             case constants.UP_A:
                 return numpy.average
@@ -139,13 +342,449 @@ class AttributeDefaultUpscaler(AttributeUpscaler):
                 return stats.hmean  # type: ignore[no-any-return]
             case constants.UP_G:
                 return stats.gmean  # type: ignore[no-any-return]
+            case constants.UP_P:
+                return self._calculate_power_mean
+            case (
+                constants.UP_MIN | constants.UP_MAX | constants.UP_MED | constants.UP_Q
+            ):
+                return None
             case _:
                 return function
 
+    def _calculate_power_mean(
+        self, values: VectorFloat, /, *, weights: VectorFloat
+    ) -> float64:
+        return stats.pmean(  # type: ignore[no-any-return]
+            values, self.power, weights=weights
+        )
+
+    @override
+    def activate(self, *, regionaliser: regionalising.AttributeRegionaliser) -> None:
+        super().activate(regionaliser=regionaliser)
+        _check_quantile(self.quantile)
+        if self._function is None:
+            self._prepare_segments()
+
+    @abc.abstractmethod
+    def _prepare_segments(self) -> None:
+        pass
+
+    def calculate_segments(self) -> VectorFloat:
+        """Select the order statistic of each group's features."""
+        function = self.function
+        assert is_order_statistic(function)
+        return calculate_order_statistic(
+            function=function,
+            quantile=self.quantile,
+            output=self.regionaliser.output,
+            cells=self.cells,
+            segments=self.segments,
+        )
+
 
 @dataclasses.dataclass(kw_only=True, repr=False)
 class RasterDefaultUpscaler(RasterUpscaler):
-    pass
+
+    function: RasterElementUpscalingOption | RasterSubunitUpscalingOption
+    incremental: bool = False
+    refresh: int = 100
+    # sort the relevant cells by group and aggregate contiguous segments:
+    reorder: bool = False
+    # exponent of the power mean selected by `UP_P`:
+    power: float = 1.0
+    # probability of the quantile selected by `UP_Q`:
+    quantile: float = 0.5
+    # name of the raster dataset providing the cells' weights for calculating means
+    # (`CELL_AREA` selects the cell areas derived from the georeferencing):
+    weights: str | None = None
+    fused: bool = dataclasses.field(init=False, default=False)
+    linear: bool = dataclasses.field(init=False, default=False)
+    cells: VectorInt = dataclasses.field(init=False)
+    groups: VectorInt = dataclasses.field(init=False)
+    nmbs: VectorFloat = dataclasses.field(init=False)
+    segments: VectorInt = dataclasses.field(init=False)
+    static_inputs: dict[str, VectorFloat] = dataclasses.field(init=False)
+    # static terms of the regionaliser for the relevant cells (fused mode only):
+    static_terms: dict[str, VectorFloat] = dataclasses.field(
+        init=False, default_factory=dict
+    )
+    cellweights: VectorFloat | None = dataclasses.field(init=False, default=None)
+    basis_names: tuple[str, ...] = dataclasses.field(init=False)
+    basis_means: MatrixFloat = dataclasses.field(init=False)
+    previous: VectorFloat = dataclasses.field(init=False)
+    sums: VectorFloat = dataclasses.field(init=False)
+    nmb_updates: int = dataclasses.field(init=False, default=0)
+
+    @override
+    def activate(self, *, regionaliser: regionalising.RasterRegionaliser) -> None:
+        super().activate(regionaliser=regionaliser)
+        _check_quantile(self.quantile)
+        if self.reorder and not isinstance(self.function, str):
+            raise ValueError(
+                f"Reordered upscaling only supports the predefined upscaling "
+                f"functions, but the upscaler of regionaliser `{regionaliser.name}` "
+                f"uses `{self.function}`."
+            )
+        if (self.weights is not None) and not is_power_mean(self.function):
+            raise ValueError(
+                f"Weighted upscaling only supports the predefined means, but the "
+                f"upscaler of regionaliser `{regionaliser.name}` uses "
+                f"`{self.function}`."
+            )
+        if self.segmented:
+            self.prepare_cells()
+        if self.incremental:
+            if not is_mean(self.function):
+                raise ValueError(
+                    f"Incremental upscaling only supports the arithmetic, harmonic, "
+                    f"and geometric means, but the upscaler of regionaliser "
+                    f"`{regionaliser.name}` uses `{self.function}`."
+                )
+            self._check_unweighted("Incremental upscaling")
+            self.prepare_cells()
+            self.previous = numpy.full(len(self.cells), numpy.nan)
+            self.sums = numpy.zeros(len(self.nmbs))
+            self.nmb_updates = 0
+
+    def activate_fused(self) -> None:
+        """Prepare evaluating the regionaliser only for the relevant cells and
+        aggregating its results without materialising the complete output raster."""
+        self._check_not_incremental("Fused")
+        if not self.regionaliser.fusable:
+            raise ValueError(
+                f"Regionaliser `{self.regionaliser.name}` does not support fused "
+                f"execution, as it does not override method `calculate`."
+            )
+        if not is_mean(self.function):
+            raise ValueError(
+                f"Fused execution only supports the arithmetic, harmonic, and "
+                f"geometric means, but the upscaler of regionaliser "
+                f"`{self.regionaliser.name}` uses `{self.function}`."
+            )
+        self._check_unweighted("Fused execution")
+        self.fused = True
+        self.prepare_cells()
+        cells = self.cells
+        self.static_terms = self.regionaliser.get_static_terms(
+            **{
+                name: values.take(cells)
+                for name, values in self.regionaliser.static_inputs.items()
+            }
+        )
+
+    def activate_linear(self) -> None:
+        """Prepare calculating the group means as linear combinations of the group
+        means of the regionaliser's basis fields, which are computed only once."""
+        self._check_not_incremental("Linear")
+        regionaliser = self.regionaliser
+        if not regionaliser.affine:
+            raise ValueError(
+                f"Regionaliser `{regionaliser.name}` does not support linear "
+                f"execution, as it does not override methods `get_basis` and "
+                f"`get_weights`."
+            )
+        if self.function != constants.UP_A:
+            raise ValueError(
+                f"Linear execution only supports the upscaling function "
+                f"`{constants.UP_A}`, but the upscaler of regionaliser "
+                f"`{regionaliser.name}` uses `{self.function}`."
+            )
+        self._check_unweighted("Linear execution")
+        for name, dataset in regionaliser.inputs.items():
+            if not dataset.static:
+                raise ValueError(
+                    f"Linear execution requires static input datasets, but dataset "
+                    f"`{name}` of regionaliser `{regionaliser.name}` changes during "
+                    f"calibration."
+                )
+        self.linear = True
+        self.prepare_cells()
+        basis = regionaliser.get_basis()
+        self.basis_names = tuple(basis)
+        self.basis_means = numpy.empty((len(basis), len(self.nmbs)))
+        for means, field in zip(self.basis_means, basis.values()):
+            if numpy.ndim(field) == 0:
+                means[:] = field
+            else:
+                values = numpy.ravel(field).take(self.cells)
+                means[:] = numpy.bincount(self.groups, values, len(self.nmbs))
+                means /= self.nmbs
+
+    @override
+    def invalidate(self) -> None:
+        super().invalidate()
+        self.nmb_updates = 0
+
+    def _check_unweighted(self, mode: str, /) -> None:
+        if self.weights is not None:
+            raise ValueError(
+                f"{mode} does not support weighting the cells, but the upscaler of "
+                f"regionaliser `{self.regionaliser.name}` uses the weights of "
+                f"raster `{self.weights}`."
+            )
+
+    def _check_not_incremental(self, mode: str, /) -> None:
+        if self.incremental:
+            raise ValueError(
+                f"{mode} execution does not materialise the output of regionaliser "
+                f"`{self.regionaliser.name}` and so does not support incremental "
+                f"upscaling."
+            )
+
+    @property
+    def segmented(self) -> bool:
+        """Flag indicating whether the upscaler aggregates group-sorted segments,
+        which is required for the order statistics, the power mean `UP_P`, and
+        weighting, and optional for the remaining means."""
+        return (
+            self.reorder
+            or (self.weights is not None)
+            or is_order_statistic(self.function)
+            or (self.function == constants.UP_P)
+        )
+
+    def prepare_cells(self) -> None:
+        """Prepare the relevant `cells`, their `groups`, and the group sizes
+        (`nmbs`).
+
+        If `segmented` is true, the cells are sorted by group so that the cells of
+        each group form a contiguous segment (delimited by `segments`), and the
+        values of the static input datasets are gathered in this order once.
+        """
+        self._prepare_cells()
+        if self.segmented:
+            order, self.segments = sort_by_group(self.groups, self.nmbs)
+            self.cells = self.cells[order]
+            self.groups = self.groups[order]
+            self.cellweights = None
+            if self.weights is not None:
+                raster = self.regionaliser.provider_.read_dataset(
+                    NameDataset(self.weights)
+                )
+                if not raster.static:
+                    raise ValueError(
+                        f"The upscaler of regionaliser `{self.regionaliser.name}` "
+                        f"requires static weights, but raster `{self.weights}` "
+                        f"changes during calibration."
+                    )
+                self.cellweights = raster.values.take(self.cells).astype(float64)
+            self.static_inputs = {
+                name: dataset.values.take(self.cells)
+                for name, dataset in self.regionaliser.inputs.items()
+                if dataset.static
+            }
+        else:
+            self.static_inputs = {}
+
+    @abc.abstractmethod
+    def _prepare_cells(self) -> None:
+        pass
+
+    def calculate_groups(self) -> VectorFloat:
+        if self.linear:
+            return self.calculate_linear()
+        return self.calculate_fused()
+
+    def calculate_linear(self) -> VectorFloat:
+        name2weight = self.regionaliser.get_weights()
+        weights = numpy.array([name2weight[name] for name in self.basis_names])
+        return weights @ self.basis_means
+
+    def calculate_fused(self) -> VectorFloat:
+        return self._aggregate(self.regionaliser.calculate(**self._gather_inputs()))
+
+    def _gather_inputs(self) -> dict[str, VectorFloat]:
+        cells, static_inputs = self.cells, self.static_inputs
+        inputs = {
+            name.removeprefix("dataset_"): (
+                values
+                if (values := static_inputs.get(name)) is not None
+                else dataset.values.take(cells)
+            )
+            for name, dataset in self.regionaliser.inputs.items()
+        }
+        inputs.update(self.static_terms)
+        return inputs
+
+    def _aggregate(self, values: VectorFloat) -> VectorFloat:
+        summands = self._get_summands(values)
+        if self.reorder:
+            sums = numpy.add.reduceat(summands, self.segments[:-1])
+        else:
+            sums = numpy.bincount(self.groups, summands, len(self.nmbs))
+        return self._finalise(sums.astype(float64, copy=False))
+
+    def calculate_segments(self) -> VectorFloat:
+        """Aggregate the current output of the regionaliser segment by segment
+        (requires `segmented` to be true)."""
+        function = self.function
+        if is_order_statistic(function):
+            return calculate_order_statistic(
+                function=function,
+                quantile=self.quantile,
+                output=self.regionaliser.output.reshape(-1),
+                cells=self.cells,
+                segments=self.segments,
+            )
+        assert is_power_mean(function)
+        values = numpy.empty(len(self.nmbs))
+        if (self.cellweights is not None) or (function == constants.UP_P):
+            upscaling_helpers.power_mean_for_segments(
+                output=self.regionaliser.output.reshape(-1),
+                cells=self.cells,
+                segments=self.segments,
+                weights=self.cellweights,
+                power=self.get_power(),
+                values=values,
+            )
+            return values
+        assert is_mean(function)
+        match function:
+            case constants.UP_A:
+                kernel = upscaling_helpers.arithmetic_mean_for_segments
+            case constants.UP_H:
+                kernel = upscaling_helpers.harmonic_mean_for_segments
+            case constants.UP_G:
+                kernel = upscaling_helpers.geometric_mean_for_segments
+            case _:
+                assert_never(function)
+        kernel(
+            output=self.regionaliser.output.reshape(-1),
+            cells=self.cells,
+            segments=self.segments,
+            values=values,
+        )
+        return values
+
+    def get_power(self) -> float:
+        """Return the exponent of the selected power mean."""
+        function = self.function
+        assert is_power_mean(function)
+        match function:
+            case constants.UP_A:
+                return 1.0
+            case constants.UP_G:
+                return 0.0
+            case constants.UP_H:
+                return -1.0
+            case constants.UP_P:
+                return self.power
+            case _:
+                assert_never(function)
+
+    def _get_summands(self, values: VectorFloat) -> VectorFloat:
+        function = self.function
+        assert is_mean(function)
+        match function:
+            case constants.UP_A:
+                return values
+            case constants.UP_H:
+                return 1.0 / values
+            case constants.UP_G:
+                return numpy.log(values)
+            case _:
+                assert_never(function)
+
+    def _finalise(
+        self, sums: VectorFloat, groups: VectorInt | None = None
+    ) -> VectorFloat:
+        nmbs = self.nmbs if groups is None else self.nmbs[groups]
+        function = self.function
+        assert is_mean(function)
+        match function:
+            case constants.UP_A:
+                return sums / nmbs
+            case constants.UP_H:
+                return nmbs / sums
+            case constants.UP_G:
+                return numpy.exp(sums / nmbs)
+            case _:
+                assert_never(function)
+
+    def scale_up_incrementally(self) -> None:
+        """Update the running sums only for the cells whose output changed since the
+        last call and recalculate and assign the values of the affected groups.
+
+        The sums are recalculated completely in the first call, every `refresh`
+        calls (to avoid the accumulation of rounding errors), and whenever missing
+        or infinite values are involved.
+        """
+        summands = self._get_summands(self.regionaliser.output.take(self.cells))
+        previous = self.previous
+        changed = numpy.flatnonzero(
+            ~((summands == previous) | (numpy.isnan(summands) & numpy.isnan(previous)))
+        )
+        self.nmb_updates += 1
+        if (
+            (self.nmb_updates % self.refresh == 1)
+            or (self.refresh == 1)
+            or not numpy.all(numpy.isfinite(summands[changed]))
+            or not numpy.all(numpy.isfinite(previous[changed]))
+        ):
+            sums = numpy.bincount(self.groups, summands, len(self.nmbs))
+            self.sums = sums.astype(float64, copy=False)
+            groups = numpy.arange(len(self.nmbs))
+            self.changed_ids = None
+        else:
+            cellgroups = self.groups[changed]
+            self.sums += numpy.bincount(
+                cellgroups, summands[changed] - previous[changed], len(self.nmbs)
+            )
+            groups = numpy.unique(cellgroups)
+            self.changed_ids = self._get_ids(groups)
+        previous[changed] = summands[changed]
+        self.assign_groups(self._finalise(self.sums[groups], groups), groups)
+
+    @abc.abstractmethod
+    def _get_ids(self, groups: VectorInt, /) -> set[int64]:
+        pass
+
+    @property
+    def ensemble_capable(self) -> bool:
+        """Flag indicating whether `calculate_ensemble` is applicable."""
+        return self.linear or (
+            self.fused
+            and all(dataset.static for dataset in self.regionaliser.inputs.values())
+        )
+
+    def calculate_ensemble(
+        self, coefficients: Sequence[regionalising.Coefficient], values: MatrixFloat
+    ) -> MatrixFloat:
+        """Calculate the group values for many coefficient vectors at once.
+
+        Each row of `values` contains one vector ordered like `coefficients`; each
+        row of the result contains the corresponding group values.  The cell values
+        of the input datasets are gathered only once for all vectors.  The original
+        coefficient values are restored afterwards.
+        """
+        assert self.ensemble_capable
+        originals = tuple(c.value for c in coefficients)
+        try:
+            if self.linear:
+                weights = numpy.empty((len(values), len(self.basis_names)))
+                for weights_, vector in zip(weights, values):
+                    for coefficient, value in zip(coefficients, vector):
+                        coefficient.value = float(value)
+                    name2weight = self.regionaliser.get_weights()
+                    weights_[:] = [name2weight[name] for name in self.basis_names]
+                return weights @ self.basis_means
+            inputs = self._gather_inputs()
+            results = numpy.empty((len(values), len(self.nmbs)))
+            for results_, vector in zip(results, values):
+                for coefficient, value in zip(coefficients, vector):
+                    coefficient.value = float(value)
+                results_[:] = self._aggregate(self.regionaliser.calculate(**inputs))
+            return results
+        finally:
+            for coefficient, value in zip(coefficients, originals):
+                coefficient.value = value
+
+    @abc.abstractmethod
+    def assign_groups(
+        self, values: VectorFloat, groups: VectorInt | None = None, /
+    ) -> None:
+        """Write the given values of all or the selected groups into the upscaler's
+        result array."""
 
 
 @dataclasses.dataclass(kw_only=True, repr=False)
@@ -153,35 +792,48 @@ class AttributeElementDefaultUpscaler(
     AttributeDefaultUpscaler, AttributeElementUpscaler
 ):
 
+    @override
+    def _prepare_segments(self) -> None:
+        cells = numpy.flatnonzero(self.mask)
+        ids = self.regionaliser.provider_.element_id.values.take(cells)
+        valid = numpy.isin(ids, self.ids)
+        unique, groups = numpy.unique(ids[valid], return_inverse=True)
+        nmbs = numpy.bincount(groups).astype(float64)
+        order, self.segments = sort_by_group(groups, nmbs)
+        self.cells = cells[valid][order]
+        self.group2position = self.get_positions(unique)
+
     @override
     def scale_up(self) -> None:
-        id2value = self.id2value
+        values = self.values
+        if (function := self._function) is None:
+            values[self.group2position] = self.calculate_segments()
+            return
         output = self.regionaliser.output[self.mask]
         provider = self.regionaliser.provider_
         ids = provider.element_id.values[self.mask]
         weights = provider.size.values[self.mask]
-        function = self._function
-        for id_ in id2value:
+        for position, id_ in enumerate(self.ids):
             idxs = id_ == ids
             if numpy.any(idxs):
-                id2value[id_] = function(output[idxs], weights=weights)
+                values[position] = function(output[idxs], weights=weights[idxs])
             else:
-                id2value[id_] = float64(numpy.nan)
+                values[position] = numpy.nan
 
 
 @dataclasses.dataclass(kw_only=True, repr=False)
 class RasterElementDefaultUpscaler(RasterDefaultUpscaler, RasterElementUpscaler):
 
     function: RasterElementUpscalingOption = constants.UP_A
-    _function: RasterElementUpscalingFunction = dataclasses.field(init=False)
+    _kernel: RasterElementUpscalingKernel | None = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
-        self._function = self._query_function(self.function)
+        self._kernel = self._query_kernel(self.function)
 
     @staticmethod
-    def _query_function(
+    def _query_kernel(
         function: RasterElementUpscalingOption,
-    ) -> RasterElementUpscalingFunction:
+    ) -> RasterElementUpscalingKernel | None:
         match function:
             case constants.UP_A:
                 return upscaling_helpers.arithmetic_mean_for_raster_element
@@ -190,16 +842,65 @@ class RasterElementDefaultUpscaler(RasterDefaultUpscaler, RasterElementUpscaler)
             case constants.UP_G:
                 return upscaling_helpers.geometric_mean_for_raster_element
             case _:
-                return function
+                return None
+
+    group2position: VectorInt = dataclasses.field(init=False)
+
+    @override
+    def _prepare_cells(self) -> None:
+        provider = self.regionaliser.provider_
+        cells = numpy.flatnonzero(self.mask)
+        ids = provider.element_id.values.take(cells)
+        valid = numpy.isin(ids, self.ids)
+        unique, groups = numpy.unique(ids[valid], return_inverse=True)
+        self.cells = cells[valid]
+        self.groups = groups.astype(int64)
+        self.nmbs = numpy.bincount(self.groups).astype(float64)
+        self.group2position = self.get_positions(unique)
+
+    @override
+    def assign_groups(
+        self, values: VectorFloat, groups: VectorInt | None = None, /
+    ) -> None:
+        if groups is None:
+            self.values[self.group2position] = values
+        else:
+            self.values[self.group2position[groups]] = values
+
+    @override
+    def _get_ids(self, groups: VectorInt, /) -> set[int64]:
+        return set(self.ids[self.group2position[groups]].tolist())
 
     @override
     def scale_up(self) -> None:
-        self._function(
-            element_id=self.regionaliser.provider_.element_id.values,
-            mask=self.mask,
-            output=self.regionaliser.output,
-            id2value=self.id2value,
-        )
+        if self.fused or self.linear:
+            self.assign_groups(self.calculate_groups())
+            return
+        if self.incremental:
+            self.scale_up_incrementally()
+            return
+        if self.segmented:
+            self.assign_groups(self.calculate_segments())
+            return
+        element_id = self.regionaliser.provider_.element_id.values
+        output = self.regionaliser.output
+        if (kernel := self._kernel) is None:
+            function = self.function
+            assert not isinstance(function, str)
+            function(
+                element_id=element_id,
+                mask=self.mask,
+                output=output,
+                id2value=self.id2value,
+            )
+        else:
+            kernel(
+                element_id=element_id,
+                mask=self.mask,
+                output=output,
+                ids=self.ids,
+                values=self.values,
+            )
 
 
 @dataclasses.dataclass(kw_only=True, repr=False)
@@ -207,14 +908,25 @@ class AttributeSubunitDefaultUpscaler(
     AttributeDefaultUpscaler, AttributeSubunitUpscaler
 ):
 
+    @override
+    def _prepare_segments(self) -> None:
+        # `SubunitUpscaler.activate` already prepared `cells`, `groups`, and `nmbs`,
+        # with the groups being identical to the result positions:
+        order, self.segments = sort_by_group(self.groups, self.nmbs)
+        self.cells = self.cells[order]
+        self.groups = self.groups[order]
+        self.group2position = numpy.arange(len(self.idxs))
+
     @override
     def scale_up(self) -> None:
+        if (function := self._function) is None:
+            self.values[self.group2position] = self.calculate_segments()
+            return
         output = self.regionaliser.output[self.mask]
         provider = self.regionaliser.provider_
         element_id = provider.element_id.values[self.mask]
         subunit_id = provider.subunit_id.values[self.mask]
-        weights = provider.subunit_id.values[self.mask]
-        function = self._function
+        weights = provider.size.values[self.mask]
         for id_, idx2value in self.id2idx2value.items():
             idx_element = element_id == id_
             for idx in idx2value:
@@ -231,15 +943,15 @@ class AttributeSubunitDefaultUpscaler(
 class RasterSubunitDefaultUpscaler(RasterDefaultUpscaler, RasterSubunitUpscaler):
 
     function: RasterSubunitUpscalingOption = constants.UP_A
-    _function: RasterSubunitUpscalingFunction = dataclasses.field(init=False)
+    _kernel: RasterSubunitUpscalingKernel | None = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
-        self._function = self._query_function(self.function)
+        self._kernel = self._query_kernel(self.function)
 
     @staticmethod
-    def _query_function(
+    def _query_kernel(
         function: RasterSubunitUpscalingOption,
-    ) -> RasterSubunitUpscalingFunction:
+    ) -> RasterSubunitUpscalingKernel | None:
         match function:
             case constants.UP_A:
                 return upscaling_helpers.arithmetic_mean_for_raster_subunit
@@ -248,14 +960,63 @@ class RasterSubunitDefaultUpscaler(RasterDefaultUpscaler, RasterSubunitUpscaler)
             case constants.UP_G:
                 return upscaling_helpers.geometric_mean_for_raster_subunit
             case _:
-                return function
+                return None
+
+    group2position: VectorInt = dataclasses.field(init=False)
+
+    @override
+    def _prepare_cells(self) -> None:
+        # `SubunitUpscaler.activate` already prepared `cells`, `groups`, and `nmbs`,
+        # with the groups being identical to the result positions:
+        self.group2position = numpy.arange(len(self.idxs))
+
+    @override
+    def assign_groups(
+        self, values: VectorFloat, groups: VectorInt | None = None, /
+    ) -> None:
+        if groups is None:
+            self.values[self.group2position] = values
+        else:
+            self.values[self.group2position[groups]] = values
+
+    @override
+    def _get_ids(self, groups: VectorInt, /) -> set[int64]:
+        positions = self.group2position[groups]
+        rows = numpy.searchsorted(self.offsets, positions, side="right") - 1
+        return set(self.ids[rows].tolist())
 
     @override
     def scale_up(self) -> None:
-        self._function(
-            element_id=self.regionaliser.provider_.element_id.values,
-            subunit_id=self.regionaliser.provider_.subunit_id.values,
-            mask=self.mask,
-            output=self.regionaliser.output,
-            id2idx2value=self.id2idx2value,
-        )
+        if self.fused or self.linear:
+            self.assign_groups(self.calculate_groups())
+            return
+        if self.incremental:
+            self.scale_up_incrementally()
+            return
+        if self.segmented:
+            self.assign_groups(self.calculate_segments())
+            return
+        element_id = self.regionaliser.provider_.element_id.values
+        subunit_id = self.regionaliser.provider_.subunit_id.values
+        output = self.regionaliser.output
+        if (kernel := self._kernel) is None:
+            function = self.function
+            assert not isinstance(function, str)
+            function(
+                element_id=element_id,
+                subunit_id=subunit_id,
+                mask=self.mask,
+                output=output,
+                id2idx2value=self.id2idx2value,
+            )
+        else:
+            kernel(
+                element_id=element_id,
+                subunit_id=subunit_id,
+                mask=self.mask,
+                output=output,
+                ids=self.ids,
+                offsets=self.offsets,
+                idxs=self.idxs,
+                values=self.values,
+            )
@@ -1,14 +1,12 @@
 from hydpy_mpr.source.typing_ import *
 
-def prepare_id2idx2value_for_raster_subunit(
-    *, ids: VectorInt, element_id: MatrixInt, subunit_id: MatrixInt, mask: MatrixBool
-) -> dict[int64, dict[int64, float64]]: ...
 def arithmetic_mean_for_raster_element(
     *,
     element_id: MatrixInt,
     mask: MatrixBool,
     output: MatrixFloat,
-    id2value: dict[int64, float64],
+    ids: VectorInt,
+    values: VectorFloat,
 ) -> None: ...
 def arithmetic_mean_for_raster_subunit(
     *,
@@ -16,14 +14,18 @@ def arithmetic_mean_for_raster_subunit(
     subunit_id: MatrixInt,
     mask: MatrixBool,
     output: MatrixFloat,
-    id2idx2value: dict[int64, dict[int64, float64]],
+    ids: VectorInt,
+    offsets: VectorInt,
+    idxs: VectorInt,
+    values: VectorFloat,
 ) -> None: ...
 def harmonic_mean_for_raster_element(
     *,
     element_id: MatrixInt,
     mask: MatrixBool,
     output: MatrixFloat,
-    id2value: dict[int64, float64],
+    ids: VectorInt,
+    values: VectorFloat,
 ) -> None: ...
 def harmonic_mean_for_raster_subunit(
     *,
@@ -31,14 +33,18 @@ def harmonic_mean_for_raster_subunit(
     subunit_id: MatrixInt,
     mask: MatrixBool,
     output: MatrixFloat,
-    id2idx2value: dict[int64, dict[int64, float64]],
+    ids: VectorInt,
+    offsets: VectorInt,
+    idxs: VectorInt,
+    values: VectorFloat,
 ) -> None: ...
 def geometric_mean_for_raster_element(
     *,
     element_id: MatrixInt,
     mask: MatrixBool,
     output: MatrixFloat,
-    id2value: dict[int64, float64],
+    ids: VectorInt,
+    values: VectorFloat,
 ) -> None: ...
 def geometric_mean_for_raster_subunit(
     *,
@@ -46,5 +52,40 @@ def geometric_mean_for_raster_subunit(
     subunit_id: MatrixInt,
     mask: MatrixBool,
     output: MatrixFloat,
-    id2idx2value: dict[int64, dict[int64, float64]],
+    ids: VectorInt,
+    offsets: VectorInt,
+    idxs: VectorInt,
+    values: VectorFloat,
+) -> None: ...
+def arithmetic_mean_for_segments(
+    *, output: VectorFloat, cells: VectorInt, segments: VectorInt, values: VectorFloat
+) -> None: ...
+def harmonic_mean_for_segments(
+    *, output: VectorFloat, cells: VectorInt, segments: VectorInt, values: VectorFloat
+) -> None: ...
+def geometric_mean_for_segments(
+    *, output: VectorFloat, cells: VectorInt, segments: VectorInt, values: VectorFloat
+) -> None: ...
+def minimum_for_segments(
+    *, output: VectorFloat, cells: VectorInt, segments: VectorInt, values: VectorFloat
+) -> None: ...
+def maximum_for_segments(
+    *, output: VectorFloat, cells: VectorInt, segments: VectorInt, values: VectorFloat
+) -> None: ...
+def quantile_for_segments(
+    *,
+    output: VectorFloat,
+    cells: VectorInt,
+    segments: VectorInt,
+    quantile: float,
+    values: VectorFloat,
+) -> None: ...
+def power_mean_for_segments(
+    *,
+    output: VectorFloat,
+    cells: VectorInt,
+    segments: VectorInt,
+    weights: VectorFloat | None,
+    power: float,
+    values: VectorFloat,
 ) -> None: ...
@@ -8,47 +8,24 @@
 # cython: cdivision=True
 
 
+import numpy
+
 from numpy cimport int64_t, npy_bool
-from cython.operator cimport dereference, postincrement
+from cython.operator cimport dereference
 from libc.math cimport NAN as nan
-from libc.math cimport log, exp
+from libc.math cimport floor, isnan, log, exp, pow
+from libcpp.algorithm cimport nth_element
 from libcpp.unordered_map cimport unordered_map
 
 
-def prepare_id2idx2value_for_raster_subunit(
-    *,
-    int64_t[:] ids,
-    int64_t[:, :] element_id,
-    int64_t[:, :] subunit_id,
-    npy_bool[:, :] mask,
-) -> dict[int64, dict[int64, float64]]:
-
-    cdef int64_t id_, idx, i, j
-    cdef int64_t m = element_id.shape[0]
-    cdef int64_t n = element_id.shape[1]
-    cdef dict[int64_t, set[int64_t]] id2idxs = {}
-    cdef set[int64_t] idxs
-    cdef dict[int64_t, dict[int64_t, double]] id2idx2value = {}
-    cdef dict[int64_t, double] idx2value
-
-    for i in range(m):
-        for j in range(n):
-            if mask[i, j]:
-                id_ = element_id[i, j]
-                if id_ in id2idxs:
-                    idxs = id2idxs[id_]
-                else:
-                    idxs = set()
-                    id2idxs[id_] = idxs
-                idxs.add(subunit_id[i, j])
+cdef unordered_map[int64_t, int64_t] _get_id2position(int64_t[:] ids):
 
-    for id_, idxs in id2idxs.items():
-        idx2value = {}
-        for idx in sorted(idxs):
-            idx2value[idx] = nan
-        id2idx2value[id_] = idx2value
+    cdef int64_t i
+    cdef unordered_map[int64_t, int64_t] id2position
 
-    return id2idx2value
+    for i in range(ids.shape[0]):
+        id2position[ids[i]] = i
+    return id2position
 
 
 def arithmetic_mean_for_raster_element(
@@ -56,36 +33,32 @@ def arithmetic_mean_for_raster_element(
     int64_t[:, :] element_id,
     npy_bool[:, :] mask,
     double[:, :] output,
-    dict[int64, float64] id2value,
+    int64_t[:] ids,
+    double[:] values,
 ) -> None:
 
-    cdef int64_t id_, i, j, nmb
+    cdef int64_t i, j, p, nmb
     cdef int64_t m = element_id.shape[0]
     cdef int64_t n = element_id.shape[1]
-    cdef unordered_map[int64_t, double] id2sum
-    cdef unordered_map[int64_t, double].iterator it
-    cdef unordered_map[int64_t, int64_t] id2nmb
-
-    id2sum = unordered_map[int64_t, double]()
-    for id_ in id2value:
-        id2sum[id_] = 0.0
-        id2nmb[id_] = 0
+    cdef unordered_map[int64_t, int64_t] id2position = _get_id2position(ids)
+    cdef unordered_map[int64_t, int64_t].iterator it
+    cdef double[:] sums = numpy.zeros(ids.shape[0], dtype=numpy.float64)
+    cdef int64_t[:] nmbs = numpy.zeros(ids.shape[0], dtype=numpy.int64)
 
     with nogil:
 
         for i in range(m):
             for j in range(n):
                 if mask[i, j]:
-                    id_ = element_id[i, j]
-                    id2sum[id_] += output[i, j]
-                    id2nmb[id_] += 1
+                    it = id2position.find(element_id[i, j])
+                    if it != id2position.end():
+                        p = dereference(it).second
+                        sums[p] += output[i, j]
+                        nmbs[p] += 1
 
-    it = id2sum.begin()
-    while (it != id2sum.end()):
-        i = dereference(it).first
-        nmb = id2nmb[i]
-        id2value[i] = nan if nmb == 0 else dereference(it).second / nmb
-        postincrement(it)
+        for p in range(ids.shape[0]):
+            nmb = nmbs[p]
+            values[p] = nan if nmb == 0 else sums[p] / nmb
 
 
 def arithmetic_mean_for_raster_subunit(
@@ -94,50 +67,38 @@ def arithmetic_mean_for_raster_subunit(
     int64_t[:, :] subunit_id,
     npy_bool[:, :] mask,
     double[:, :] output,
-    dict[int64, dict[int64, float64]] id2idx2value,
+    int64_t[:] ids,
+    int64_t[:] offsets,
+    int64_t[:] idxs,
+    double[:] values,
 ) -> None:
 
-    cdef int64_t id_, idx, i, j, nmb
+    cdef int64_t i, j, k, p, idx, nmb
     cdef int64_t m = element_id.shape[0]
     cdef int64_t n = element_id.shape[1]
-    cdef unordered_map[int64_t, unordered_map[int64_t, double]] id2idx2sum
-    cdef unordered_map[int64_t, unordered_map[int64_t, double]].iterator i1
-    cdef unordered_map[int64_t, double] idx2value_
-    cdef unordered_map[int64_t, double].iterator i2
-    cdef unordered_map[int64_t, unordered_map[int64_t, int64_t]] id2idx2nmb
-    cdef unordered_map[int64_t, int64_t] idx2nmb
-    cdef dict[int64_t, double] idx2value
-
-    for id_, idx2value in id2idx2value.items():
-        id2idx2value[id_] = unordered_map[int64_t, double]()
-        id2idx2nmb[id_] = unordered_map[int64_t, int64_t]()
-        for idx in idx2value:
-            id2idx2sum[id_][idx] = 0.0
-            id2idx2nmb[id_][idx] = 0
+    cdef unordered_map[int64_t, int64_t] id2position = _get_id2position(ids)
+    cdef unordered_map[int64_t, int64_t].iterator it
+    cdef double[:] sums = numpy.zeros(idxs.shape[0], dtype=numpy.float64)
+    cdef int64_t[:] nmbs = numpy.zeros(idxs.shape[0], dtype=numpy.int64)
 
     with nogil:
 
         for i in range(m):
             for j in range(n):
                 if mask[i, j]:
-                    id_ = element_id[i, j]
-                    idx = subunit_id[i, j]
-                    id2idx2sum[id_][idx] += output[i, j]
-                    id2idx2nmb[id_][idx] += 1
-
-    i1 = id2idx2sum.begin()
-    while (i1 != id2idx2sum.end()):
-        id_ = dereference(i1).first
-        idx2value_ = dereference(i1).second
-        idx2nmb = id2idx2nmb[id_]
-        idx2value = id2idx2value[id_]
-        i2 = idx2value_.begin()
-        while (i2 != idx2value_.end()):
-            i = dereference(i2).first
-            nmb = idx2nmb[i]
-            idx2value[i] = nan if nmb == 0 else dereference(i2).second / nmb
-            postincrement(i2)
-        postincrement(i1)
+                    it = id2position.find(element_id[i, j])
+                    if it != id2position.end():
+                        p = dereference(it).second
+                        idx = subunit_id[i, j]
+                        for k in range(offsets[p], offsets[p + 1]):
+                            if idxs[k] == idx:
+                                sums[k] += output[i, j]
+                                nmbs[k] += 1
+                                break
+
+        for k in range(idxs.shape[0]):
+            nmb = nmbs[k]
+            values[k] = nan if nmb == 0 else sums[k] / nmb
 
 
 def harmonic_mean_for_raster_element(
@@ -145,36 +106,32 @@ def harmonic_mean_for_raster_element(
     int64_t[:, :] element_id,
     npy_bool[:, :] mask,
     double[:, :] output,
-    dict[int64, float64] id2value,
+    int64_t[:] ids,
+    double[:] values,
 ) -> None:
 
-    cdef int64_t id_, i, j, nmb
+    cdef int64_t i, j, p, nmb
     cdef int64_t m = element_id.shape[0]
     cdef int64_t n = element_id.shape[1]
-    cdef unordered_map[int64_t, double] id2sum
-    cdef unordered_map[int64_t, double].iterator it
-    cdef unordered_map[int64_t, int64_t] id2nmb
-
-    id2sum = unordered_map[int64_t, double]()
-    for id_ in id2value:
-        id2sum[id_] = 0.0
-        id2nmb[id_] = 0
+    cdef unordered_map[int64_t, int64_t] id2position = _get_id2position(ids)
+    cdef unordered_map[int64_t, int64_t].iterator it
+    cdef double[:] sums = numpy.zeros(ids.shape[0], dtype=numpy.float64)
+    cdef int64_t[:] nmbs = numpy.zeros(ids.shape[0], dtype=numpy.int64)
 
     with nogil:
 
         for i in range(m):
             for j in range(n):
                 if mask[i, j]:
-                    id_ = element_id[i, j]
-                    id2sum[id_] += 1.0 / output[i, j]
-                    id2nmb[id_] += 1
+                    it = id2position.find(element_id[i, j])
+                    if it != id2position.end():
+                        p = dereference(it).second
+                        sums[p] += 1.0 / output[i, j]
+                        nmbs[p] += 1
 
-    it = id2sum.begin()
-    while (it != id2sum.end()):
-        i = dereference(it).first
-        nmb = id2nmb[i]
-        id2value[i] = nan if nmb == 0 else nmb / dereference(it).second
-        postincrement(it)
+        for p in range(ids.shape[0]):
+            nmb = nmbs[p]
+            values[p] = nan if nmb == 0 else nmb / sums[p]
 
 
 def harmonic_mean_for_raster_subunit(
@@ -183,50 +140,38 @@ def harmonic_mean_for_raster_subunit(
     int64_t[:, :] subunit_id,
     npy_bool[:, :] mask,
     double[:, :] output,
-    dict[int64, dict[int64, float64]] id2idx2value,
+    int64_t[:] ids,
+    int64_t[:] offsets,
+    int64_t[:] idxs,
+    double[:] values,
 ) -> None:
 
-    cdef int64_t id_, idx, i, j, nmb
+    cdef int64_t i, j, k, p, idx, nmb
     cdef int64_t m = element_id.shape[0]
     cdef int64_t n = element_id.shape[1]
-    cdef unordered_map[int64_t, unordered_map[int64_t, double]] id2idx2sum
-    cdef unordered_map[int64_t, unordered_map[int64_t, double]].iterator i1
-    cdef unordered_map[int64_t, double] idx2value_
-    cdef unordered_map[int64_t, double].iterator i2
-    cdef unordered_map[int64_t, unordered_map[int64_t, int64_t]] id2idx2nmb
-    cdef unordered_map[int64_t, int64_t] idx2nmb
-    cdef dict[int64_t, double] idx2value
-
-    for id_, idx2value in id2idx2value.items():
-        id2idx2value[id_] = unordered_map[int64_t, double]()
-        id2idx2nmb[id_] = unordered_map[int64_t, int64_t]()
-        for idx in idx2value:
-            id2idx2sum[id_][idx] = 0.0
-            id2idx2nmb[id_][idx] = 0
+    cdef unordered_map[int64_t, int64_t] id2position = _get_id2position(ids)
+    cdef unordered_map[int64_t, int64_t].iterator it
+    cdef double[:] sums = numpy.zeros(idxs.shape[0], dtype=numpy.float64)
+    cdef int64_t[:] nmbs = numpy.zeros(idxs.shape[0], dtype=numpy.int64)
 
     with nogil:
 
         for i in range(m):
             for j in range(n):
                 if mask[i, j]:
-                    id_ = element_id[i, j]
-                    idx = subunit_id[i, j]
-                    id2idx2sum[id_][idx] += 1.0 / output[i, j]
-                    id2idx2nmb[id_][idx] += 1
-
-    i1 = id2idx2sum.begin()
-    while (i1 != id2idx2sum.end()):
-        id_ = dereference(i1).first
-        idx2value_ = dereference(i1).second
-        idx2nmb = id2idx2nmb[id_]
-        idx2value = id2idx2value[id_]
-        i2 = idx2value_.begin()
-        while (i2 != idx2value_.end()):
-            i = dereference(i2).first
-            nmb = idx2nmb[i]
-            idx2value[i] = nan if nmb == 0 else nmb / dereference(i2).second
-            postincrement(i2)
-        postincrement(i1)
+                    it = id2position.find(element_id[i, j])
+                    if it != id2position.end():
+                        p = dereference(it).second
+                        idx = subunit_id[i, j]
+                        for k in range(offsets[p], offsets[p + 1]):
+                            if idxs[k] == idx:
+                                sums[k] += 1.0 / output[i, j]
+                                nmbs[k] += 1
+                                break
+
+        for k in range(idxs.shape[0]):
+            nmb = nmbs[k]
+            values[k] = nan if nmb == 0 else nmb / sums[k]
 
 
 def geometric_mean_for_raster_element(
@@ -234,36 +179,32 @@ def geometric_mean_for_raster_element(
     int64_t[:, :] element_id,
     npy_bool[:, :] mask,
     double[:, :] output,
-    dict[int64, float64] id2value,
+    int64_t[:] ids,
+    double[:] values,
 ) -> None:
 
-    cdef int64_t id_, i, j, nmb
+    cdef int64_t i, j, p, nmb
     cdef int64_t m = element_id.shape[0]
     cdef int64_t n = element_id.shape[1]
-    cdef unordered_map[int64_t, double] id2sum
-    cdef unordered_map[int64_t, double].iterator it
-    cdef unordered_map[int64_t, int64_t] id2nmb
-
-    id2sum = unordered_map[int64_t, double]()
-    for id_ in id2value:
-        id2sum[id_] = 0.0
-        id2nmb[id_] = 0
+    cdef unordered_map[int64_t, int64_t] id2position = _get_id2position(ids)
+    cdef unordered_map[int64_t, int64_t].iterator it
+    cdef double[:] sums = numpy.zeros(ids.shape[0], dtype=numpy.float64)
+    cdef int64_t[:] nmbs = numpy.zeros(ids.shape[0], dtype=numpy.int64)
 
     with nogil:
 
         for i in range(m):
             for j in range(n):
                 if mask[i, j]:
-                    id_ = element_id[i, j]
-                    id2sum[id_] += log(output[i, j])
-                    id2nmb[id_] += 1
+                    it = id2position.find(element_id[i, j])
+                    if it != id2position.end():
+                        p = dereference(it).second
+                        sums[p] += log(output[i, j])
+                        nmbs[p] += 1
 
-    it = id2sum.begin()
-    while (it != id2sum.end()):
-        i = dereference(it).first
-        nmb = id2nmb[i]
-        id2value[i] = nan if nmb == 0 else exp(dereference(it).second / nmb)
-        postincrement(it)
+        for p in range(ids.shape[0]):
+            nmb = nmbs[p]
+            values[p] = nan if nmb == 0 else exp(sums[p] / nmb)
 
 
 def geometric_mean_for_raster_subunit(
@@ -272,47 +213,248 @@ def geometric_mean_for_raster_subunit(
     int64_t[:, :] subunit_id,
     npy_bool[:, :] mask,
     double[:, :] output,
-    dict[int64, dict[int64, float64]] id2idx2value,
+    int64_t[:] ids,
+    int64_t[:] offsets,
+    int64_t[:] idxs,
+    double[:] values,
 ) -> None:
 
-    cdef int64_t id_, idx, i, j, nmb
+    cdef int64_t i, j, k, p, idx, nmb
     cdef int64_t m = element_id.shape[0]
     cdef int64_t n = element_id.shape[1]
-    cdef unordered_map[int64_t, unordered_map[int64_t, double]] id2idx2sum
-    cdef unordered_map[int64_t, unordered_map[int64_t, double]].iterator i1
-    cdef unordered_map[int64_t, double] idx2value_
-    cdef unordered_map[int64_t, double].iterator i2
-    cdef unordered_map[int64_t, unordered_map[int64_t, int64_t]] id2idx2nmb
-    cdef unordered_map[int64_t, int64_t] idx2nmb
-    cdef dict[int64_t, double] idx2value
-
-    for id_, idx2value in id2idx2value.items():
-        id2idx2value[id_] = unordered_map[int64_t, double]()
-        id2idx2nmb[id_] = unordered_map[int64_t, int64_t]()
-        for idx in idx2value:
-            id2idx2sum[id_][idx] = 0.0
-            id2idx2nmb[id_][idx] = 0
+    cdef unordered_map[int64_t, int64_t] id2position = _get_id2position(ids)
+    cdef unordered_map[int64_t, int64_t].iterator it
+    cdef double[:] sums = numpy.zeros(idxs.shape[0], dtype=numpy.float64)
+    cdef int64_t[:] nmbs = numpy.zeros(idxs.shape[0], dtype=numpy.int64)
 
     with nogil:
 
         for i in range(m):
             for j in range(n):
                 if mask[i, j]:
-                    id_ = element_id[i, j]
-                    idx = subunit_id[i, j]
-                    id2idx2sum[id_][idx] += log(output[i, j])
-                    id2idx2nmb[id_][idx] += 1
-
-    i1 = id2idx2sum.begin()
-    while (i1 != id2idx2sum.end()):
-        id_ = dereference(i1).first
-        idx2value_ = dereference(i1).second
-        idx2nmb = id2idx2nmb[id_]
-        idx2value = id2idx2value[id_]
-        i2 = idx2value_.begin()
-        while (i2 != idx2value_.end()):
-            i = dereference(i2).first
-            nmb = idx2nmb[i]
-            idx2value[i] = nan if nmb == 0 else exp(dereference(i2).second / nmb)
-            postincrement(i2)
-        postincrement(i1)
+                    it = id2position.find(element_id[i, j])
+                    if it != id2position.end():
+                        p = dereference(it).second
+                        idx = subunit_id[i, j]
+                        for k in range(offsets[p], offsets[p + 1]):
+                            if idxs[k] == idx:
+                                sums[k] += log(output[i, j])
+                                nmbs[k] += 1
+                                break
+
+        for k in range(idxs.shape[0]):
+            nmb = nmbs[k]
+            values[k] = nan if nmb == 0 else exp(sums[k] / nmb)
+
+
+def arithmetic_mean_for_segments(
+    *,
+    double[:] output,
+    int64_t[:] cells,
+    int64_t[:] segments,
+    double[:] values,
+) -> None:
+
+    cdef int64_t g, k, nmb
+    cdef double sum_
+
+    with nogil:
+
+        for g in range(segments.shape[0] - 1):
+            sum_ = 0.0
+            for k in range(segments[g], segments[g + 1]):
+                sum_ += output[cells[k]]
+            nmb = segments[g + 1] - segments[g]
+            values[g] = nan if nmb == 0 else sum_ / nmb
+
+
+def harmonic_mean_for_segments(
+    *,
+    double[:] output,
+    int64_t[:] cells,
+    int64_t[:] segments,
+    double[:] values,
+) -> None:
+
+    cdef int64_t g, k, nmb
+    cdef double sum_
+
+    with nogil:
+
+        for g in range(segments.shape[0] - 1):
+            sum_ = 0.0
+            for k in range(segments[g], segments[g + 1]):
+                sum_ += 1.0 / output[cells[k]]
+            nmb = segments[g + 1] - segments[g]
+            values[g] = nan if nmb == 0 else nmb / sum_
+
+
+def geometric_mean_for_segments(
+    *,
+    double[:] output,
+    int64_t[:] cells,
+    int64_t[:] segments,
+    double[:] values,
+) -> None:
+
+    cdef int64_t g, k, nmb
+    cdef double sum_
+
+    with nogil:
+
+        for g in range(segments.shape[0] - 1):
+            sum_ = 0.0
+            for k in range(segments[g], segments[g + 1]):
+                sum_ += log(output[cells[k]])
+            nmb = segments[g + 1] - segments[g]
+            values[g] = nan if nmb == 0 else exp(sum_ / nmb)
+
+
+def minimum_for_segments(
+    *,
+    double[:] output,
+    int64_t[:] cells,
+    int64_t[:] segments,
+    double[:] values,
+) -> None:
+
+    cdef int64_t g, k
+    cdef double value, extreme
+
+    with nogil:
+
+        for g in range(segments.shape[0] - 1):
+            extreme = nan
+            for k in range(segments[g], segments[g + 1]):
+                value = output[cells[k]]
+                if isnan(value):
+                    extreme = nan
+                    break
+                if (k == segments[g]) or (value < extreme):
+                    extreme = value
+            values[g] = extreme
+
+
+def maximum_for_segments(
+    *,
+    double[:] output,
+    int64_t[:] cells,
+    int64_t[:] segments,
+    double[:] values,
+) -> None:
+
+    cdef int64_t g, k
+    cdef double value, extreme
+
+    with nogil:
+
+        for g in range(segments.shape[0] - 1):
+            extreme = nan
+            for k in range(segments[g], segments[g + 1]):
+                value = output[cells[k]]
+                if isnan(value):
+                    extreme = nan
+                    break
+                if (k == segments[g]) or (value > extreme):
+                    extreme = value
+            values[g] = extreme
+
+
+def quantile_for_segments(
+    *,
+    double[:] output,
+    int64_t[:] cells,
+    int64_t[:] segments,
+    double quantile,
+    double[:] values,
+) -> None:
+
+    cdef int64_t g, k, nmb, lower
+    cdef double position, weight, value, left, right
+    cdef bint missing
+    cdef double[:] buffer = numpy.empty(
+        max(numpy.max(numpy.diff(segments), initial=0), 1), dtype=numpy.float64
+    )
+    cdef double* data = &buffer[0]
+
+    with nogil:
+
+        for g in range(segments.shape[0] - 1):
+            nmb = segments[g + 1] - segments[g]
+            if nmb == 0:
+                values[g] = nan
+                continue
+            missing = False
+            for k in range(nmb):
+                value = output[cells[segments[g] + k]]
+                if isnan(value):
+                    missing = True
+                    break
+                data[k] = value
+            if missing:
+                values[g] = nan
+                continue
+            # linear interpolation between the closest ranks, as `numpy.quantile`:
+            position = quantile * (nmb - 1)
+            lower = <int64_t>floor(position)
+            weight = position - lower
+            nth_element(data, data + lower, data + nmb)
+            left = data[lower]
+            if weight == 0.0:
+                values[g] = left
+                continue
+            # after the partial sort, the next rank is the smallest remaining value:
+            right = data[lower + 1]
+            for k in range(lower + 2, nmb):
+                if data[k] < right:
+                    right = data[k]
+            if weight >= 0.5:
+                values[g] = right - (right - left) * (1.0 - weight)
+            else:
+                values[g] = left + (right - left) * weight
+
+
+def power_mean_for_segments(
+    *,
+    double[:] output,
+    int64_t[:] cells,
+    int64_t[:] segments,
+    double[:] weights,
+    double power,
+    double[:] values,
+) -> None:
+
+    cdef int64_t g, k
+    cdef double sum_, total, weight
+    cdef bint weighted = weights is not None
+    # 1: arithmetic, 0: geometric, -1: harmonic, 2: any other power mean
+    cdef int kind = (
+        1 if power == 1.0 else 0 if power == 0.0 else -1 if power == -1.0 else 2
+    )
+
+    with nogil:
+
+        for g in range(segments.shape[0] - 1):
+            sum_ = 0.0
+            total = 0.0
+            for k in range(segments[g], segments[g + 1]):
+                weight = weights[k] if weighted else 1.0
+                if kind == 1:
+                    sum_ += weight * output[cells[k]]
+                elif kind == 0:
+                    sum_ += weight * log(output[cells[k]])
+                elif kind == -1:
+                    sum_ += weight / output[cells[k]]
+                else:
+                    sum_ += weight * pow(output[cells[k]], power)
+                total += weight
+            if segments[g + 1] == segments[g]:
+                values[g] = nan
+            elif kind == 1:
+                values[g] = sum_ / total
+            elif kind == 0:
+                values[g] = exp(sum_ / total)
+            elif kind == -1:
+                values[g] = total / sum_
+            else:
+                values[g] = pow(sum_ / total, 1.0 / power)
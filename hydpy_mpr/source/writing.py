@@ -195,6 +195,7 @@ class GeotiffResultWriter(Writer):
 
         for task in [t for t in self.tasks if isinstance(t, raster_tasks)]:
 
+            task.materialise_output()
             regionaliser = task.regionaliser
 
             filepath = os.path.join(self.dirpath, f"{regionaliser.name}.tif")
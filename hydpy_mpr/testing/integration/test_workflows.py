@@ -1,9 +1,11 @@
 # pylint: disable=missing-docstring, too-many-arguments, too-many-positional-arguments, unused-argument
 
 from __future__ import annotations
+import os
 
 import hydpy
 import numpy
+from PIL import Image as pillow_image
 import pytest
 
 import hydpy_mpr
@@ -169,3 +171,376 @@ def test_raster_element_level_subregionalisers(
     control = hp2.elements["land_dill_assl"].model.parameters.control
     assert control.percmax.value == pytest.approx(23.105109819742168)
     assert control.k.value == pytest.approx(0.4836022341103063)
+
+
+@pytest.mark.integration_test
+def test_raster_element_level_screening(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    element_transformer_fc: hydpy_mpr.ElementIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=3, screening_lastdate="1996-04-01")
+
+    hydpy_mpr.MPR(
+        mprpath=dirpath_mpr_data,
+        hp=hp2,
+        tasks=[
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser_fc_2m,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[element_transformer_fc],
+            )
+        ],
+        calibrator=g,
+    ).run()
+
+    assert g.nmb_steps == 28
+    assert g.nmb_rejected > 0
+    assert g.likelihood == pytest.approx(0.8122366228601621)
+    assert g.values == pytest.approx([5.0, 0.5, -5.0])
+    assert hydpy.pub.timegrids.sim.lastdate == hydpy.Date("1997-01-01")
+
+
+@pytest.mark.integration_test
+def test_raster_element_level_chunking(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    element_transformer_fc: hydpy_mpr.ElementIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    class BoundedGridCalibrator(gridcalibrator):  # type: ignore[valid-type, misc]
+
+        @override
+        def calculate_likelihood_bound(self) -> float:
+            nodes = self.hp.nodes
+            return sum(hydpy_mpr.nse_upper_bound(node=node) for node in nodes) / 4.0
+
+    g = BoundedGridCalibrator(nmb_nodes=3, chunksize="30d")
+
+    hydpy_mpr.MPR(
+        mprpath=dirpath_mpr_data,
+        hp=hp2,
+        tasks=[
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser_fc_2m,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[element_transformer_fc],
+            )
+        ],
+        calibrator=g,
+    ).run()
+
+    assert g.nmb_steps == 28
+    assert g.nmb_rejected > 0
+    assert g.likelihood == pytest.approx(0.8122366228601621)
+    assert g.values == pytest.approx([5.0, 0.5, -5.0])
+    assert hydpy.pub.timegrids.sim.firstdate == hydpy.Date("1996-01-01")
+
+
+@pytest.mark.integration_test
+def test_raster_element_level_memo(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    element_transformer_fc: hydpy_mpr.ElementIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=3, memo_size=30, memo_snapshots=True)
+
+    hydpy_mpr.MPR(
+        mprpath=dirpath_mpr_data,
+        hp=hp2,
+        tasks=[
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser_fc_2m,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[element_transformer_fc],
+            )
+        ],
+        calibrator=g,
+    ).run()
+
+    assert g.nmb_steps == 28
+    assert g.nmb_memo_hits == 1
+    assert len(g.memo) == 27
+    assert g.likelihood == pytest.approx(0.8122366228601621)
+    assert g.values == pytest.approx([5.0, 0.5, -5.0])
+    fc = hp2.elements["land_dill_assl"].model.parameters.control.fc.values
+    assert numpy.min(fc) == numpy.max(fc) == pytest.approx(259.0249554316203)
+
+
+@pytest.mark.integration_test
+def test_raster_element_level_memo_write_results(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    element_transformer_fc: hydpy_mpr.ElementIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+    tmp_path: str,
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=3, memo_size=30, memo_snapshots=True)
+
+    hydpy_mpr.MPR(
+        mprpath=dirpath_mpr_data,
+        hp=hp2,
+        tasks=[
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser_fc_2m,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[element_transformer_fc],
+            )
+        ],
+        calibrator=g,
+        writers=[hydpy_mpr.GeotiffResultWriter(dirpath=tmp_path)],
+    ).run()
+
+    assert g.nmb_memo_hits == 1
+    filepath = os.path.join(tmp_path, f"{regionaliser_fc_2m.name}.tif")
+    with pillow_image.open(filepath) as result_file:
+        written = numpy.array(result_file)
+    output = regionaliser_fc_2m.output.copy()
+    regionaliser_fc_2m.apply_coefficients()
+    regionaliser_fc_2m.apply_mask()
+    numpy.testing.assert_array_equal(output, regionaliser_fc_2m.output)
+    numpy.testing.assert_allclose(written, output, rtol=1e-6)
+
+
+@pytest.mark.integration_test
+def test_raster_element_level_task_threads(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    subregionaliser_ks_2m: hydpy_mpr.RasterSubregionaliser,
+    regionaliser_percmax_2m: hydpy_mpr.RasterRegionaliser,
+    regionaliser_k_2m: hydpy_mpr.RasterRegionaliser,
+    element_transformers_percmax: hydpy_mpr.ElementIdentityTransformer[Any],
+    element_transformers_k: hydpy_mpr.ElementIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=1)
+
+    hydpy_mpr.MPR(
+        mprpath=dirpath_mpr_data,
+        hp=hp2,
+        subregionalisers=[subregionaliser_ks_2m],
+        tasks=[
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser_percmax_2m,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[element_transformers_percmax],
+            ),
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser_k_2m,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[element_transformers_k],
+            ),
+        ],
+        calibrator=g,
+        execution=hydpy_mpr.Execution(task_threads=2, nmb_cores=2),
+    ).run()
+
+    assert g.nmb_steps == 2
+    assert g.likelihood == pytest.approx(0.5826522238266516)
+    assert len(g.task_seconds) == 2
+    assert numpy.all(g.task_seconds > 0.0)
+    assert sorted(g.schedule_tasks()) == [0, 1]
+
+
+@pytest.mark.integration_test
+def test_raster_element_level_fused(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    element_transformer_fc: hydpy_mpr.ElementIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=3)
+
+    task = hydpy_mpr.RasterElementTask(
+        regionaliser=regionaliser_fc_2m,
+        upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+        transformers=[element_transformer_fc],
+        fused=True,
+    )
+    hydpy_mpr.MPR(mprpath=dirpath_mpr_data, hp=hp2, tasks=[task], calibrator=g).run()
+
+    assert g.likelihood == pytest.approx(0.8122366228601621)
+    assert g.values == pytest.approx([5.0, 0.5, -5.0])
+    fc = hp2.elements["land_dill_assl"].model.parameters.control.fc.values
+    assert numpy.min(fc) == numpy.max(fc) == pytest.approx(259.0249554316203)
+    assert numpy.all(numpy.isnan(regionaliser_fc_2m.output))
+    task.materialise_output()
+    assert not numpy.all(numpy.isnan(regionaliser_fc_2m.output))
+
+
+@pytest.mark.integration_test
+def test_raster_subunit_level_fused(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    subunit_transformer_fc: hydpy_mpr.SubunitIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=3)
+
+    hydpy_mpr.MPR(
+        mprpath=dirpath_mpr_data,
+        hp=hp2,
+        tasks=[
+            hydpy_mpr.RasterSubunitTask(
+                regionaliser=regionaliser_fc_2m,
+                upscaler=hydpy_mpr.RasterSubunitDefaultUpscaler(),
+                transformers=[subunit_transformer_fc],
+                fused=True,
+            )
+        ],
+        calibrator=g,
+    ).run()
+
+    assert g.likelihood == pytest.approx(0.8165275073538124)
+    assert g.values == pytest.approx([5.0, 0.5, -5.0])
+    fc = hp2.elements["land_dill_assl"].model.parameters.control.fc.values
+    assert numpy.min(fc[:4]) == numpy.max(fc[:4]) == pytest.approx(278.0)
+    assert fc[4:-6] == pytest.approx([264.1511917114258, 248.77248287200928])
+    assert numpy.min(fc[-6:]) == numpy.max(fc[-6:]) == pytest.approx(278.0)
+
+
+@pytest.mark.integration_test
+def test_raster_subunit_level_linear(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    subunit_transformer_fc: hydpy_mpr.SubunitIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=3)
+
+    hydpy_mpr.MPR(
+        mprpath=dirpath_mpr_data,
+        hp=hp2,
+        tasks=[
+            hydpy_mpr.RasterSubunitTask(
+                regionaliser=regionaliser_fc_2m,
+                upscaler=hydpy_mpr.RasterSubunitDefaultUpscaler(),
+                transformers=[subunit_transformer_fc],
+                linear=True,
+            )
+        ],
+        calibrator=g,
+    ).run()
+
+    assert g.likelihood == pytest.approx(0.8165275073538124)
+    assert g.values == pytest.approx([5.0, 0.5, -5.0])
+    fc = hp2.elements["land_dill_assl"].model.parameters.control.fc.values
+    assert numpy.min(fc[:4]) == numpy.max(fc[:4]) == pytest.approx(278.0)
+    assert fc[4:-6] == pytest.approx([264.1511917114258, 248.77248287200928])
+    assert numpy.min(fc[-6:]) == numpy.max(fc[-6:]) == pytest.approx(278.0)
+
+
+@pytest.mark.integration_test
+def test_raster_element_level_ensemble(
+    monkeypatch: pytest.MonkeyPatch,
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    element_transformer_fc: hydpy_mpr.ElementIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=3, ensemble_size=10)
+    task = hydpy_mpr.RasterElementTask(
+        regionaliser=regionaliser_fc_2m,
+        upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+        transformers=[element_transformer_fc],
+        fused=True,
+    )
+
+    nmb_precomputed = 0
+    run_precomputed = task.run_precomputed
+
+    def count_precomputed(values: VectorFloat, /) -> None:
+        nonlocal nmb_precomputed
+        nmb_precomputed += 1
+        run_precomputed(values)
+
+    likelihoods: list[float] = []
+    calculate_likelihood = g.calculate_likelihood
+
+    def log_likelihood() -> float:
+        likelihoods.append(likelihood := calculate_likelihood())
+        return likelihood
+
+    monkeypatch.setattr(task, "run_precomputed", count_precomputed)
+    monkeypatch.setattr(g, "calculate_likelihood", log_likelihood)
+
+    hydpy_mpr.MPR(mprpath=dirpath_mpr_data, hp=hp2, tasks=[task], calibrator=g).run()
+
+    assert g.nmb_steps == 28
+    assert nmb_precomputed == 27
+    assert not g.ensemble_values
+    assert g.likelihood == pytest.approx(0.8122366228601621)
+    assert g.values == pytest.approx([5.0, 0.5, -5.0])
+    fc = hp2.elements["land_dill_assl"].model.parameters.control.fc.values
+    assert numpy.min(fc) == numpy.max(fc) == pytest.approx(259.0249554316203)
+
+    # the sequential path must reproduce the likelihoods of the ensemble path:
+    ensemble_likelihoods = likelihoods[:27]
+    likelihoods.clear()
+    for values in g.gridpoints:
+        g.perform_calibrationstep(values)
+    assert nmb_precomputed == 27
+    assert likelihoods == pytest.approx(ensemble_likelihoods, rel=0.0, abs=1e-12)
+
+
+@pytest.mark.integration_test
+def test_raster_subunit_level_incremental(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    hp2: hydpy.HydPy,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    subunit_transformer_fc: hydpy_mpr.SubunitIdentityTransformer[Any],
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+
+    g = gridcalibrator(nmb_nodes=3)
+    upscaler = hydpy_mpr.RasterSubunitDefaultUpscaler(incremental=True, refresh=5)
+
+    hydpy_mpr.MPR(
+        mprpath=dirpath_mpr_data,
+        hp=hp2,
+        tasks=[
+            hydpy_mpr.RasterSubunitTask(
+                regionaliser=regionaliser_fc_2m,
+                upscaler=upscaler,
+                transformers=[subunit_transformer_fc],
+            )
+        ],
+        calibrator=g,
+    ).run()
+
+    assert upscaler.nmb_updates == 28
+    assert g.likelihood == pytest.approx(0.8165275073538124)
+    assert g.values == pytest.approx([5.0, 0.5, -5.0])
+    fc = hp2.elements["land_dill_assl"].model.parameters.control.fc.values
+    assert numpy.min(fc[:4]) == numpy.max(fc[:4]) == pytest.approx(278.0)
+    assert fc[4:-6] == pytest.approx([264.1511917114258, 248.77248287200928])
+    assert numpy.min(fc[-6:]) == numpy.max(fc[-6:]) == pytest.approx(278.0)
@@ -0,0 +1,13 @@
+from hydpy.models.hland_96 import *
+
+controlcheck(projectdir=r"HydPy-H-Lahn", controldir="default", firstdate="1996-01-01", stepsize="1d")
+
+ic(0.9694, 1.4694, 0.97058, 1.47058, 0.97172, 1.47172, 0.97281, 1.47281,
+   0.97386, 1.47386, 0.97487, 1.47487)
+sp(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+wc(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+sm(185.13164, 181.18755, 199.80432, 196.55888, 212.04018, 209.48859,
+   222.12115, 220.12671, 230.30756, 228.70779, 236.91943, 235.64427)
+uz(7.25228)
+lz(8.70695)
+model.rconcmodel.sequences.logs.quh(0.0)
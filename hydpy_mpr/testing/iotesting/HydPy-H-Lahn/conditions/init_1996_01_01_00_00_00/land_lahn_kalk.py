@@ -0,0 +1,13 @@
+from hydpy.models.hland_96 import *
+
+controlcheck(projectdir=r"HydPy-H-Lahn", controldir="default", firstdate="1996-01-01", stepsize="1d")
+
+ic(0.96064, 1.42111, 0.96121, 1.46121, 0.96176, 1.46176, 0.96232, 1.46232, 0.96286,
+   1.46286, 0.96339, 1.46339, 1.46392, 1.46444)
+sp(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+wc(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+sm(101.31248, 97.225, 111.3861, 107.64977, 120.59559, 117.26499, 129.01711, 126.0465,
+   136.66663, 134.01408, 143.59799, 141.24428, 147.75786, 153.54053)
+uz(4.07665)
+lz(7.52648)
+model.rconcmodel.sequences.logs.quh(0.0)
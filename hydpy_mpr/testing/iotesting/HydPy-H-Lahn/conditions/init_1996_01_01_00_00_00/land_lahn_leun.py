@@ -0,0 +1,14 @@
+from hydpy.models.hland_96 import *
+
+controlcheck(projectdir=r"HydPy-H-Lahn", controldir="default", firstdate="1996-01-01", stepsize="1d")
+
+ic(0.96159, 1.46159, 0.96219,
+   1.46219, 0.96278, 1.46278, 0.96336,
+   1.46336, 0.96393, 1.46393)
+sp(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+wc(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+sm(138.31396, 135.71124, 147.54968, 145.47142, 154.96405, 153.32805, 160.91917,
+   159.62434, 165.65575, 164.63255)
+uz(4.42062)
+lz(10.14007)
+model.rconcmodel.sequences.logs.quh(0.7, 0.0)
@@ -0,0 +1,13 @@
+from hydpy.models.hland_96 import *
+
+controlcheck(projectdir=r"HydPy-H-Lahn", controldir="default", firstdate="1996-01-01", stepsize="1d")
+
+ic(0.96404, 1.36332, 0.96458, 1.46458, 0.96512, 1.46512, 0.96565, 1.46569, 0.96617,
+   1.46617, 0.96668, 1.46668, 1.46719)
+sp(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+wc(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+sm(99.27505, 96.17726, 109.16576, 106.39745, 117.97304, 115.56252, 125.81523,
+   123.73198, 132.80035, 130.91684, 138.95523, 137.25983, 142.84148)
+uz(2.55041)
+lz(8.18711)
+model.rconcmodel.sequences.logs.quh(0.0)
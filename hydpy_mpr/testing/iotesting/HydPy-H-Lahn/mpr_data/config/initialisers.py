@@ -0,0 +1,11 @@
+import os
+
+import hydpy
+from hydpy import pub
+
+
+def initialise_lahn() -> hydpy.HydPy:
+    hp = hydpy.HydPy("HydPy-H-Lahn")
+    pub.timegrids = "1996-01-01", "1997-01-01", "1d"
+    hp.prepare_everything()
+    return hp
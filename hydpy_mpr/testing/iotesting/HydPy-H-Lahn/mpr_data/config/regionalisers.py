@@ -0,0 +1,216 @@
+import abc
+import dataclasses
+
+import numpy
+from numpy.typing import NDArray
+
+
+import hydpy_mpr
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class FC(hydpy_mpr.RasterRegionaliser, abc.ABC):
+
+    source_clay: str
+    source_density: str
+
+    dataset_clay: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+    dataset_density: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+
+    coef_const: hydpy_mpr.Coefficient
+    coef_factor_clay: hydpy_mpr.Coefficient
+    coef_factor_density: hydpy_mpr.Coefficient
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class FC2m(FC):
+
+    def apply_coefficients(self) -> None:
+        self.output.flat[:] = self.calculate(
+            clay=self.dataset_clay.values.ravel(),
+            density=self.dataset_density.values.ravel(),
+        )
+
+    def calculate(self, **inputs: NDArray[numpy.float64]) -> NDArray[numpy.float64]:
+        return 20.0 * (
+            self.coef_const.value
+            + self.coef_factor_clay.value * inputs["clay"]
+            + self.coef_factor_density.value * inputs["density"]
+        )
+
+    def get_basis(self) -> dict[str, NDArray[numpy.float64] | float]:
+        return {
+            "const": 1.0,
+            "clay": self.dataset_clay.values,
+            "density": self.dataset_density.values,
+        }
+
+    def get_weights(self) -> dict[str, float]:
+        return {
+            "const": 20.0 * self.coef_const.value,
+            "clay": 20.0 * self.coef_factor_clay.value,
+            "density": 20.0 * self.coef_factor_density.value,
+        }
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class FC2mExpression(hydpy_mpr.RasterExpressionRegionaliser):
+
+    EXPRESSION = "20.0 * (const + factor_clay * clay + factor_density * density)"
+
+    source_clay: str
+    source_density: str
+
+    dataset_clay: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+    dataset_density: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+
+    coef_const: hydpy_mpr.Coefficient
+    coef_factor_clay: hydpy_mpr.Coefficient
+    coef_factor_density: hydpy_mpr.Coefficient
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class FCFlex(FC):
+
+    source_depth: str
+
+    dataset_depth: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+
+    def apply_coefficients(self) -> None:
+        self.output[:] = (
+            10.0
+            * self.dataset_depth.values
+            * (
+                self.coef_const.value
+                + self.coef_factor_clay.value * self.dataset_clay.values
+                + self.coef_factor_density.value * self.dataset_density.values
+            )
+        )
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class Beta(hydpy_mpr.RasterRegionaliser):
+
+    source_density: str
+
+    dataset_density: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+
+    coef_factor_density: hydpy_mpr.Coefficient
+
+    def apply_coefficients(self) -> None:
+        self.output[:] = self.coef_factor_density.value * self.dataset_density.values
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class KS(hydpy_mpr.RasterSubregionaliser):
+
+    source_sand: str
+    source_clay: str
+
+    dataset_sand: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+    dataset_clay: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+
+    coef_factor: hydpy_mpr.Coefficient
+    coef_factor_sand: hydpy_mpr.Coefficient
+    coef_factor_clay: hydpy_mpr.Coefficient
+
+    def apply_coefficients(self) -> None:
+        self.output[:] = self.coef_factor.value * numpy.exp(
+            self.coef_factor_sand.value * self.dataset_sand.values
+            - self.coef_factor_clay.value * self.dataset_clay.values
+        )
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class PercMax(hydpy_mpr.RasterRegionaliser):
+
+    source_ks: str
+
+    dataset_ks: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+
+    coef_factor: hydpy_mpr.Coefficient
+
+    def get_static_terms(
+        self, **inputs: NDArray[numpy.float64]
+    ) -> dict[str, NDArray[numpy.float64]]:
+        if "ks" in inputs:
+            return {"ks_term": 1.0 + inputs["ks"]}
+        return {}
+
+    def apply_coefficients(self) -> None:
+        self.output.flat[:] = self.calculate(
+            ks=self.dataset_ks.values.ravel(), **self.static_terms
+        )
+
+    def calculate(self, **inputs: NDArray[numpy.float64]) -> NDArray[numpy.float64]:
+        ks_term = inputs.get("ks_term")
+        if ks_term is None:
+            ks_term = 1.0 + inputs["ks"]
+        return self.coef_factor.value * ks_term
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class K(hydpy_mpr.RasterRegionaliser):
+
+    source_ks: str
+    source_dh: str
+
+    dataset_ks: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+    dataset_dh: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+
+    coef_const: hydpy_mpr.Coefficient
+    coef_factor_ks: hydpy_mpr.Coefficient
+    coef_factor_dh: hydpy_mpr.Coefficient
+
+    def get_static_terms(
+        self, **inputs: NDArray[numpy.float64]
+    ) -> dict[str, NDArray[numpy.float64]]:
+        return {f"{name}_term": 1.0 + values for name, values in inputs.items()}
+
+    def apply_coefficients(self) -> None:
+        self.output.flat[:] = self.calculate(
+            ks=self.dataset_ks.values.ravel(),
+            dh=self.dataset_dh.values.ravel(),
+            **self.static_terms,
+        )
+
+    def calculate(self, **inputs: NDArray[numpy.float64]) -> NDArray[numpy.float64]:
+        ks_term = inputs.get("ks_term")
+        if ks_term is None:
+            ks_term = 1.0 + inputs["ks"]
+        dh_term = inputs.get("dh_term")
+        if dh_term is None:
+            dh_term = 1.0 + inputs["dh"]
+        return (
+            self.coef_const.value
+            + self.coef_factor_ks.value * ks_term
+            + self.coef_factor_dh.value * dh_term
+        )
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class K4(hydpy_mpr.AttributeRegionaliser):
+
+    source_kf: str
+
+    dataset_kf: hydpy_mpr.AttributeFloat = dataclasses.field(init=False)
+
+    coef_slow: hydpy_mpr.Coefficient
+    coef_fast: hydpy_mpr.Coefficient
+
+    def get_static_terms(
+        self, **inputs: NDArray[numpy.float64]
+    ) -> dict[str, NDArray[numpy.float64]]:
+        # share of the fast coefficient (`nan` for unclassified features):
+        v = inputs["kf"]
+        share = numpy.full(v.shape, numpy.nan)
+        share[(((v >= 4) * (v <= 7)) + (v == 10) + (v == 12)) > 0] = 0.0
+        share[(((v >= 1) * (v <= 3)) * (v == 8) + (v == 9)) > 0] = 1.0
+        share[((v == 0) + (v == 11) + (v == 99)) > 0] = 0.5
+        return {"fast_share": share}
+
+    def apply_coefficients(self) -> None:
+        self.output[:] = (
+            self.coef_slow.value
+            + self.coef_fast.value * self.static_terms["fast_share"]
+        )
@@ -0,0 +1,130 @@
+# pylint: disable=missing-docstring, unused-argument
+
+import numpy
+import pytest
+
+import hydpy_mpr
+from hydpy_mpr.source import constants
+from hydpy_mpr.source.typing_ import *
+
+UpElement = hydpy_mpr.AttributeElementDefaultUpscaler
+UpSubunit = hydpy_mpr.AttributeSubunitDefaultUpscaler
+
+
+def _arrange_features(regionaliser: hydpy_mpr.AttributeRegionaliser) -> None:
+    # The first five features belong to element 4 (subunits 0, 0, 1, 3, and 1) and
+    # differ in size, but the fourth one lacks a valid element ID.  All other
+    # features belong to subunit 0 of element 1.  The other elements do not handle
+    # any features.
+    provider = regionaliser.provider_
+    datasets = (provider.element_id, provider.subunit_id, provider.size)
+    for dataset in datasets + tuple(regionaliser.inputs.values()):
+        dataset.mask[:] = True
+    provider.element_id.values[:] = 1
+    provider.element_id.values[:5] = 4
+    provider.element_id.mask[3] = False
+    provider.subunit_id.values[:] = 0
+    provider.subunit_id.values[:5] = 0, 0, 1, 3, 1
+    provider.size.values[:] = 1.0
+    provider.size.values[:5] = 1.0, 3.0, 2.0, 5.0, 4.0
+
+
+@pytest.mark.parametrize(
+    "function, expected",
+    [
+        (constants.UP_MIN, 1.0),
+        (constants.UP_MAX, 6.0),
+        (constants.UP_MED, 2.5),
+        (constants.UP_Q, 1.75),
+    ],
+)
+def test_attribute_element_default_upscaler_order_statistics(
+    regionaliser_k4: hydpy_mpr.AttributeRegionaliser,
+    function: AttributeUpscalingOption,
+    expected: float,
+) -> None:
+    r = regionaliser_k4
+    _arrange_features(r)
+    u = UpElement(function=function, quantile=0.25)
+    u.activate(regionaliser=r)
+    r.output[:] = 2.0
+    r.output[:5] = 1.0, 2.0, 6.0, 99.0, 3.0
+    u.scale_up()
+    assert len(u.id2value) == 5
+    assert u.id2value[int64(1)] == pytest.approx(2.0)
+    assert u.id2value[int64(4)] == pytest.approx(expected)
+    for id_, value in u.id2value.items():
+        if id_ not in (1, 4):
+            assert numpy.isnan(value)
+
+
+@pytest.mark.parametrize(
+    "function, expected", [(constants.UP_A, 3.1), (constants.UP_P, 3.478505426185217)]
+)
+def test_attribute_element_default_upscaler_weighted(
+    regionaliser_k4: hydpy_mpr.AttributeRegionaliser,
+    function: AttributeUpscalingOption,
+    expected: float,
+) -> None:
+    r = regionaliser_k4
+    _arrange_features(r)
+    u = UpElement(function=function, power=2.0)
+    u.activate(regionaliser=r)
+    r.output[:] = 2.0
+    r.output[:5] = 1.0, 2.0, 6.0, 99.0, 3.0
+    u.scale_up()
+    assert u.id2value[int64(1)] == pytest.approx(2.0)
+    assert u.id2value[int64(4)] == pytest.approx(expected)
+    assert numpy.isnan(u.id2value[int64(2)])
+
+
+@pytest.mark.parametrize(
+    "function, expected",
+    [
+        (constants.UP_MIN, (1.0, 3.0)),
+        (constants.UP_MAX, (2.0, 6.0)),
+        (constants.UP_MED, (1.5, 4.5)),
+        (constants.UP_Q, (1.25, 3.75)),
+    ],
+)
+def test_attribute_subunit_default_upscaler_order_statistics(
+    regionaliser_k4: hydpy_mpr.AttributeRegionaliser,
+    function: AttributeUpscalingOption,
+    expected: tuple[float, float],
+) -> None:
+    r = regionaliser_k4
+    _arrange_features(r)
+    u = UpSubunit(function=function, quantile=0.25)
+    u.activate(regionaliser=r)
+    r.output[:] = 2.0
+    r.output[:5] = 1.0, 2.0, 6.0, 99.0, 3.0
+    u.scale_up()
+    # Elements and subunits without (unmasked) features have no upscaled values:
+    assert set(u.id2idx2value) == {1, 4}
+    assert numpy.array_equal(tuple(u.id2idx2value[int64(4)]), (0, 1))
+    assert u.id2idx2value[int64(1)][int64(0)] == pytest.approx(2.0)
+    assert tuple(u.id2idx2value[int64(4)].values()) == pytest.approx(expected)
+    assert tuple(u.name2idx2value["land_dill_assl"].values()) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "function, expected",
+    [
+        (constants.UP_A, (1.75, 4.0)),
+        (constants.UP_P, (1.8027756377319946, 4.242640687119285)),
+    ],
+)
+def test_attribute_subunit_default_upscaler_weighted(
+    regionaliser_k4: hydpy_mpr.AttributeRegionaliser,
+    function: AttributeUpscalingOption,
+    expected: tuple[float, float],
+) -> None:
+    r = regionaliser_k4
+    _arrange_features(r)
+    u = UpSubunit(function=function, power=2.0)
+    u.activate(regionaliser=r)
+    r.output[:] = 2.0
+    r.output[:5] = 1.0, 2.0, 6.0, 99.0, 3.0
+    u.scale_up()
+    assert u.id2idx2value[int64(1)][int64(0)] == pytest.approx(2.0)
+    assert tuple(u.id2idx2value[int64(4)].values()) == pytest.approx(expected)
@@ -1,9 +1,16 @@
 # pylint: disable=missing-docstring, unused-argument
 
+import copy
+import re
+import runpy
+
+import hydpy
 import numpy
 import pytest
 
 import hydpy_mpr
+from hydpy_mpr.source import calibrating
+from hydpy_mpr.source import executing
 from hydpy_mpr.source.typing_ import *
 
 
@@ -67,6 +74,7 @@ def test_grid_calibrator_calibrate(
         self: hydpy_mpr.GridCalibrator,
         values: Sequence[float],
         apply_loggers: bool = True,
+        require_state: bool = False,
     ) -> float:
         nonlocal times_called, last_values
         times_called += 1
@@ -81,3 +89,261 @@ def test_grid_calibrator_calibrate(
     assert times_called == 9 + 1
     assert last_values == (0.0, 4.0)
     assert c.likelihood == 1.0
+
+
+def test_calibrator_memo_skips_rejected_candidates(
+    monkeypatch: pytest.MonkeyPatch,
+    gridcalibrator_with_dummy_coefficients: type[hydpy_mpr.GridCalibrator],
+) -> None:
+    c = gridcalibrator_with_dummy_coefficients(nmb_nodes=1, memo_size=2)
+    c.loggers = []
+    nmb_simulations = 0
+    rejected = True
+
+    def simulate() -> float:
+        nonlocal nmb_simulations
+        nmb_simulations += 1
+        if rejected:
+            c.nmb_rejected += 1
+            return -99.0
+        return 0.5
+
+    monkeypatch.setattr(c, "apply_coefficients_and_simulate", simulate)
+    assert c.perform_calibrationstep((0.0, 4.0)) == -99.0
+    assert not c.memo
+    rejected = False
+    assert c.perform_calibrationstep((0.0, 4.0)) == 0.5
+    assert c.perform_calibrationstep((0.0, 4.0)) == 0.5
+    assert nmb_simulations == 2
+    assert c.nmb_memo_hits == 1
+    assert len(c.memo) == 1
+
+
+def test_calibrator_screening_lastdate_outside(
+    hp1: hydpy.HydPy, gridcalibrator: type[hydpy_mpr.GridCalibrator]
+) -> None:
+    c = gridcalibrator(nmb_nodes=1, screening_lastdate="1997-01-01")
+    with pytest.raises(ValueError) as info:
+        c.check_screening_lastdate()
+    assert str(info.value) == (
+        "The last date of the screening period (`1997-01-01 00:00:00`) must lie "
+        "after the first date of the evaluation period (`1996-01-01 00:00:00`) and "
+        "before the last date of the simulation period (`1997-01-01 00:00:00`)."
+    )
+
+
+def test_calibrator_screening_lastdate_misaligned(
+    hp1: hydpy.HydPy, gridcalibrator: type[hydpy_mpr.GridCalibrator]
+) -> None:
+    c = gridcalibrator(nmb_nodes=1, screening_lastdate="1996-04-01 12:00")
+    with pytest.raises(ValueError) as info:
+        c.check_screening_lastdate()
+    assert str(info.value) == (
+        "The last date of the screening period (`1996-04-01 12:00:00`) is not "
+        "aligned with the simulation step size (`1d`)."
+    )
+
+
+def test_calibrator_chunksize_misaligned(
+    hp1: hydpy.HydPy, gridcalibrator: type[hydpy_mpr.GridCalibrator]
+) -> None:
+    c = gridcalibrator(nmb_nodes=1, chunksize="36h")
+    with pytest.raises(ValueError) as info:
+        c.check_chunksize()
+    assert str(info.value) == (
+        "The chunk size (`36h`) must be a multiple of the simulation step size (`1d`)."
+    )
+
+
+def test_calibrator_coefficients_before_activation(
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+    c = gridcalibrator(nmb_nodes=1)
+    c.subregionalisers = ()
+    c.tasks = [
+        hydpy_mpr.RasterElementTask(
+            regionaliser=regionaliser_fc_2m,
+            upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+            transformers=[],
+        )
+    ]
+    names = ["fc_const", "fc_factor_clay", "fc_factor_density"]
+    assert [coefficient.name for coefficient in c.coefficients] == names
+    c.tasks = []
+    assert not c.coefficients
+
+
+def test_calibrator_schedule_tasks(
+    dirpath_mpr_data: DirpathMPRData,
+    dirname_raster_15km: NameProvider,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    gridcalibrator: type[hydpy_mpr.GridCalibrator],
+) -> None:
+    group1 = hydpy_mpr.RasterGroup(
+        mprpath=dirpath_mpr_data, name=dirname_raster_15km, datasets=()
+    )
+    group2 = copy.copy(group1)
+    c = gridcalibrator(nmb_nodes=1)
+    c.tasks = []
+    for group in (group1, group2, group1, group2):
+        regionaliser = copy.copy(regionaliser_fc_2m)
+        regionaliser.provider_ = group
+        c.tasks.append(
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[],
+            )
+        )
+    c.task_seconds = numpy.array([1.0, 4.0, 2.0, 0.5])
+    # the second provider's tasks take longer in total (4.5 vs. 3.0 seconds):
+    assert c.schedule_tasks() == [1, 3, 2, 0]
+    c.task_seconds = numpy.array([1.0, 2.0, 4.0, 0.5])
+    assert c.schedule_tasks() == [2, 0, 1, 3]
+    # without shared providers, the order is plain "longest processing time first":
+    for task in c.tasks:
+        task.regionaliser.provider_ = copy.copy(group1)
+    assert c.schedule_tasks() == [2, 1, 0, 3]
+
+
+def test_snapshot_capture_and_restore(hp2: hydpy.HydPy) -> None:
+    model = hp2.elements["land_lahn_kalk"].model
+    fc = model.parameters.control.fc
+    sm = model.sequences.states.sm
+    node = hp2.nodes["lahn_kalk"]
+    s = calibrating.Snapshot(parameters=(fc,), conditions=(sm,), nodes=(node,))
+    assert len(s.values) == 2 * len(fc.values) + 366
+    s.capture()
+    fc_old, sm_old = fc.values.copy(), sm.values.copy()
+    sim_old = node.sequences.sim.series.copy()
+    fc(100.0)
+    sm(10.0)
+    node.sequences.sim.series = 1.0
+    s.restore()
+    assert numpy.array_equal(fc.values, fc_old)
+    assert numpy.array_equal(sm.values, sm_old)
+    assert numpy.array_equal(sm.old, sm_old)
+    assert numpy.array_equal(node.sequences.sim.series, sim_old, equal_nan=True)
+
+
+def test_calibrator_conditions(
+    hp2: hydpy.HydPy, gridcalibrator: type[hydpy_mpr.GridCalibrator]
+) -> None:
+    c = gridcalibrator(nmb_nodes=1)
+    c.hp = hp2
+    c.initial_conditions = calibrating.Snapshot(conditions=c.conditionsequences)
+    c.initial_conditions.capture()
+    expected = hp2.conditions
+    sm = hp2.elements["land_lahn_kalk"].model.sequences.states.sm
+    sm(10.0)
+    conditions = c.conditions
+    assert conditions.keys() == expected.keys()
+    for name, model in expected.items():
+        assert conditions[name].keys() == model.keys()
+        for submodel, subseqs in model.items():
+            assert conditions[name][submodel].keys() == subseqs.keys()
+            for subname, name2values in subseqs.items():
+                obtained = conditions[name][submodel][subname]
+                assert obtained.keys() == name2values.keys()
+                for seqname, values in name2values.items():
+                    assert numpy.array_equal(obtained[seqname], values)
+    assert numpy.all(sm.values == 10.0)
+
+
+def test_execution_task_threads_exceed_cores() -> None:
+    execution = hydpy_mpr.Execution(task_threads=2, nmb_cores=3)
+    execution.check()
+    execution.nmb_cores = 2
+    message = (
+        "The number of task threads (`2`) plus the number of HydPy's simulation "
+        "threads (`1`) exceeds the number of available cores (`2`)."
+    )
+    with pytest.raises(ValueError) as info:
+        execution.check()
+    assert str(info.value) == message
+    with pytest.warns(UserWarning, match=re.escape(message)):
+        execution.check(strict=False)
+
+
+def test_execution_negative_task_threads() -> None:
+    execution = hydpy_mpr.Execution(task_threads=-1)
+    with pytest.raises(ValueError) as info:
+        execution.check()
+    assert str(info.value) == (
+        "The number of task threads must not be negative, but `-1` is given."
+    )
+
+
+def test_dependencies_order(
+    subregionaliser_ks_2m: hydpy_mpr.RasterSubregionaliser,
+    regionaliser_percmax_2m: hydpy_mpr.RasterRegionaliser,
+    regionaliser_k_2m: hydpy_mpr.RasterRegionaliser,
+) -> None:
+    d = executing.Dependencies(
+        subregionalisers=[subregionaliser_ks_2m],
+        tasks=[
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[],
+            )
+            for regionaliser in (regionaliser_percmax_2m, regionaliser_k_2m)
+        ],
+    )
+    assert d.nmb_nodes == 3
+    assert d.order == (0,)
+    assert d.node2predecessors == ((), (0,), (0,))
+    assert d.node2successors == ((1, 2), (), ())
+
+
+def test_dependencies_shared_regionaliser(
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    regionaliser_percmax_2m: hydpy_mpr.RasterRegionaliser,
+) -> None:
+    d = executing.Dependencies(
+        subregionalisers=[],
+        tasks=[
+            hydpy_mpr.RasterElementTask(
+                regionaliser=regionaliser,
+                upscaler=hydpy_mpr.RasterElementDefaultUpscaler(),
+                transformers=[],
+            )
+            for regionaliser in (
+                regionaliser_fc_2m,
+                regionaliser_percmax_2m,
+                copy.copy(regionaliser_fc_2m),
+            )
+        ],
+    )
+    assert d.task2primary == (None, None, 0)
+    assert d.node2predecessors == ((), (), (0,))
+
+
+def test_dependencies_cyclic(
+    arrange_project: None,
+    filepath_regionalisers: str,
+    dirname_raster_15km: NameProvider,
+) -> None:
+    ks = runpy.run_path(filepath_regionalisers)["KS"]
+    coefficients = {
+        f"coef_{name}": hydpy_mpr.Coefficient(name=f"ks_{name}", default=0.0)
+        for name in ("factor", "factor_sand", "factor_clay")
+    }
+    with pytest.raises(ValueError) as info:
+        executing.Dependencies(
+            subregionalisers=[
+                ks(
+                    name=name,
+                    provider=dirname_raster_15km,
+                    source_sand=source,
+                    source_clay=source,
+                    **coefficients,
+                )
+                for name, source in (("ks_a", "ks_b"), ("ks_b", "ks_a"))
+            ],
+            tasks=[],
+        )
+    assert str(info.value) == (
+        "The subregionalisers `ks_a`, `ks_b` depend on each other cyclically."
+    )
@@ -1,9 +1,13 @@
 # pylint: disable=missing-docstring, unused-argument
 
+import dataclasses
+import runpy
+
 import numpy
 import pytest
 
 import hydpy_mpr
+from hydpy_mpr.source import expressions
 from hydpy_mpr.source.typing_ import *
 
 
@@ -24,3 +28,154 @@ def test_raster_regionaliser_fc(
         + factor_density.value * dataset_density.values.flatten()[i_max]
     )
     assert fc_max == pytest.approx(373.8650631904602)
+
+
+def test_raster_expression_regionaliser_fc(
+    filepath_regionalisers: str, regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser
+) -> None:
+    r1 = regionaliser_fc_2m
+    r2 = runpy.run_path(filepath_regionalisers)["FC2mExpression"](
+        provider=r1.provider,
+        source_clay=r1.fieldname2datasetname["source_clay"],
+        source_density=r1.fieldname2datasetname["source_density"],
+        coef_const=hydpy_mpr.Coefficient(name="const", default=20.0),
+        coef_factor_clay=hydpy_mpr.Coefficient(name="clay", default=0.5),
+        coef_factor_density=hydpy_mpr.Coefficient(name="density", default=-1.5),
+    )
+    r2.activate(provider=r1.provider_)
+    r2.expression.chunksize = 7
+    for c1, c2 in zip(r1.coefficients, r2.coefficients):
+        c1.value = c2.value
+    r1.apply_coefficients()
+    r2.apply_coefficients()
+    assert numpy.array_equal(r1.output, r2.output, equal_nan=True)
+    cells = numpy.flatnonzero(r1.mask)
+    inputs = {
+        n.removeprefix("dataset_"): d.values.take(cells) for n, d in r1.inputs.items()
+    }
+    assert numpy.array_equal(r2.calculate(**inputs), r1.output.take(cells))
+
+
+@pytest.mark.parametrize(
+    "source, message",
+    [
+        ("a +", "Expression `a +` is not valid."),
+        ("a + b", "Expression `a + b` contains the unknown name `b`."),
+        ("a % 2", "Expression `a % 2` contains the unsupported element `a % 2`."),
+        ("sin(a)", "Expression `sin(a)` contains the unsupported element `sin(a)`."),
+    ],
+)
+def test_expression_errors(source: str, message: str) -> None:
+    with pytest.raises(ValueError) as info:
+        expressions.Expression(source=source, datasets=("a",), coefficients=())
+    assert str(info.value) == message
+
+
+def test_expression_common_subexpressions() -> None:
+    e = expressions.Expression(
+        source="exp(c * a) + exp(c * a) / (2.0 * c)",
+        datasets=("a",),
+        coefficients=("c",),
+        chunksize=3,
+    )
+    assert len(e.scalar_instructions) == 1
+    assert len(e.array_instructions) == 4
+    a = numpy.linspace(0.0, 1.0, 10)
+    output = numpy.empty(10)
+    e.evaluate(inputs={"a": a}, coefficients={"c": 0.3}, output=output)
+    assert numpy.array_equal(
+        output, numpy.exp(0.3 * a) + numpy.exp(0.3 * a) / (2.0 * 0.3)
+    )
+
+
+def test_expression_static_subexpressions() -> None:
+    e = expressions.Expression(
+        source="c * (1.0 + a) + exp(2.0 * a) * b",
+        datasets=("a", "b"),
+        coefficients=("c",),
+        static=("a",),
+        chunksize=3,
+    )
+    assert len(e.static_instructions) == 3
+    assert len(e.array_instructions) == 3
+    a, b = numpy.linspace(0.0, 1.0, 10), numpy.linspace(2.0, 1.0, 10)
+    derived = e.derive(inputs={"a": a, "b": b})
+    assert [d is None for d in derived] == [False, True, False]
+    output = numpy.empty(10)
+    e.evaluate(
+        inputs={"a": a, "b": b}, coefficients={"c": 0.3}, output=output, derived=derived
+    )
+    assert numpy.array_equal(output, 0.3 * (1.0 + a) + numpy.exp(2.0 * a) * b)
+
+
+@dataclasses.dataclass(kw_only=True, repr=False)
+class _ClayExpression(hydpy_mpr.RasterExpressionRegionaliser):
+
+    EXPRESSION = "const * (1.0 + clay)"
+
+    source_clay: str
+
+    dataset_clay: hydpy_mpr.RasterFloat = dataclasses.field(init=False)
+
+    coef_const: hydpy_mpr.Coefficient
+
+
+def _fail(**inputs: VectorFloat) -> list[VectorFloat | None]:
+    raise AssertionError("derived datasets must not be recalculated")
+
+
+def test_raster_expression_regionaliser_static_terms(
+    monkeypatch: pytest.MonkeyPatch, regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser
+) -> None:
+    r = _ClayExpression(
+        provider=regionaliser_fc_2m.provider,
+        source_clay=regionaliser_fc_2m.fieldname2datasetname["source_clay"],
+        coef_const=hydpy_mpr.Coefficient(name="const", default=2.0),
+    )
+    r.activate(provider=regionaliser_fc_2m.provider_)
+    assert list(r.static_terms) == ["derived_0"]
+    upscaler = hydpy_mpr.RasterElementDefaultUpscaler()
+    upscaler.activate(regionaliser=r)
+    upscaler.activate_fused()
+    assert list(upscaler.static_terms) == ["derived_0"]
+    monkeypatch.setattr(r.expression, "derive", _fail)
+    r.apply_coefficients()
+    clay = r.dataset_clay.values
+    assert numpy.array_equal(r.output, 2.0 * (1.0 + clay), equal_nan=True)
+    upscaler.scale_up()
+    fused = upscaler.values.copy()
+    upscaler.fused = False
+    upscaler.scale_up()
+    assert numpy.allclose(fused, upscaler.values, equal_nan=True)
+
+
+def test_raster_regionaliser_static_terms(
+    dirpath_mpr_data: DirpathMPRData,
+    filepath_regionalisers: str,
+    regionaliser_fc_2m: hydpy_mpr.RasterRegionaliser,
+    rastername_clay_2m_15km: NameDataset,
+    rasterfilename_dh_15km: NameDataset,
+) -> None:
+    r = runpy.run_path(filepath_regionalisers)["K"](
+        provider=regionaliser_fc_2m.provider,
+        source_ks=rastername_clay_2m_15km,
+        source_dh=rasterfilename_dh_15km,
+        coef_const=hydpy_mpr.Coefficient(name="k_const", default=0.01),
+        coef_factor_ks=hydpy_mpr.Coefficient(name="k_factor_ks", default=0.01),
+        coef_factor_dh=hydpy_mpr.Coefficient(name="k_factor_dh", default=0.0001),
+    )
+    providers = hydpy_mpr.RasterGroups(mprpath=dirpath_mpr_data, equations=(r,))
+    r.activate(provider=providers[regionaliser_fc_2m.provider])
+    assert sorted(r.static_terms) == ["dh_term", "ks_term"]
+    r.apply_coefficients()
+    ks, dh = r.dataset_ks.values, r.dataset_dh.values
+    expected = 0.01 + 0.01 * (1.0 + ks) + 0.0001 * (1.0 + dh)
+    assert numpy.array_equal(r.output, expected, equal_nan=True)
+    upscaler = hydpy_mpr.RasterElementDefaultUpscaler()
+    upscaler.activate(regionaliser=r)
+    upscaler.scale_up()
+    values = upscaler.values.copy()
+    upscaler.activate_fused()
+    assert sorted(upscaler.static_terms) == ["dh_term", "ks_term"]
+    upscaler.scale_up()
+    assert numpy.allclose(upscaler.values, values, equal_nan=True)
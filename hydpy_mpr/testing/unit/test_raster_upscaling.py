@@ -19,6 +19,10 @@ TransSubunit = hydpy_mpr.SubunitIdentityTransformer
         ((UpElement, constants.UP_A, TransElement), 3.0),
         ((UpElement, constants.UP_G, TransElement), 2.2894284851066637),
         ((UpElement, constants.UP_H, TransElement), 1.8),
+        ((UpElement, constants.UP_MIN, TransElement), 1.0),
+        ((UpElement, constants.UP_MAX, TransElement), 6.0),
+        ((UpElement, constants.UP_MED, TransElement), 2.0),
+        ((UpElement, constants.UP_Q, TransElement), 2.0),
     ],
     indirect=True,
 )
@@ -57,12 +61,42 @@ def test_raster_element_default_upscaler_missing_id(
     assert numpy.isnan(u.name2value["land_lahn_marb"])
 
 
+def _add_unknown_element(
+    *,
+    element_id: MatrixInt,
+    mask: MatrixBool,
+    output: MatrixFloat,
+    id2value: MutableMapping[int64, float64],
+) -> None:
+    id2value[int64(1)] = float64(1.0)
+    id2value[int64(99)] = float64(2.0)
+
+
+@pytest.mark.parametrize(
+    "task_raster_element",
+    [(UpElement, _add_unknown_element, TransElement)],
+    indirect=True,
+)
+def test_raster_element_default_upscaler_custom_function_fixed_keys(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+) -> None:
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    with pytest.raises(KeyError):
+        u.scale_up()
+    assert u.id2value[int64(1)] == 1.0
+    assert int64(99) not in u.id2value
+    assert len(u.id2value) == 5
+
+
 @pytest.mark.parametrize(
     "task_raster_element",
     [
         (UpElement, constants.UP_A, TransElement),
         (UpElement, constants.UP_G, TransElement),
         (UpElement, constants.UP_H, TransElement),
+        (UpElement, constants.UP_MIN, TransElement),
+        (UpElement, constants.UP_MED, TransElement),
     ],
     indirect=True,
 )
@@ -80,12 +114,138 @@ def test_raster_element_default_upscaler_missing_value(
     assert numpy.isnan(u.name2value["land_lahn_marb"])
 
 
+@pytest.mark.parametrize(
+    "task_raster_element", [(UpElement, constants.UP_Q, TransElement)], indirect=True
+)
+def test_raster_element_default_upscaler_quantile(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+) -> None:
+    r = task_raster_element.regionaliser
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    i = r.provider_.element_id.values
+    r.output[u.mask * (i == 4)] = 6.0, 2.0, 1.0
+    for quantile, expected in ((0.0, 1.0), (0.25, 1.5), (0.9, 5.2), (1.0, 6.0)):
+        u.quantile = quantile
+        u.scale_up()
+        assert u.id2value[int64(4)] == pytest.approx(expected)
+    u.quantile = 1.5
+    with pytest.raises(ValueError) as info:
+        u.activate(regionaliser=r)
+    assert str(info.value) == (
+        "The quantile must lie between zero and one, but `1.5` is given."
+    )
+
+
+@pytest.mark.parametrize(
+    "task_raster_element", [(UpElement, constants.UP_P, TransElement)], indirect=True
+)
+def test_raster_element_default_upscaler_power_mean(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+) -> None:
+    r = task_raster_element.regionaliser
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    i = r.provider_.element_id.values
+    r.output[u.mask * (i == 4)] = 1.0, 2.0, 6.0
+    for power, expected in (
+        (1.0, 3.0),
+        (0.0, 2.2894284851066637),
+        (-1.0, 1.8),
+        (2.0, (41.0 / 3.0) ** 0.5),
+    ):
+        u.power = power
+        u.scale_up()
+        assert u.id2value[int64(4)] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "task_raster_element, power",
+    [
+        ((UpElement, constants.UP_A, TransElement), 1.0),
+        ((UpElement, constants.UP_H, TransElement), -1.0),
+        ((UpElement, constants.UP_P, TransElement), 2.5),
+    ],
+    indirect=["task_raster_element"],
+)
+def test_raster_element_default_upscaler_weighted(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+    power: float,
+    rastername_sand_2m_15km: NameDataset,
+) -> None:
+    r = task_raster_element.regionaliser
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    r.output[:] = numpy.linspace(1.0, 2.0, r.output.size).reshape(r.output.shape)
+    u.power = power
+    u.weights = rastername_sand_2m_15km
+    u.activate(regionaliser=r)
+    u.scale_up()
+    assert u.get_power() == power
+    i = r.provider_.element_id.values
+    w = r.provider_.name2dataset[rastername_sand_2m_15km].values
+    for id_ in u.ids:
+        selection = u.mask * (i == id_)
+        expected = numpy.average(
+            r.output[selection] ** power, weights=w[selection]
+        ) ** (1.0 / power)
+        assert u.id2value[id_] == pytest.approx(expected, nan_ok=True)
+
+
+@pytest.mark.parametrize(
+    "task_raster_element",
+    [
+        (UpElement, constants.UP_A, TransElement),
+        (UpElement, constants.UP_G, TransElement),
+    ],
+    indirect=True,
+)
+def test_raster_element_default_upscaler_cell_area(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+) -> None:
+    r = task_raster_element.regionaliser
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    r.output[:] = numpy.linspace(1.0, 2.0, r.output.size).reshape(r.output.shape)
+    u.scale_up()
+    expected = u.values.copy()
+    # The projected test rasters consist of cells of equal size:
+    u.weights = constants.CELL_AREA
+    u.activate(regionaliser=r)
+    assert u.cellweights is not None
+    assert numpy.all(u.cellweights == 15000.0**2)
+    u.scale_up()
+    numpy.testing.assert_allclose(u.values, expected)
+
+
+@pytest.mark.parametrize(
+    "task_raster_element", [(UpElement, constants.UP_MED, TransElement)], indirect=True
+)
+def test_raster_element_default_upscaler_weighted_order_statistic(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+    rastername_sand_2m_15km: NameDataset,
+) -> None:
+    r = task_raster_element.regionaliser
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    u.weights = rastername_sand_2m_15km
+    with pytest.raises(ValueError) as info:
+        u.activate(regionaliser=r)
+    assert str(info.value) == (
+        f"Weighted upscaling only supports the predefined means, but the upscaler "
+        f"of regionaliser `{r.name}` uses `median`."
+    )
+
+
 @pytest.mark.parametrize(
     "task_raster_subunit, expected",
     [
         ((UpSubunit, constants.UP_A, TransSubunit), 2.5),
         ((UpSubunit, constants.UP_G, TransSubunit), 2.0),
         ((UpSubunit, constants.UP_H, TransSubunit), 1.6),
+        ((UpSubunit, constants.UP_MIN, TransSubunit), 1.0),
+        ((UpSubunit, constants.UP_MAX, TransSubunit), 4.0),
+        ((UpSubunit, constants.UP_MED, TransSubunit), 2.5),
     ],
     indirect=True,
 )
@@ -103,11 +263,35 @@ def test_raster_subunit_default_upscaler_okay(
     assert u.name2idx2value["land_lahn_kalk"][int64(0)] == pytest.approx(expected)
 
 
+@pytest.mark.parametrize(
+    "task_raster_subunit", [(UpSubunit, constants.UP_A, TransSubunit)], indirect=True
+)
+def test_raster_subunit_default_upscaler_arrays(
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
+) -> None:
+    u = task_raster_subunit.upscaler
+    assert isinstance(u, UpSubunit)
+    assert len(u.ids) == 5
+    assert u.offsets[0] == 0
+    assert u.offsets[-1] == len(u.idxs) == len(u.values)
+    for id_, i, j in zip(u.ids, u.offsets[:-1], u.offsets[1:]):
+        assert tuple(u.id2idx2value[id_]) == tuple(u.idxs[i:j])
+        assert numpy.all(numpy.diff(u.idxs[i:j]) > 0)
+    p = u.get_positions(numpy.array([3, 2]), numpy.array([0, 2]))
+    u.id2idx2value[int64(3)][int64(0)] = float64(1.0)
+    u.id2idx2value[int64(2)][int64(2)] = float64(2.0)
+    assert tuple(u.values[p]) == (1.0, 2.0)
+    with pytest.raises(KeyError):
+        u.id2idx2value[int64(3)][int64(99)] = float64(1.0)
+    with pytest.raises(TypeError):
+        del u.id2idx2value[int64(3)][int64(0)]
+
+
 @pytest.mark.parametrize(
     "task_raster_subunit", [(UpSubunit, constants.UP_A, TransSubunit)], indirect=True
 )
 def test_raster_subunit_default_upscaler_missing_id(
-    task_raster_subunit: hydpy_mpr.RasterElementTask,
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
 ) -> None:
     u = task_raster_subunit.upscaler
     e = task_raster_subunit.regionaliser.provider_.element_id.values
@@ -130,7 +314,7 @@ def test_raster_subunit_default_upscaler_missing_id(
     indirect=True,
 )
 def test_raster_subunit_default_upscaler_missing_value(
-    task_raster_subunit: hydpy_mpr.RasterElementTask,
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
 ) -> None:
     o = task_raster_subunit.regionaliser.output
     u = task_raster_subunit.upscaler
@@ -146,3 +330,84 @@ def test_raster_subunit_default_upscaler_missing_value(
     assert isinstance(u, UpSubunit)
     assert numpy.isnan(u.id2idx2value[int64(3)][int64(0)])
     assert numpy.isnan(u.name2idx2value["land_lahn_kalk"][int64(0)])
+
+
+@pytest.mark.parametrize(
+    "task_raster_element", [(UpElement, constants.UP_H, TransElement)], indirect=True
+)
+def test_raster_element_default_upscaler_incremental(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+) -> None:
+    r = task_raster_element.regionaliser
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    u.incremental = True
+    u.activate(regionaliser=r)
+    i = r.provider_.element_id.values
+    changed_ids: list[set[int64] | None] = []
+    r.output[u.mask] = 2.0
+    u.scale_up()
+    changed_ids.append(u.changed_ids)
+    assert u.id2value[int64(4)] == pytest.approx(2.0)
+    r.output[u.mask * (i == 4)] = 1.0, 2.0, 6.0
+    u.scale_up()
+    changed_ids.append(u.changed_ids)
+    assert u.id2value[int64(1)] == pytest.approx(2.0)
+    assert u.id2value[int64(4)] == pytest.approx(1.8)
+    u.scale_up()
+    changed_ids.append(u.changed_ids)
+    u.invalidate()
+    u.scale_up()
+    changed_ids.append(u.changed_ids)
+    assert u.id2value[int64(4)] == pytest.approx(1.8)
+    assert changed_ids == [None, {int64(4)}, set(), None]
+
+
+@pytest.mark.parametrize(
+    "task_raster_element",
+    [
+        (UpElement, constants.UP_A, TransElement),
+        (UpElement, constants.UP_G, TransElement),
+        (UpElement, constants.UP_H, TransElement),
+    ],
+    indirect=True,
+)
+def test_raster_element_default_upscaler_reorder(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+) -> None:
+    r = task_raster_element.regionaliser
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    r.output[:] = numpy.linspace(1.0, 2.0, r.output.size).reshape(r.output.shape)
+    u.scale_up()
+    expected = u.values.copy()
+    u.reorder = True
+    u.activate(regionaliser=r)
+    assert numpy.all(numpy.diff(u.groups) >= 0)
+    u.scale_up()
+    numpy.testing.assert_allclose(u.values, expected)
+
+
+@pytest.mark.parametrize(
+    "task_raster_subunit",
+    [
+        (UpSubunit, constants.UP_A, TransSubunit),
+        (UpSubunit, constants.UP_G, TransSubunit),
+        (UpSubunit, constants.UP_H, TransSubunit),
+    ],
+    indirect=True,
+)
+def test_raster_subunit_default_upscaler_reorder(
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
+) -> None:
+    r = task_raster_subunit.regionaliser
+    u = task_raster_subunit.upscaler
+    assert isinstance(u, UpSubunit)
+    r.output[:] = numpy.linspace(1.0, 2.0, r.output.size).reshape(r.output.shape)
+    u.scale_up()
+    expected = u.values.copy()
+    u.reorder = True
+    u.activate(regionaliser=r)
+    assert numpy.all(numpy.diff(u.groups) >= 0)
+    u.scale_up()
+    numpy.testing.assert_allclose(u.values, expected)
@@ -9,6 +9,7 @@ import shutil
 
 import numpy
 import pytest
+import tifffile
 
 import hydpy_mpr
 from hydpy_mpr.source import constants
@@ -123,6 +124,49 @@ def test_read_rastergroup_okay(
     ] == hydpy_mpr.read_geotiff(filepath=filepath_sand_2m_15km)
 
 
+def test_read_cell_area_projected(
+    arrange_project: None, filepath_element_id_15km: str
+) -> None:
+    raster = hydpy_mpr.read_cell_area(filepath=filepath_element_id_15km)
+    assert raster.shape == (10, 10)
+    assert numpy.all(raster.values == 15000.0**2)
+
+
+def test_read_cell_area_geographic(tmp_path: str) -> None:
+    filepath = os.path.join(tmp_path, "geographic.tif")
+    tifffile.imwrite(
+        filepath,
+        numpy.zeros((3, 2), dtype=numpy.float32),
+        extratags=[
+            (33550, "d", 3, (0.5, 1.0, 0.0), False),
+            (33922, "d", 6, (0.0, 0.0, 0.0, 8.0, 1.0, 0.0), False),
+            (34735, "H", 8, (1, 1, 0, 1, 1024, 0, 1, 2), False),
+        ],
+    )
+    raster = hydpy_mpr.read_cell_area(filepath=filepath)
+    assert raster.shape == (3, 2)
+    length = constants.EARTH_RADIUS * numpy.pi / 180.0  # of one degree latitude
+    sines = numpy.sin(numpy.radians([1.0, 0.0, -1.0, -2.0]))
+    expected = constants.EARTH_RADIUS**2 * numpy.radians(0.5) * -numpy.diff(sines)
+    numpy.testing.assert_allclose(raster.values, numpy.c_[expected, expected])
+    assert raster.values[0, 0] == pytest.approx(0.5 * length**2, rel=1e-4)
+    assert raster.values[2, 1] < raster.values[1, 0] == raster.values[0, 1]
+
+
+def test_read_rastergroup_cell_area(
+    arrange_project: None,
+    dirpath_mpr_data: DirpathMPRData,
+    dirname_raster_15km: NameProvider,
+    filepath_element_id_15km: str,
+) -> None:
+    group = hydpy_mpr.RasterGroup(
+        mprpath=dirpath_mpr_data, name=dirname_raster_15km, datasets=()
+    )
+    raster = group.read_dataset(NameDataset(constants.CELL_AREA))
+    assert raster == hydpy_mpr.read_cell_area(filepath=filepath_element_id_15km)
+    assert group.read_dataset(NameDataset(constants.CELL_AREA)) is raster
+
+
 def test_read_rastergroup_missing_dirpath(
     dirpath_mpr_data: DirpathMPRData,
     dirname_raster_15km: NameProvider,
@@ -1,10 +1,17 @@
 # pylint: disable=missing-docstring, unused-argument
 
+import warnings
+
+import hydpy
+from hydpy.core import parametertools
+from hydpy.models.evap import evap_control
+from hydpy.models.hland import hland_control
 import numpy
 import pytest
 
 import hydpy_mpr
 from hydpy_mpr.source import constants
+from hydpy_mpr.source import transforming
 from hydpy_mpr.source.typing_ import *
 
 UpElement = hydpy_mpr.RasterElementDefaultUpscaler
@@ -81,24 +88,166 @@ def test_element_identity_transformer_for_subsubmodel(
     assert numpy.min(etf) == numpy.max(etf) == 0.5
 
 
+@pytest.mark.parametrize(
+    "task_raster_element",
+    [(UpElement, constants.UP_A, TransElement, "mainmodel")],
+    indirect=True,
+)
+def test_element_identity_transformer_changed_elements(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+) -> None:
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    u.id2value[int64(3)] = float64(2.0)
+    t = task_raster_element.transformers[0]
+    t.modify_parameters()
+    assert t.changed_elements == {"land_lahn_kalk"}
+    t.modify_parameters()
+    assert t.changed_elements == set()
+    u.id2value[int64(3)] = float64(3.0)
+    u.id2value[int64(4)] = float64(3.0)
+    t.modify_parameters()
+    assert t.changed_elements == {"land_lahn_kalk", "land_dill_assl"}
+    t.invalidate()
+    t.modify_parameters()
+    assert t.changed_elements == {"land_lahn_kalk", "land_dill_assl"}
+
+
+@pytest.mark.parametrize(
+    "task_raster_subunit",
+    [(UpSubunit, constants.UP_A, TransSubunit, "mainmodel")],
+    indirect=True,
+)
+def test_subunit_identity_transformer_changed_elements(
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
+) -> None:
+    u = task_raster_subunit.upscaler
+    assert isinstance(u, UpSubunit)
+    t = task_raster_subunit.transformers[0]
+    fc = t.hp.elements["land_lahn_kalk"].model.parameters.control["fc"].values
+    u.id2idx2value[int64(3)][int64(2)] = float64(2.0)
+    t.modify_parameters()
+    assert t.changed_elements == {"land_lahn_kalk"}
+    t.modify_parameters()
+    assert t.changed_elements == set()
+    u.id2idx2value[int64(3)][int64(4)] = float64(3.0)
+    t.modify_parameters()
+    assert t.changed_elements == {"land_lahn_kalk"}
+    assert (fc[2], fc[4]) == (2.0, 3.0)
+    fc[2] = 1.0
+    t.modify_parameters()
+    assert t.changed_elements == set()
+    t.invalidate()
+    t.modify_parameters()
+    assert t.changed_elements == {"land_lahn_kalk"}
+    assert fc[2] == 2.0
+
+
+@pytest.mark.parametrize(
+    "task_raster_subunit", [(UpSubunit, constants.UP_A, TransSubunit)], indirect=True
+)
+@pytest.mark.parametrize(
+    "task_raster_element", [(UpElement, constants.UP_A, TransElement)], indirect=True
+)
+def test_overlapping_transformers_keep_priority(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
+) -> None:
+    ue, us = task_raster_element.upscaler, task_raster_subunit.upscaler
+    assert isinstance(ue, UpElement) and isinstance(us, UpSubunit)
+    te = task_raster_element.transformers[0]
+    ts = task_raster_subunit.transformers[0]
+    index = transforming.ParameterIndex(hp=te.hp)
+    te.activate(hp=te.hp, upscaler=ue, index=index)
+    ts.activate(hp=ts.hp, upscaler=us, index=index)
+    fc = te.hp.elements["land_lahn_kalk"].model.parameters.control["fc"].values
+    ue.id2value[int64(3)] = float64(2.0)
+    us.id2idx2value[int64(3)][int64(2)] = float64(5.0)
+    te.modify_parameters()
+    ts.modify_parameters()
+    assert (fc[0], fc[2]) == (2.0, 5.0)
+    ue.id2value[int64(3)] = float64(3.0)
+    us.changed_ids = set()
+    te.modify_parameters()
+    assert (fc[0], fc[2]) == (3.0, 3.0)
+    ts.modify_parameters()
+    assert ts.changed_elements == {"land_lahn_kalk"}
+    assert (fc[0], fc[2]) == (3.0, 5.0)
+    te.modify_parameters()
+    ts.modify_parameters()
+    assert (fc[0], fc[2]) == (3.0, 5.0)
+
+
+@pytest.mark.parametrize("parameter", [hland_control.PercMax, hland_control.CFMax])
+@pytest.mark.parametrize(
+    "task_raster_element",
+    [(UpElement, constants.UP_A, TransElement, "mainmodel")],
+    indirect=True,
+)
+def test_element_identity_transformer_agrees_with_call(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+    parameter: type[parametertools.Parameter],
+) -> None:
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    hp = task_raster_element.transformers[0].hp
+    t = TransElement(parameter=parameter, model="hland_96")
+    t.activate(hp=hp, upscaler=u)
+    u.id2value[int64(3)] = float64(2.0)
+    par = hp.elements["land_lahn_kalk"].model.parameters.control[parameter.name]
+    with hydpy.pub.options.parameterstep("1h"):
+        t.modify_parameters()
+        transformed = numpy.array(par.values)
+        par(2.0)
+    assert numpy.all(transformed == 48.0)
+    numpy.testing.assert_array_equal(transformed, par.values)
+
+
+class _DoublingTransformer(TransElement[Any]):
+
+    @override
+    def transform(self, values: VectorFloat) -> VectorFloat:
+        return 2.0 * super().transform(values)
+
+
+@pytest.mark.parametrize(
+    "task_raster_element",
+    [(UpElement, constants.UP_A, _DoublingTransformer, "mainmodel")],
+    indirect=True,
+)
+def test_element_transformer_transform_hook(
+    task_raster_element: hydpy_mpr.RasterElementTask,
+) -> None:
+    u = task_raster_element.upscaler
+    assert isinstance(u, UpElement)
+    u.id2value[int64(3)] = float64(2.0)
+    u.id2value[int64(4)] = float64(3.0)
+    t = task_raster_element.transformers[0]
+    t.modify_parameters()
+    control = t.hp.elements["land_lahn_kalk"].model.parameters.control
+    assert numpy.min(control["fc"].values) == numpy.max(control["fc"].values) == 4.0
+    control = t.hp.elements["land_dill_assl"].model.parameters.control
+    assert numpy.min(control["fc"].values) == numpy.max(control["fc"].values) == 6.0
+
+
 @pytest.mark.parametrize(
     "task_raster_subunit",
     [(UpSubunit, constants.UP_A, TransSubunit, "mainmodel")],
     indirect=True,
 )
 def test_subunit_identity_transformer_for_mainmodel(
-    task_raster_subunit: hydpy_mpr.RasterElementTask,
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
 ) -> None:
     u = task_raster_subunit.upscaler
     assert isinstance(u, UpSubunit)
-    u.id2idx2value[int64(3)][int64(1)] = float64(2.0)
-    u.id2idx2value[int64(3)][int64(3)] = float64(4.0)
+    u.id2idx2value[int64(3)][int64(2)] = float64(2.0)
+    u.id2idx2value[int64(3)][int64(4)] = float64(4.0)
     t = task_raster_subunit.transformers[0]
     t.modify_parameters()
     fc = t.hp.elements["land_lahn_kalk"].model.parameters.control["fc"].values
-    assert fc[1] == 2.0
-    assert fc[2] == 219.0
-    assert fc[3] == 4.0
+    assert fc[2] == 2.0
+    assert fc[3] == 219.0
+    assert fc[4] == 4.0
 
 
 @pytest.mark.parametrize(
@@ -107,12 +256,12 @@ def test_subunit_identity_transformer_for_mainmodel(
     indirect=True,
 )
 def test_subunit_identity_transformer_for_submodel(
-    task_raster_subunit: hydpy_mpr.RasterElementTask,
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
 ) -> None:
     u = task_raster_subunit.upscaler
     assert isinstance(u, UpSubunit)
-    u.id2idx2value[int64(3)][int64(1)] = float64(0.5)
-    u.id2idx2value[int64(3)][int64(3)] = float64(0.7)
+    u.id2idx2value[int64(3)][int64(2)] = float64(0.5)
+    u.id2idx2value[int64(3)][int64(4)] = float64(0.7)
     t = task_raster_subunit.transformers[0]
     t.modify_parameters()
     sml = (
@@ -120,9 +269,9 @@ def test_subunit_identity_transformer_for_submodel(
         .model.aetmodel.parameters.control["soilmoisturelimit"]
         .values
     )
-    assert sml[1] == 0.5
-    assert sml[2] == 0.9
-    assert sml[3] == 0.7
+    assert sml[2] == 0.5
+    assert sml[3] == 0.9
+    assert sml[4] == 0.7
 
 
 @pytest.mark.parametrize(
@@ -131,12 +280,12 @@ def test_subunit_identity_transformer_for_submodel(
     indirect=True,
 )
 def test_subunit_identity_transformer_for_subsubmodel(
-    task_raster_subunit: hydpy_mpr.RasterElementTask,
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
 ) -> None:
     u = task_raster_subunit.upscaler
     assert isinstance(u, UpSubunit)
-    u.id2idx2value[int64(3)][int64(1)] = float64(0.5)
-    u.id2idx2value[int64(3)][int64(3)] = float64(0.7)
+    u.id2idx2value[int64(3)][int64(2)] = float64(0.5)
+    u.id2idx2value[int64(3)][int64(4)] = float64(0.7)
     t = task_raster_subunit.transformers[0]
     t.modify_parameters()
     etf = (
@@ -144,6 +293,95 @@ def test_subunit_identity_transformer_for_subsubmodel(
         .model.aetmodel.petmodel.parameters.control["evapotranspirationfactor"]
         .values
     )
-    assert etf[1] == 0.5
-    assert etf[2] == 1.0
-    assert etf[3] == 0.7
+    assert etf[2] == 0.5
+    assert etf[3] == 1.0
+    assert etf[4] == 0.7
+
+
+@pytest.mark.parametrize(
+    "task_raster_subunit",
+    [(UpSubunit, constants.UP_A, TransSubunit, "mainmodel")],
+    indirect=True,
+)
+def test_subunit_identity_transformer_index_error(
+    task_raster_subunit: hydpy_mpr.RasterSubunitTask,
+) -> None:
+    r = task_raster_subunit.regionaliser
+    u = task_raster_subunit.upscaler
+    t = task_raster_subunit.transformers[0]
+    assert isinstance(u, UpSubunit)
+    e = r.provider_.element_id.values
+    s = r.provider_.subunit_id.values
+    s[u.mask * (e == 3) * (s == 2)] = 99
+    u.activate(regionaliser=r)
+    with pytest.warns(UserWarning, match="index `99` is out of bounds"):
+        t.activate(hp=t.hp, upscaler=u)
+    u.id2idx2value[int64(3)][int64(99)] = float64(2.0)
+    u.id2idx2value[int64(3)][int64(4)] = float64(4.0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        t.modify_parameters()
+    fc = t.hp.elements["land_lahn_kalk"].model.parameters.control["fc"].values
+    assert fc[4] == 4.0
+
+
+def test_parameter_index(hp1: hydpy.HydPy) -> None:
+    index = transforming.ParameterIndex(hp=hp1)
+    fc = index.get_parameters(model=None, parameter=hland_control.FC)
+    model = hp1.elements["land_lahn_kalk"].model
+    assert fc["land_lahn_kalk"] is model.parameters.control.fc
+    assert sorted(fc) == [e.name for e in hp1.elements if e.name.startswith("land_")]
+    assert index.get_parameters(model="hland_96", parameter=hland_control.FC) == fc
+    assert index.get_parameters(model=None, parameter=hland_control.FC) is fc
+    sml = index.get_parameters(
+        model="model.aetmodel", parameter=evap_control.SoilMoistureLimit
+    )
+    assert sml["land_lahn_kalk"] is model.aetmodel.parameters.control.soilmoisturelimit
+    paths = [path for path, _ in index.get_models(hp1.elements["land_lahn_kalk"])]
+    assert paths[0] == "model"
+    assert paths == sorted(paths, key=lambda path: (path.count("."), path))
+
+
+def test_parameter_index_errors(hp1: hydpy.HydPy) -> None:
+    index = transforming.ParameterIndex(hp=hp1)
+    with pytest.raises(ValueError) as info:
+        index.get_parameters(model="hland_96", parameter=evap_control.SoilMoistureLimit)
+    assert str(info.value) == (
+        "The (sub)model `hland_96` of element `land_dill_assl` does not define a "
+        "control parameter named `soilmoisturelimit`."
+    )
+    with pytest.raises(ValueError) as info:
+        index.get_parameters(model=None, parameter=evap_control.SoilMoistureLimit)
+    assert str(info.value) == (
+        "No element handles a main model that defines a control parameter named "
+        "`soilmoisturelimit`."
+    )
+    with pytest.raises(ValueError) as info:
+        index.get_parameters(model="wland_wag", parameter=hland_control.FC)
+    assert str(info.value) == (
+        "No element handles a (sub)model `wland_wag` that defines a control "
+        "parameter named `fc`."
+    )
+
+
+def test_parameter_index_tie_break(
+    hp1: hydpy.HydPy, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    element = hp1.elements["land_lahn_kalk"]
+    models = [hp1.elements[name].model for name in ("land_lahn_kalk", "land_dill_assl")]
+    aetmodel = models[1].aetmodel
+    assert aetmodel is not None
+    path2model = {
+        "model": models[0],
+        "model.a.deep": models[0].aetmodel,
+        "model.c": models[0].aetmodel,
+        "model.b": aetmodel,
+    }
+    monkeypatch.setattr(element.model, "find_submodels", lambda **_: path2model)
+    index = transforming.ParameterIndex(hp=hp1)
+    paths = [path for path, _ in index.get_models(element)]
+    assert paths == ["model", "model.b", "model.c", "model.a.deep"]
+    sml = index.get_parameters(
+        model=aetmodel.name, parameter=evap_control.SoilMoistureLimit
+    )
+    assert sml[element.name] is aetmodel.parameters.control.soilmoisturelimit